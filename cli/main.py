@@ -4,14 +4,15 @@ import json
 import logging
 import sys
 from pathlib import Path
-from typing import Any
+from typing import Any, List, Optional
 
 from auth import CookieManager
 from cli.login_flow import can_interactive_login, interactive_relogin
 from cli.progress_display import ProgressDisplay
 from config import ConfigLoader
-from control import QueueManager, RateLimiter, RetryHandler
+from control import CdnScoreboard, QueueManager, RateLimiter, RetryHandler
 from core import DouyinAPIClient, DownloaderFactory, LoginRequiredError, URLParser
+from core.downloader_base import save_local_media_indexes
 from storage import Database, FileManager
 from utils.logger import set_console_log_level, setup_logger
 from utils.notifier import build_notifier
@@ -31,15 +32,19 @@ def _as_bool(value: Any, default: bool = True) -> bool:
     return bool(value)
 
 
-async def _run_with_relogin(make_coro, cookie_manager, *, serve=False):
+async def _run_with_relogin(make_coro, cookie_manager, *, serve=False, relogin_lock=None):
     """Run make_coro(); on LoginRequiredError, relogin once and retry.
 
     make_coro is a zero-arg callable returning a fresh coroutine each call,
     so the retry re-creates its own DouyinAPIClient with refreshed cookies.
     Refreshed cookies propagate through ``cookie_manager`` as a clean replace
     (not a merge), and both call sites read their cookies from it on retry.
+
+    ``relogin_lock`` is shared by concurrently processed URLs: only one of
+    them opens the login flow, the others retry with the refreshed cookies.
     """
     for attempt in range(2):
+        cookies_before = dict(cookie_manager.get_cookies())
         try:
             return await make_coro()
         except LoginRequiredError as exc:
@@ -55,15 +60,70 @@ async def _run_with_relogin(make_coro, cookie_manager, *, serve=False):
                         "config/cookies.json（或运行 python tools/cookie_fetcher.py 登录）。"
                     )
                 raise
-            display.print_warning(
-                f"检测到未登录（status {exc.status_code}），开始重新登录…"
-            )
-            new_cookies = await interactive_relogin()
-            if not new_cookies:
-                display.print_error("重新登录未完成，已中止。")
-                raise
-            cookie_manager.set_cookies(new_cookies)
-            display.print_success("已更新登录态，正在重试…")
+            if relogin_lock is None:
+                await _relogin(exc, cookie_manager)
+                continue
+            async with relogin_lock:
+                if cookie_manager.get_cookies() != cookies_before:
+                    continue
+                await _relogin(exc, cookie_manager)
+
+
+async def _relogin(exc: LoginRequiredError, cookie_manager) -> None:
+    display.print_warning(f"检测到未登录（status {exc.status_code}），开始重新登录…")
+    new_cookies = await interactive_relogin()
+    if not new_cookies:
+        display.print_error("重新登录未完成，已中止。")
+        raise exc
+    cookie_manager.set_cookies(new_cookies)
+    display.print_success("已更新登录态，正在重试…")
+
+
+class DownloadContext:
+    """一次下载用到的组件：API client、FileManager、限速器、重试器与 QueueManager。
+
+    顺序处理时每个 URL 新建一份；URL 并发时所有 URL 共用一份——同一个连接池
+    与 msToken、同一个限速器，QueueManager 的 worker 池即全局下载并发上限
+    （``thread``），不会因为 URL 并发而成倍放大。
+    """
+
+    def __init__(self, config: ConfigLoader, cookie_manager: CookieManager):
+        self._cookie_manager = cookie_manager
+        self._cookies = dict(cookie_manager.get_cookies())
+        self.file_manager = FileManager(
+            config.get("path"),
+            download_config=config.get("download"),
+            scoreboard=CdnScoreboard.from_config(config.get("download")),
+        )
+        self.rate_limiter = RateLimiter.from_config(config)
+        self.retry_handler = RetryHandler(max_retries=config.get("retry_times", 3))
+        self.queue_manager = QueueManager(max_workers=int(config.get("thread", 5) or 5))
+        self.api_client = DouyinAPIClient(
+            self._cookies,
+            proxy=config.get("proxy"),
+            connection_config=config.get("connection"),
+            rate_limiter=self.rate_limiter,
+            signing_config=config.get("signing"),
+        )
+
+    async def __aenter__(self) -> "DownloadContext":
+        self.api_client = await self.api_client.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # FileManager 持有复用的 httpx 连接池，与 API client 一起关闭。
+        try:
+            await self.api_client.__aexit__(exc_type, exc, tb)
+        finally:
+            await self.file_manager.close()
+            logger.info("Rate limiter stats: %s", self.rate_limiter.stats())
+
+    def sync_cookies(self) -> None:
+        """重新登录后 cookie_manager 里是新登录态，同步给共用的 API client。"""
+        cookies = self._cookie_manager.get_cookies()
+        if cookies != self._cookies:
+            self._cookies = dict(cookies)
+            self.api_client.replace_cookies(self._cookies)
 
 
 async def download_url(
@@ -72,109 +132,122 @@ async def download_url(
     cookie_manager: CookieManager,
     database: Database = None,
     progress_reporter: ProgressDisplay = None,
+    *,
+    context: Optional[DownloadContext] = None,
 ):
     if progress_reporter:
         progress_reporter.advance_step("初始化", "创建下载组件")
-    file_manager = FileManager(config.get("path"))
-    rate_limiter = RateLimiter(max_per_second=float(config.get("rate_limit", 2) or 2))
-    retry_handler = RetryHandler(max_retries=config.get("retry_times", 3))
-    queue_manager = QueueManager(max_workers=int(config.get("thread", 5) or 5))
 
+    if context is not None:
+        context.sync_cookies()
+        return await _download_with_context(
+            url, config, cookie_manager, database, progress_reporter, context
+        )
+
+    async with DownloadContext(config, cookie_manager) as own_context:
+        return await _download_with_context(
+            url, config, cookie_manager, database, progress_reporter, own_context
+        )
+
+
+async def _download_with_context(
+    url: str,
+    config: ConfigLoader,
+    cookie_manager: CookieManager,
+    database: Optional[Database],
+    progress_reporter,
+    context: DownloadContext,
+):
+    api_client = context.api_client
     original_url = url
 
-    async with DouyinAPIClient(
-        cookie_manager.get_cookies(),
-        proxy=config.get("proxy"),
-    ) as api_client:
-        if progress_reporter:
-            progress_reporter.advance_step("解析链接", "检查短链并解析 URL")
-        # 支持多种短链变体：v.douyin.com / v.iesdouyin.com / 无 scheme 的裸链接
-        if is_short_url(url):
-            resolved_url = await api_client.resolve_short_url(normalize_short_url(url))
-            if resolved_url:
-                url = resolved_url
-            else:
-                if progress_reporter:
-                    progress_reporter.update_step("解析链接", "短链解析失败")
-                display.print_error(f"Failed to resolve short URL: {url}")
-                return None
-
-        parsed = URLParser.parse(url)
-        if not parsed:
+    if progress_reporter:
+        progress_reporter.advance_step("解析链接", "检查短链并解析 URL")
+    # 支持多种短链变体：v.douyin.com / v.iesdouyin.com / 无 scheme 的裸链接
+    if is_short_url(url):
+        resolved_url = await api_client.resolve_short_url(normalize_short_url(url))
+        if resolved_url:
+            url = resolved_url
+        else:
             if progress_reporter:
-                progress_reporter.update_step("解析链接", "URL 解析失败")
-            display.print_error(f"Failed to parse URL: {url}")
+                progress_reporter.update_step("解析链接", "短链解析失败")
+            display.print_error(f"Failed to resolve short URL: {url}")
             return None
 
-        if not progress_reporter:
-            display.print_info(f"URL type: {parsed['type']}")
+    parsed = URLParser.parse(url)
+    if not parsed:
         if progress_reporter:
-            progress_reporter.advance_step("创建下载器", f"URL 类型: {parsed['type']}")
+            progress_reporter.update_step("解析链接", "URL 解析失败")
+        display.print_error(f"Failed to parse URL: {url}")
+        return None
 
-        downloader = DownloaderFactory.create(
-            parsed["type"],
-            config,
-            api_client,
-            file_manager,
-            cookie_manager,
-            database,
-            rate_limiter,
-            retry_handler,
-            queue_manager,
-            progress_reporter=progress_reporter,
-        )
-
-        if not downloader:
-            if progress_reporter:
-                progress_reporter.update_step("创建下载器", "未找到匹配下载器")
-            display.print_error(f"No downloader found for type: {parsed['type']}")
-            return None
+    if not progress_reporter:
+        display.print_info(f"URL type: {parsed['type']}")
+    if progress_reporter:
+        progress_reporter.advance_step("创建下载器", f"URL 类型: {parsed['type']}")
+
+    downloader = DownloaderFactory.create(
+        parsed["type"],
+        config,
+        api_client,
+        context.file_manager,
+        cookie_manager,
+        database,
+        context.rate_limiter,
+        context.retry_handler,
+        context.queue_manager,
+        progress_reporter=progress_reporter,
+    )
 
+    if not downloader:
         if progress_reporter:
-            progress_reporter.advance_step("执行下载", "开始拉取与下载资源")
-        try:
-            result = await downloader.download(parsed)
-        except Exception as exc:
-            # Surface fatal downloader errors (e.g. user_info fetch failed
-            # because cookies are invalid) as a per-URL failure instead of
-            # crashing the whole batch. Keeps multi-URL CLI runs robust while
-            # still telling the user why the URL was skipped.
-            if progress_reporter:
-                progress_reporter.update_step("执行下载", f"失败：{exc}")
-            display.print_error(f"Download failed for {url}: {exc}")
-            return None
+            progress_reporter.update_step("创建下载器", "未找到匹配下载器")
+        display.print_error(f"No downloader found for type: {parsed['type']}")
+        return None
 
+    if progress_reporter:
+        progress_reporter.advance_step("执行下载", "开始拉取与下载资源")
+    try:
+        result = await downloader.download(parsed)
+    except Exception as exc:
+        # Surface fatal downloader errors (e.g. user_info fetch failed
+        # because cookies are invalid) as a per-URL failure instead of
+        # crashing the whole batch. Keeps multi-URL CLI runs robust while
+        # still telling the user why the URL was skipped.
         if progress_reporter:
-            progress_reporter.advance_step(
-                "记录历史",
-                "写入数据库历史" if (result and database) else "数据库未启用，跳过",
-            )
-        if result and database:
-            safe_config = {
-                k: v
-                for k, v in config.config.items()
-                if k not in ("cookies", "cookie", "transcript")
+            progress_reporter.update_step("执行下载", f"失败：{exc}")
+        display.print_error(f"Download failed for {url}: {exc}")
+        return None
+
+    if progress_reporter:
+        progress_reporter.advance_step(
+            "记录历史",
+            "写入数据库历史" if (result and database) else "数据库未启用，跳过",
+        )
+    if result and database:
+        safe_config = {
+            k: v for k, v in config.config.items() if k not in ("cookies", "cookie", "transcript")
+        }
+        await database.add_history(
+            {
+                "url": original_url,
+                "url_type": parsed["type"],
+                "total_count": result.total,
+                "success_count": result.success,
+                "config": json.dumps(safe_config, ensure_ascii=False),
             }
-            await database.add_history(
-                {
-                    "url": original_url,
-                    "url_type": parsed["type"],
-                    "total_count": result.total,
-                    "success_count": result.success,
-                    "config": json.dumps(safe_config, ensure_ascii=False),
-                }
-            )
+        )
 
-        if progress_reporter:
-            if result:
-                progress_reporter.advance_step(
-                    "收尾",
-                    f"成功 {result.success} / 失败 {result.failed} / 跳过 {result.skipped}",
-                )
-            else:
-                progress_reporter.advance_step("收尾", "无可统计结果")
+    if progress_reporter:
+        if result:
+            progress_reporter.advance_step(
+                "收尾",
+                f"成功 {result.success} / 失败 {result.failed} / 跳过 {result.skipped}",
+            )
+        else:
+            progress_reporter.advance_step("收尾", "无可统计结果")
 
-        return result
+    return result
 
 
 async def main_async(args):
@@ -229,6 +302,8 @@ async def main_async(args):
 
     if args.thread:
         config.update(thread=args.thread)
+    if getattr(args, "url_concurrency", None):
+        config.update(pipeline={"url_concurrency": args.url_concurrency})
 
     if not config.validate():
         display.print_error("Invalid configuration: missing required fields")
@@ -244,14 +319,24 @@ async def main_async(args):
     database = None
     if config.get("database"):
         db_path = config.get("database_path", "dy_downloader.db") or "dy_downloader.db"
-        database = Database(db_path=str(db_path))
+        write_behind = config.get("database_write_behind") or {}
+        if not isinstance(write_behind, dict):
+            write_behind = {}
+        database = Database(
+            db_path=str(db_path),
+            cache_downloaded_ids=bool(config.get("database_cache_ids", False)),
+            write_behind=bool(write_behind.get("enabled", True)),
+            write_batch_size=int(write_behind.get("batch_size", 200) or 200),
+            write_interval_ms=float(write_behind.get("interval_ms", 500) or 0),
+            read_pool_size=int(config.get("database_read_connections", 2) or 0),
+        )
         await database.initialize()
         display.print_success("Database initialized")
 
     urls = config.get_links()
     display.print_info(f"Found {len(urls)} URL(s) to process")
 
-    all_results = []
+    all_results: List[Any] = []
     progress_config = config.get("progress", {}) or {}
     quiet_by_config = _as_bool(progress_config.get("quiet_logs", True), default=True)
     quiet_progress_logs = quiet_by_config and not (args.verbose or args.show_warnings)
@@ -260,31 +345,23 @@ async def main_async(args):
         # 默认静默控制台日志，下载完成后再恢复。
         set_console_log_level(logging.CRITICAL)
 
+    url_concurrency = _url_concurrency(config)
     display.start_download_session(len(urls))
     try:
-        for i, url in enumerate(urls, 1):
-            display.start_url(i, len(urls), url)
-
-            result = await _run_with_relogin(
-                lambda u=url: download_url(
-                    u,
-                    config,
-                    cookie_manager,
-                    database,
-                    progress_reporter=display,
-                ),
-                cookie_manager,
-                serve=False,
+        if url_concurrency > 1 and len(urls) > 1:
+            all_results = await _download_urls_concurrently(
+                urls, config, cookie_manager, database, url_concurrency
             )
-            if result:
-                all_results.append(result)
-                display.complete_url(result)
-            else:
-                display.fail_url("下载失败或链接无效")
+        else:
+            all_results = await _download_urls_sequentially(urls, config, cookie_manager, database)
     finally:
         display.stop_download_session()
         if database is not None:
             await database.close()
+        scoreboard = CdnScoreboard.from_config(config.get("download"))
+        if scoreboard is not None:
+            scoreboard.save()
+        save_local_media_indexes()
         if quiet_progress_logs:
             set_console_log_level(logging.ERROR)
 
@@ -307,6 +384,97 @@ async def main_async(args):
         await _dispatch_notifications(config, None, len(urls))
 
 
+def _url_concurrency(config: ConfigLoader) -> int:
+    pipeline = config.get("pipeline") or {}
+    try:
+        return max(int(pipeline.get("url_concurrency", 1) or 1), 1)
+    except (AttributeError, TypeError, ValueError):
+        return 1
+
+
+async def _download_urls_sequentially(
+    urls: List[str],
+    config: ConfigLoader,
+    cookie_manager: CookieManager,
+    database: Optional[Database],
+) -> List[Any]:
+    results: List[Any] = []
+    for i, url in enumerate(urls, 1):
+        display.start_url(i, len(urls), url)
+
+        result = await _run_with_relogin(
+            lambda u=url: download_url(
+                u,
+                config,
+                cookie_manager,
+                database,
+                progress_reporter=display,
+            ),
+            cookie_manager,
+            serve=False,
+        )
+        if result:
+            results.append(result)
+            display.complete_url(result)
+        else:
+            display.fail_url("下载失败或链接无效")
+    return results
+
+
+async def _download_urls_concurrently(
+    urls: List[str],
+    config: ConfigLoader,
+    cookie_manager: CookieManager,
+    database: Optional[Database],
+    concurrency: int,
+) -> List[Any]:
+    """同时处理至多 ``concurrency`` 个 URL，共用一份 :class:`DownloadContext`。
+
+    每个 URL 各有一组进度条，结束后移除；汇总结果保持链接原顺序。
+    """
+    results: List[Any] = [None] * len(urls)
+    url_slots = asyncio.Semaphore(concurrency)
+    # 多个 URL 同时发现登录失效时只弹一次登录，其余等它完成后直接重试。
+    relogin_lock = asyncio.Lock()
+
+    async with DownloadContext(config, cookie_manager) as context:
+
+        async def _process(index: int, url: str) -> None:
+            async with url_slots:
+                reporter = display.open_url(index + 1, len(urls), url)
+                try:
+                    result = await _run_with_relogin(
+                        lambda: download_url(
+                            url,
+                            config,
+                            cookie_manager,
+                            database,
+                            progress_reporter=reporter,
+                            context=context,
+                        ),
+                        cookie_manager,
+                        serve=False,
+                        relogin_lock=relogin_lock,
+                    )
+                    if result:
+                        results[index] = result
+                        reporter.complete(result)
+                    else:
+                        reporter.fail("下载失败或链接无效")
+                finally:
+                    reporter.close()
+
+        tasks = [asyncio.create_task(_process(i, url)) for i, url in enumerate(urls)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    return [result for result in results if result]
+
+
 async def _run_discovery_subcommand(
     args, config: ConfigLoader, cookie_manager: CookieManager
 ) -> None:
@@ -318,6 +486,9 @@ async def _run_discovery_subcommand(
     async with DouyinAPIClient(
         cookie_manager.get_cookies(),
         proxy=config.get("proxy"),
+        connection_config=config.get("connection"),
+        rate_limiter=RateLimiter.from_config(config),
+        signing_config=config.get("signing"),
     ) as api_client:
         if args.hot_board is not None:
             display.print_info("拉取抖音热搜榜...")
@@ -387,6 +558,13 @@ def main():
     parser.add_argument("-c", "--config", help="Config file path (default: config.yml)")
     parser.add_argument("-p", "--path", help="Save path")
     parser.add_argument("-t", "--thread", type=int, help="Thread count")
+    parser.add_argument(
+        "--url-concurrency",
+        type=int,
+        default=None,
+        metavar="N",
+        help="同时处理的链接数（共享 thread 下载并发上限）",
+    )
     parser.add_argument("--show-warnings", action="store_true", help="Show warning logs in console")
     parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose console logs")
     parser.add_argument(
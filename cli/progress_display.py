@@ -16,131 +16,53 @@ from rich.table import Table
 console = Console()
 
 
-class ProgressDisplay:
-    _URL_STEP_TOTAL = 6
-
-    def __init__(self):
-        self.console = console
-        self._progress_ctx: Optional[Progress] = None
-        self._progress: Optional[Progress] = None
-        self._overall_task_id: Optional[int] = None
-        self._url_task_id: Optional[int] = None
-        self._item_task_id: Optional[int] = None
-        self._url_index = 0
-        self._url_total = 0
-        self._url_step_completed = 0
-        self._item_total = 0
-        self._item_completed = 0
-        self._single_url_item_mode = False
-        self._item_stats = {"success": 0, "failed": 0, "skipped": 0}
-
-    def show_banner(self):
-        banner = """
-╔══════════════════════════════════════════╗
-║     Douyin Downloader v2.0.0            ║
-║     抖音批量下载工具                     ║
-╚══════════════════════════════════════════╝
-        """
-        self._active_console().print(banner, style="bold cyan")
-
-    def create_progress(self) -> Progress:
-        return Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            TaskProgressColumn(),
-            TimeRemainingColumn(),
-            TextColumn("[dim]{task.fields[detail]}"),
-            console=self.console,
-            transient=True,
-            refresh_per_second=6,
-        )
-
-    def start_download_session(self, total_urls: int):
-        if self._progress is not None:
-            return
-
-        self._progress_ctx = self.create_progress()
-        self._progress = self._progress_ctx.__enter__()
-        self._single_url_item_mode = False
-        self._overall_task_id = self._progress.add_task(
-            "总体进度",
-            total=max(total_urls, 1),
-            completed=0,
-            detail=f"共 {total_urls} 个 URL",
-        )
+class UrlProgress:
+    """单个 URL 的进度条（步骤条 + 作品条）。
 
-    def stop_download_session(self):
-        self._cleanup_url_tasks()
+    CLI 并发处理多个 URL 时，每个 URL 各持一个实例作为 ``progress_reporter``，
+    互不覆盖；它们共享同一个 rich ``Progress`` 与总体进度条。
+    """
 
-        if self._progress_ctx is not None:
-            self._progress_ctx.__exit__(None, None, None)
+    _STEP_TOTAL = 6
 
-        self._progress_ctx = None
-        self._progress = None
-        self._overall_task_id = None
-        self._single_url_item_mode = False
-
-    def start_url(self, index: int, total: int, url: str):
-        self._url_index = index
-        self._url_total = total
-        self._url_step_completed = 0
+    def __init__(self, display: "ProgressDisplay", index: int, total: int, url: str):
+        self._display = display
+        self._index = index
+        self._total = total
+        self._step_completed = 0
         self._item_total = 0
         self._item_completed = 0
         self._item_stats = {"success": 0, "failed": 0, "skipped": 0}
+        self._url_task_id: Optional[int] = None
+        self._item_task_id: Optional[int] = None
 
-        self._cleanup_url_tasks()
-        if not self._progress:
+        progress = self._progress
+        if progress is None:
             return
-
-        self._url_task_id = self._progress.add_task(
+        self._url_task_id = progress.add_task(
             self._format_url_description("待开始"),
-            total=self._URL_STEP_TOTAL,
+            total=self._STEP_TOTAL,
             completed=0,
-            detail=self._shorten(url, max_len=72),
+            detail=ProgressDisplay._shorten(url, max_len=72),
         )
 
-    def complete_url(self, result=None):
-        if self._progress and self._url_task_id is not None:
-            detail = ""
-            if result:
-                detail = f"成功 {result.success} / 失败 {result.failed} / 跳过 {result.skipped}"
-            self._progress.update(
-                self._url_task_id,
-                completed=self._URL_STEP_TOTAL,
-                description=self._format_url_description("完成"),
-                detail=detail,
-            )
+    @property
+    def _progress(self) -> Optional[Progress]:
+        return self._display._progress
 
-        if self._progress and self._overall_task_id is not None:
-            if self._single_url_item_mode:
-                self._progress.update(self._overall_task_id, completed=self._item_total or 1)
-            else:
-                self._progress.advance(self._overall_task_id, 1)
-
-    def fail_url(self, reason: str):
-        if self._progress and self._url_task_id is not None:
-            self._progress.update(
-                self._url_task_id,
-                completed=self._URL_STEP_TOTAL,
-                description=self._format_url_description("失败"),
-                detail=reason,
-            )
-
-        if self._progress and self._overall_task_id is not None:
-            if self._single_url_item_mode:
-                self._progress.update(self._overall_task_id, completed=self._item_total or 1)
-            else:
-                self._progress.advance(self._overall_task_id, 1)
+    @property
+    def _drives_overall(self) -> bool:
+        # 只有一个 URL 时，总体进度条改为按作品数推进。
+        return self._total == 1 and self._display._overall_task_id is not None
 
     def advance_step(self, step: str, detail: str = ""):
         if not self._progress or self._url_task_id is None:
             return
 
-        self._url_step_completed = min(self._url_step_completed + 1, self._URL_STEP_TOTAL)
+        self._step_completed = min(self._step_completed + 1, self._STEP_TOTAL)
         self._progress.update(
             self._url_task_id,
-            completed=self._url_step_completed,
+            completed=self._step_completed,
             description=self._format_url_description(step),
             detail=detail,
         )
@@ -163,10 +85,10 @@ class ProgressDisplay:
         self._item_completed = 1 if total == 0 else 0
         self._item_stats = {"success": 0, "failed": 0, "skipped": 0}
 
-        if self._url_total == 1 and self._overall_task_id is not None:
-            self._single_url_item_mode = True
+        if self._drives_overall:
+            self._display._single_url_item_mode = True
             self._progress.update(
-                self._overall_task_id,
+                self._display._overall_task_id,
                 total=self._item_total,
                 completed=self._item_completed,
                 detail=f"共 {total} 个作品",
@@ -192,6 +114,28 @@ class ProgressDisplay:
             detail=item_detail,
         )
 
+    def extend_item_total(self, total: int, detail: str = ""):
+        """流式下载时作品总数随分页增长：只调大总数，不重置已完成数与统计。"""
+        if not self._progress:
+            return
+        if self._item_task_id is None:
+            self.set_item_total(total, detail)
+            return
+
+        self._item_total = max(total, self._item_completed, 1)
+        self._progress.update(
+            self._item_task_id,
+            total=self._item_total,
+            description=self._format_item_description(),
+            detail=detail,
+        )
+        if self._display._single_url_item_mode and self._drives_overall:
+            self._progress.update(
+                self._display._overall_task_id,
+                total=self._item_total,
+                detail=f"共 {self._item_total} 个作品",
+            )
+
     def advance_item(self, status: str, detail: str = ""):
         if not self._progress:
             return
@@ -206,7 +150,7 @@ class ProgressDisplay:
 
         status_map = {"success": "成功", "failed": "失败", "skipped": "跳过"}
         status_text = status_map.get(status, status)
-        item_detail = f"最近: {status_text} {self._shorten(detail, max_len=36)}"
+        item_detail = f"最近: {status_text} {ProgressDisplay._shorten(detail, max_len=36)}"
 
         self._progress.update(
             self._item_task_id,
@@ -214,13 +158,154 @@ class ProgressDisplay:
             description=self._format_item_description(),
             detail=item_detail,
         )
-        if self._single_url_item_mode and self._overall_task_id is not None:
+        if self._display._single_url_item_mode and self._drives_overall:
             self._progress.update(
-                self._overall_task_id,
+                self._display._overall_task_id,
                 completed=self._item_completed,
                 detail=f"共 {self._item_total} 个作品",
             )
 
+    def complete(self, result=None):
+        detail = ""
+        if result:
+            detail = f"成功 {result.success} / 失败 {result.failed} / 跳过 {result.skipped}"
+        self._finish("完成", detail)
+
+    def fail(self, reason: str):
+        self._finish("失败", reason)
+
+    def close(self):
+        """移除本 URL 的进度条。"""
+        progress = self._progress
+        if progress is not None:
+            for task_id in (self._item_task_id, self._url_task_id):
+                if task_id is not None:
+                    progress.remove_task(task_id)
+        self._item_task_id = None
+        self._url_task_id = None
+
+    def _finish(self, step: str, detail: str):
+        progress = self._progress
+        if progress and self._url_task_id is not None:
+            progress.update(
+                self._url_task_id,
+                completed=self._STEP_TOTAL,
+                description=self._format_url_description(step),
+                detail=detail,
+            )
+
+        overall_task_id = self._display._overall_task_id
+        if progress and overall_task_id is not None:
+            if self._display._single_url_item_mode and self._drives_overall:
+                progress.update(overall_task_id, completed=self._item_total or 1)
+            else:
+                progress.advance(overall_task_id, 1)
+
+    def _format_url_description(self, step: str) -> str:
+        return f"URL {self._index}/{self._total} · {step}"
+
+    def _format_item_description(self) -> str:
+        return (
+            "作品下载 "
+            f"S:{self._item_stats['success']} "
+            f"F:{self._item_stats['failed']} "
+            f"K:{self._item_stats['skipped']}"
+        )
+
+
+class ProgressDisplay:
+    def __init__(self):
+        self.console = console
+        self._progress_ctx: Optional[Progress] = None
+        self._progress: Optional[Progress] = None
+        self._overall_task_id: Optional[int] = None
+        # 顺序模式下「当前」URL 的进度；并发模式下各 URL 自行持有 UrlProgress。
+        self._current_url: Optional[UrlProgress] = None
+        self._single_url_item_mode = False
+
+    def show_banner(self):
+        banner = """
+╔══════════════════════════════════════════╗
+║     Douyin Downloader v2.0.0            ║
+║     抖音批量下载工具                     ║
+╚══════════════════════════════════════════╝
+        """
+        self._active_console().print(banner, style="bold cyan")
+
+    def create_progress(self) -> Progress:
+        return Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TaskProgressColumn(),
+            TimeRemainingColumn(),
+            TextColumn("[dim]{task.fields[detail]}"),
+            console=self.console,
+            transient=True,
+            refresh_per_second=6,
+        )
+
+    def start_download_session(self, total_urls: int):
+        if self._progress is not None:
+            return
+
+        self._progress_ctx = self.create_progress()
+        self._progress = self._progress_ctx.__enter__()
+        self._single_url_item_mode = False
+        self._overall_task_id = self._progress.add_task(
+            "总体进度",
+            total=max(total_urls, 1),
+            completed=0,
+            detail=f"共 {total_urls} 个 URL",
+        )
+
+    def stop_download_session(self):
+        self._cleanup_url_tasks()
+
+        if self._progress_ctx is not None:
+            self._progress_ctx.__exit__(None, None, None)
+
+        self._progress_ctx = None
+        self._progress = None
+        self._overall_task_id = None
+        self._single_url_item_mode = False
+
+    def open_url(self, index: int, total: int, url: str) -> UrlProgress:
+        """为一个 URL 新建独立进度条，不影响其它正在进行的 URL。"""
+        return UrlProgress(self, index, total, url)
+
+    def start_url(self, index: int, total: int, url: str):
+        self._cleanup_url_tasks()
+        self._current_url = self.open_url(index, total, url)
+
+    def complete_url(self, result=None):
+        if self._current_url is not None:
+            self._current_url.complete(result)
+
+    def fail_url(self, reason: str):
+        if self._current_url is not None:
+            self._current_url.fail(reason)
+
+    def advance_step(self, step: str, detail: str = ""):
+        if self._current_url is not None:
+            self._current_url.advance_step(step, detail)
+
+    def update_step(self, step: str, detail: str = ""):
+        if self._current_url is not None:
+            self._current_url.update_step(step, detail)
+
+    def set_item_total(self, total: int, detail: str = ""):
+        if self._current_url is not None:
+            self._current_url.set_item_total(total, detail)
+
+    def extend_item_total(self, total: int, detail: str = ""):
+        if self._current_url is not None:
+            self._current_url.extend_item_total(total, detail)
+
+    def advance_item(self, status: str, detail: str = ""):
+        if self._current_url is not None:
+            self._current_url.advance_item(status, detail)
+
     def show_result(self, result):
         table = Table(title="Download Summary", show_header=True, header_style="bold magenta")
         table.add_column("Metric", style="cyan")
@@ -250,28 +335,9 @@ class ProgressDisplay:
         self._active_console().print(f"[red]✗[/red] {message}")
 
     def _cleanup_url_tasks(self):
-        if not self._progress:
-            self._url_task_id = None
-            self._item_task_id = None
-            return
-
-        if self._item_task_id is not None:
-            self._progress.remove_task(self._item_task_id)
-            self._item_task_id = None
-        if self._url_task_id is not None:
-            self._progress.remove_task(self._url_task_id)
-            self._url_task_id = None
-
-    def _format_url_description(self, step: str) -> str:
-        return f"URL {self._url_index}/{self._url_total} · {step}"
-
-    def _format_item_description(self) -> str:
-        return (
-            "作品下载 "
-            f"S:{self._item_stats['success']} "
-            f"F:{self._item_stats['failed']} "
-            f"K:{self._item_stats['skipped']}"
-        )
+        if self._current_url is not None:
+            self._current_url.close()
+            self._current_url = None
 
     def _active_console(self) -> Console:
         if self._progress:
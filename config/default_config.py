@@ -49,8 +49,89 @@ DEFAULT_CONFIG: Dict[str, Any] = {
     },
     "thread": 5,
     "retry_times": 3,
+    # 流式下载（用户主页类链接）。关闭时先翻完全部分页再开始下载；开启后
+    # 每拉到一页就交给下载 worker，时间 / 类型 / 数量过滤逐页生效。
+    #   streaming  - 开启边分页边下载。
+    #   queue_size - 待下载队列上限；队列满时暂停分页（背压）。
+    #   url_concurrency - CLI 同时处理的链接数；多个链接共用一个 API 连接池、
+    #                     限速器与 thread 下载并发上限。
+    "pipeline": {
+        "streaming": False,
+        "queue_size": 100,
+        "url_concurrency": 1,
+    },
+    # 媒体传输调优（可选）。
+    #   segments            - 单文件分段并发数；1 = 单流（默认）。>1 时对支持
+    #                         Range 的大文件按字节区间并发拉取，突破单连接吞吐上限。
+    #   segment_min_size_mb - 每段最小体积（MB），文件不够切两段时仍走单流。
+    #   resume              - 断点续传：失败/重启后保留 .tmp，下次用 Range 接着下载。
+    #   hedge_after_seconds - 镜像对冲：首个镜像超时无首字节（或过慢）时并行拉起
+    #                         下一个候选，先完成者胜出；0 = 关闭（逐个尝试）。
+    #   hedge_min_speed_kbps - 对冲吞吐下限（KB/s），0 = 只看首字节是否到达。
+    #   hedge_max_parallel  - 同一文件同时在跑的候选数上限。
+    #   cdn_scoreboard      - 按 CDN 主机记录 TTFB / 吞吐 / 失败率，给候选镜像排序。
+    #   cdn_scoreboard_path - 记分板持久化 JSON 路径；空 = 仅进程内。
+    #   httpx_max_connections / httpx_max_keepalive - 403 兜底用的复用 httpx 连接池上限。
+    #   httpx_http2         - httpx 兜底启用 HTTP/2（需额外安装 h2 包）。
+    "download": {
+        "segments": 1,
+        "segment_min_size_mb": 16,
+        "resume": False,
+        "hedge_after_seconds": 0,
+        "hedge_min_speed_kbps": 0,
+        "hedge_max_parallel": 2,
+        "cdn_scoreboard": True,
+        "cdn_scoreboard_path": "",
+        "httpx_max_connections": 20,
+        "httpx_max_keepalive": 10,
+        "httpx_http2": False,
+    },
     "rate_limit": 2,
+    # API 请求限速（令牌桶）。rate_limit 为全局桶起始速率（次/秒），burst 为
+    # 桶容量：空闲后最多 burst 个请求立即放行。
+    # adaptive（AIMD）：响应干净时每次加 increase_step 直到 max_rate；遇到
+    # 403/429、空 200 或验证页时乘以 decrease_factor（不低于 min_rate），并在
+    # recovery_seconds 内不再加速。默认关闭：rate_limit 仍是硬上限，升级后
+    # 不会自行提速；需要时显式开启并设置 max_rate（留空则等于 rate_limit，
+    # 即只降不升）。
+    # endpoints：按 API 路径前缀单独限速的桶（rate / burst），不占全局配额；
+    # 退避时与全局速率同比例升降。
+    "rate_control": {
+        "adaptive": False,
+        "min_rate": 0.5,
+        "max_rate": None,
+        "increase_step": 0.1,
+        "decrease_factor": 0.5,
+        "recovery_seconds": 30,
+        "burst": 3,
+        "endpoints": {
+            "/aweme/v1/web/comment/list/": {"rate": 2, "burst": 5},
+        },
+    },
     "proxy": "",
+    # HTTP 连接池（aiohttp 连接器）。API 请求与媒体下载各用独立连接池，
+    # 大文件下载不会挤占分页等 API 请求。limit / limit_per_host 为 0 表示不限。
+    #   limit             - 媒体连接池并发上限；thread 调高时相应调大。
+    #   limit_per_host    - 媒体连接池单主机并发上限。
+    #   api_limit         - API 连接池并发上限。
+    #   api_timeout       - API 请求总超时（秒）。
+    #   dns_cache_ttl     - DNS 缓存秒数；0 = 关闭缓存（每次连接都解析）。
+    #   keepalive_timeout - 空闲连接保活秒数，期间复用无需重新握手。
+    #   force_close       - 每个请求后关闭连接（排查问题用，会失去复用）。
+    "connection": {
+        "limit": 100,
+        "limit_per_host": 30,
+        "api_limit": 10,
+        "api_timeout": 30,
+        "dns_cache_ttl": 300,
+        "keepalive_timeout": 30,
+        "force_close": False,
+    },
+    # API 请求签名（a_bogus）。签名器按会话缓存，浏览器指纹与 UA 保持稳定。
+    #   rotate_every - 每签 N 个请求换一个新指纹；0 = 整个会话不换。
+    "signing": {
+        "rotate_every": 0,
+    },
     # 视频下载画质。可选值：
     #   "highest"  - 最高画质（默认）：先探测上传原片（ratio=default，转码档
     #                列表之外），比所选转码档大则优先下载；探测失败退回转码档
@@ -61,6 +142,33 @@ DEFAULT_CONFIG: Dict[str, Any] = {
     "video_quality": "highest",
     "database": True,
     "database_path": "dy_downloader.db",
+    # 本地媒体索引（判重用）：记录下载目录里已有的作品媒体（id → 路径 / 大小 /
+    # mtime）。persistent 开启时写入索引文件，重启后只重扫 mtime 变化过的目录；
+    # 关闭时每个进程首次判重都要全量扫描下载目录。
+    #   path         - 索引文件路径；空 = 下载根目录下的 .dy_local_index.json。
+    #   scan_workers - 全量 / 增量扫描时并发列举目录的线程数；1 = 单线程。
+    #   watch        - 仅 --serve：监听下载目录的增删改名并实时更新索引
+    #                  （需要 pip install watchdog）。
+    "local_index": {
+        "persistent": True,
+        "path": "",
+        "scan_workers": 8,
+        "watch": False,
+    },
+    # 把已下载作品 id 预载到内存并随写入维护，去重不再逐条查库。
+    # 其他进程（如桌面端）同时写同一个库时，它们的写入不会进缓存，默认关闭。
+    "database_cache_ids": False,
+    # 数据库写后台：作品 / 历史记录先入队，由后台任务攒够 batch_size 行或
+    # 等满 interval_ms 毫秒后在一个事务里提交。崩溃最多丢失一个窗口内的
+    # 记录（之前批量模式要等整个作者主页下完才落盘）。
+    "database_write_behind": {
+        "enabled": True,
+        "batch_size": 200,
+        "interval_ms": 500,
+    },
+    # 只读连接池大小：历史列表、排行、去重等读查询走独立连接，不再排在
+    # 写入后面（WAL 模式下读写并发）。0 = 所有查询共用写连接。
+    "database_read_connections": 2,
     "progress": {
         "quiet_logs": True,
     },
@@ -1,5 +1,21 @@
+from .cdn_scoreboard import CdnScoreboard
 from .queue_manager import QueueManager
 from .rate_limiter import RateLimiter
 from .retry_handler import RetryHandler
+from .work_scheduler import (
+    PRIORITY_COMMENTS,
+    PRIORITY_OPTIONAL,
+    PRIORITY_PRIMARY,
+    WorkScheduler,
+)
 
-__all__ = ["RateLimiter", "RetryHandler", "QueueManager"]
+__all__ = [
+    "RateLimiter",
+    "RetryHandler",
+    "QueueManager",
+    "CdnScoreboard",
+    "WorkScheduler",
+    "PRIORITY_PRIMARY",
+    "PRIORITY_OPTIONAL",
+    "PRIORITY_COMMENTS",
+]
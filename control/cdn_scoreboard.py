@@ -0,0 +1,218 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+from urllib.parse import parse_qs, urlparse
+
+from utils.logger import setup_logger
+
+logger = setup_logger("CdnScoreboard")
+
+T = TypeVar("T")
+
+# EWMA 平滑系数：越大越看重最近几次下载。CDN 节点健康度变化快，偏向近期。
+_EWMA_ALPHA = 0.3
+# 统计超过该时长未更新的主机视为「未知」，不再参与排序——昨天挂掉的镜像
+# 今天可能已经恢复，反之亦然。
+_DEFAULT_MAX_AGE_S = 3600.0
+# 估算代价时假定的传输体积：把首字节耗时和吞吐折算成同一量纲（秒）。
+_REFERENCE_BYTES = 1024 * 1024
+# 只有失败记录（没测到首字节 / 吞吐）的主机按该默认耗时估算。
+_DEFAULT_TTFB_S = 1.0
+_DEFAULT_TRANSFER_S = 1.0
+# 没有统计的主机按「正常」主机估算，快于它的已知主机前移、慢/常失败的后移。
+_UNKNOWN_HOST_COST_S = _DEFAULT_TTFB_S + _DEFAULT_TRANSFER_S
+# 失败率接近 1 时的代价放大上限（1 / 0.05 = 20 倍）。
+_MIN_SUCCESS_RATE = 0.05
+# 持久化写盘最小间隔，避免每个文件下载完都写一次。
+_SAVE_INTERVAL_S = 30.0
+# 记住多少个「候选地址形态 → 重定向落点主机」映射（只在内存里）。
+_MAX_REDIRECTS = 4096
+# 决定重定向落点的查询参数：同一域名 + 路径下，清晰度和线路相同的 play 地址
+# 会落到同一批节点；video_id、签名和时间戳每次都不一样，不参与匹配。
+_REDIRECT_KEY_PARAMS = ("ratio", "line")
+
+# 进程级共享实例（按持久化路径，空串 = 仅内存）。CLI 每个 URL、server 每个
+# job 都会新建 FileManager，共享后整批任务累积同一份统计。
+_SHARED_SCOREBOARDS: Dict[str, "CdnScoreboard"] = {}
+
+
+class CdnScoreboard:
+    """按 CDN 主机名记录下载表现，并据此给候选地址排序。
+
+    每次 ``FileManager.download_file`` 结束都会记录一次：首字节耗时
+    （TTFB）、吞吐和成败，均以 EWMA 平滑。排序时按「预计代价」升序：
+    ``(TTFB + 1MB / 吞吐) / 成功率``。没有（或统计已过期的）主机按一个
+    「正常」主机的代价估算；排序稳定，代价相同时维持原序。
+
+    统计按重定向后的实际落点主机记：抖音 ``/aweme/v1/play/`` 候选都在同一个
+    域名下，302 到不同的 ``v*-dy`` 节点。记录时带上 ``final_url``，排序时
+    同一形态（域名 + 路径 + ``ratio``/``line``）的候选地址——即使签名和
+    video_id 不同——会映射回上次落到的主机。
+    """
+
+    def __init__(
+        self,
+        persist_path: Optional[str] = None,
+        *,
+        max_age_seconds: float = _DEFAULT_MAX_AGE_S,
+    ):
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.max_age_seconds = max_age_seconds
+        self._hosts: Dict[str, Dict[str, float]] = {}
+        self._redirects: "OrderedDict[str, str]" = OrderedDict()
+        self._last_save = 0.0
+        if self.persist_path is not None:
+            self.load()
+
+    @classmethod
+    def shared(cls, persist_path: Optional[str] = None) -> "CdnScoreboard":
+        key = str(persist_path or "")
+        scoreboard = _SHARED_SCOREBOARDS.get(key)
+        if scoreboard is None:
+            scoreboard = cls(persist_path or None)
+            _SHARED_SCOREBOARDS[key] = scoreboard
+        return scoreboard
+
+    @classmethod
+    def from_config(cls, download_config: Optional[Dict[str, Any]]) -> Optional["CdnScoreboard"]:
+        """按 ``download`` 配置段取共享记分板；``cdn_scoreboard`` 关闭时返回 None。"""
+        options = download_config if isinstance(download_config, dict) else {}
+        if not options.get("cdn_scoreboard", True):
+            return None
+        return cls.shared(str(options.get("cdn_scoreboard_path") or "").strip() or None)
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        try:
+            return (urlparse(url).hostname or "").lower()
+        except ValueError:
+            return ""
+
+    @staticmethod
+    def redirect_key(url: str) -> str:
+        """``url`` 在重定向映射里的键：主机 + 路径 + 决定落点的查询参数。"""
+        try:
+            parsed = urlparse(url)
+            host = (parsed.hostname or "").lower()
+        except ValueError:
+            return ""
+        if not host:
+            return ""
+        query = parse_qs(parsed.query)
+        params = "&".join(
+            f"{name}={query[name][0]}" for name in _REDIRECT_KEY_PARAMS if query.get(name)
+        )
+        return f"{host}{parsed.path}?{params}"
+
+    def resolve_host(self, url: str) -> str:
+        """``url`` 统计所用的主机：同形态地址上次重定向到的落点，没有则为自身主机。"""
+        return self._redirects.get(self.redirect_key(url)) or self.host_of(url)
+
+    def record(
+        self,
+        url: str,
+        *,
+        final_url: Optional[str] = None,
+        ok: bool,
+        ttfb: Optional[float] = None,
+        size: int = 0,
+        elapsed: float = 0.0,
+    ) -> None:
+        host = self.host_of(final_url) if final_url else ""
+        if host and host != self.host_of(url):
+            key = self.redirect_key(url)
+            self._redirects[key] = host
+            self._redirects.move_to_end(key)
+            while len(self._redirects) > _MAX_REDIRECTS:
+                self._redirects.popitem(last=False)
+        host = host or self.resolve_host(url)
+        if not host:
+            return
+        stats = self._hosts.get(host)
+        if stats is None or self._is_stale(stats):
+            stats = {"samples": 0, "error_rate": 0.0}
+            self._hosts[host] = stats
+
+        first = stats["samples"] == 0
+        stats["samples"] += 1
+        stats["error_rate"] = self._ewma(stats["error_rate"], 0.0 if ok else 1.0, first)
+        if ttfb is not None:
+            stats["ttfb"] = self._ewma(stats.get("ttfb"), ttfb, "ttfb" not in stats)
+        transfer_time = elapsed - (ttfb or 0.0)
+        if ok and size > 0 and transfer_time > 0:
+            bps = size / transfer_time
+            stats["bps"] = self._ewma(stats.get("bps"), bps, "bps" not in stats)
+        stats["updated_at"] = time.time()
+
+        if self.persist_path is not None and time.monotonic() - self._last_save >= _SAVE_INTERVAL_S:
+            self.save()
+
+    def cost(self, host: str) -> Optional[float]:
+        """预计下载 1MB 的耗时（秒）；未知或过期主机返回 ``None``。"""
+        stats = self._hosts.get(host)
+        if stats is None or self._is_stale(stats):
+            return None
+        ttfb = stats.get("ttfb", _DEFAULT_TTFB_S)
+        bps = stats.get("bps")
+        transfer = _REFERENCE_BYTES / bps if bps else _DEFAULT_TRANSFER_S
+        success_rate = max(1.0 - stats["error_rate"], _MIN_SUCCESS_RATE)
+        return (ttfb + transfer) / success_rate
+
+    def rank(self, items: Sequence[T], key: Callable[[T], str] = str) -> List[T]:
+        """按主机历史表现稳定排序；没有任何已知主机时原样返回。"""
+        costs = [self.cost(self.resolve_host(key(item))) for item in items]
+        if all(c is None for c in costs):
+            return list(items)
+        order = sorted(
+            range(len(items)),
+            key=lambda i: costs[i] if costs[i] is not None else _UNKNOWN_HOST_COST_S,
+        )
+        return [items[i] for i in order]
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {
+            host: {**stats, "cost": self.cost(host)}
+            for host, stats in self._hosts.items()
+            if not self._is_stale(stats)
+        }
+
+    def load(self) -> None:
+        if self.persist_path is None or not self.persist_path.exists():
+            return
+        try:
+            data = json.loads(self.persist_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.debug("Failed to load CDN scoreboard %s: %s", self.persist_path, e)
+            return
+        if not isinstance(data, dict):
+            return
+        for host, stats in data.items():
+            if isinstance(stats, dict) and isinstance(stats.get("samples"), (int, float)):
+                self._hosts[str(host)] = {
+                    k: float(v) for k, v in stats.items() if isinstance(v, (int, float))
+                }
+
+    def save(self) -> None:
+        if self.persist_path is None:
+            return
+        self._last_save = time.monotonic()
+        fresh = {h: s for h, s in self._hosts.items() if not self._is_stale(s)}
+        tmp_path = self.persist_path.with_suffix(self.persist_path.suffix + ".tmp")
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(fresh), encoding="utf-8")
+            os.replace(str(tmp_path), str(self.persist_path))
+        except OSError as e:
+            logger.debug("Failed to save CDN scoreboard %s: %s", self.persist_path, e)
+
+    def _is_stale(self, stats: Dict[str, Any]) -> bool:
+        return time.time() - float(stats.get("updated_at", 0)) > self.max_age_seconds
+
+    @staticmethod
+    def _ewma(previous: Optional[float], value: float, first: bool) -> float:
+        if first or previous is None:
+            return float(value)
+        return previous + _EWMA_ALPHA * (value - previous)
@@ -1,6 +1,6 @@
-import asyncio
-from typing import Any, Callable, List, TypeVar
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable, List, TypeVar, Union
 
+from control.work_scheduler import PRIORITY_PRIMARY, WorkScheduler
 from utils.logger import setup_logger
 
 logger = setup_logger("QueueManager")
@@ -9,34 +9,76 @@ T = TypeVar("T")
 
 
 class QueueManager:
-    def __init__(self, max_workers: int = 5):
+    """下载任务入口：所有批量 / 流式下载都交给同一个 :class:`WorkScheduler`。
+
+    ``max_workers`` 个固定 worker 就是全局下载并发上限；同一个 QueueManager
+    上并发的多个批次（多个 URL / 模式）在 worker 间公平轮转。
+    """
+
+    def __init__(self, max_workers: int = 5, *, window: int = 100):
         self.max_workers = max_workers
-        self.semaphore = asyncio.Semaphore(max_workers)
+        self.scheduler = WorkScheduler(max_workers, window=window)
 
     async def process_tasks(self, tasks: List[Callable], *args, **kwargs) -> List[Any]:
-        # Failures surface as exception instances in the result list (via
-        # return_exceptions=True). Callers can filter with isinstance(r, BaseException).
+        # Failures surface as exception instances in the result list.
+        # Callers can filter with isinstance(r, BaseException).
         async def _task_wrapper(task):
-            async with self.semaphore:
-                try:
-                    return await task(*args, **kwargs)
-                except Exception:
-                    logger.exception("Task failed")
-                    raise
+            try:
+                return await task(*args, **kwargs)
+            except Exception as exc:
+                logger.exception("Task failed")
+                return exc
 
-        return await asyncio.gather(
-            *[_task_wrapper(task) for task in tasks], return_exceptions=True
-        )
+        return await self._ordered(_task_wrapper, tasks)
 
     async def download_batch(self, download_func: Callable, items: List[Any]) -> List[Any]:
+        """按输入顺序返回全部结果（失败项为异常实例）。
+
+        大列表请用 :meth:`stream`，结果逐个产出，不必整批攒在内存里。
+        """
+        return await self._ordered(self._guarded(download_func), items)
+
+    async def stream(
+        self,
+        download_func: Callable,
+        items: Union[Iterable[Any], AsyncIterable[Any]],
+        *,
+        priority: int = PRIORITY_PRIMARY,
+        window: int = 0,
+        name: str = "",
+    ) -> AsyncIterator[Any]:
+        """边提交边产出：结果按完成顺序 yield，失败项为异常实例。
+
+        在途条目不超过 ``window``（默认取调度器的窗口），``items`` 为异步
+        迭代器（如分页）时窗口满即暂停拉取上游。
+        """
+        async for result in self.scheduler.map(
+            self._guarded(download_func),
+            items,
+            priority=priority,
+            window=window or None,
+            name=name,
+        ):
+            yield result
+
+    async def _ordered(self, func: Callable, items: List[Any]) -> List[Any]:
+        results: List[Any] = [None] * len(items)
+
+        async def _indexed(entry):
+            index, item = entry
+            results[index] = await func(item)
+
+        async for _ in self.scheduler.map(_indexed, enumerate(items)):
+            pass
+        return results
+
+    @staticmethod
+    def _guarded(download_func: Callable) -> Callable:
         async def _download_wrapper(item):
-            async with self.semaphore:
-                try:
-                    return await download_func(item)
-                except Exception:
-                    logger.exception("Download failed for item: %r", item)
-                    raise
-
-        return await asyncio.gather(
-            *[_download_wrapper(item) for item in items], return_exceptions=True
-        )
+            try:
+                return await download_func(item)
+            except Exception as exc:
+                logger.exception("Download failed for item: %r", item)
+                return exc
+
+        return _download_wrapper
@@ -1,28 +1,198 @@
 import asyncio
 import random
 import time
+from typing import Any, Dict, Optional
+
+from utils.logger import setup_logger
+
+logger = setup_logger("RateLimiter")
+
+# 每次请求在 1 个令牌之外额外消耗的随机抖动（令牌数）。抖动与速率成比例，
+# 高速率下不会像固定 0.5s 抖动那样把实际吞吐压到 rate_limit 的几分之一。
+_JITTER_RATIO = 0.2
+# 同一波风控往往同时打到多个在途请求：该时长内的风控信号只降一次速。
+_BACKOFF_DEBOUNCE_S = 1.0
+
+
+def _positive(value: Any) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+
+class _TokenBucket:
+    """令牌桶：容量 ``burst``，每秒补充 ``rate`` 个。
+
+    令牌允许透支：``reserve`` 立即扣账并返回需要等待的秒数，调用方在
+    扣账之后睡眠，并发调用各自等到自己的时刻，不在锁里排队。
+    """
+
+    __slots__ = ("rate", "base_rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.base_rate = rate
+        self.burst = max(float(burst or 1), 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def reserve(self, jitter: float = 0.0) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        # 抖动只推迟后面的调用，桶里有令牌时本次仍立即放行。
+        self.tokens -= jitter
+        return delay
 
 
 class RateLimiter:
-    def __init__(self, max_per_second: float = 2):
+    """API 请求限速器：全局令牌桶 + 按接口路径的独立令牌桶，可选 AIMD 自适应。
+
+    ``acquire(endpoint)`` 从匹配 ``endpoint`` 的桶取令牌（按路径前缀，最长者
+    优先），没有配置专属桶的接口走全局桶。各桶互不占用：评论翻页再多也不会
+    挤掉作品分页的配额。桶满时 ``burst`` 个请求可以立即放行。
+
+    ``adaptive`` 开启时按 AIMD 调整速率：每个干净响应（``record_success``）
+    把速率加 ``increase_step``，直到 ``max_rate``；遇到风控信号
+    （``record_risk``：403/429、空 200、验证页）乘以 ``decrease_factor``，
+    不低于 ``min_rate``，并在 ``recovery_seconds`` 内暂停加速。
+    """
+
+    def __init__(
+        self,
+        max_per_second: float = 2,
+        *,
+        adaptive: bool = False,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        increase_step: float = 0.1,
+        decrease_factor: float = 0.5,
+        recovery_seconds: float = 30.0,
+        burst: float = 1,
+        endpoints: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
         if max_per_second <= 0:
             max_per_second = 2
         self.max_per_second = max_per_second
         self.min_interval = 1.0 / max_per_second
-        self.last_request = 0.0
-        self._lock = asyncio.Lock()
-
-    async def acquire(self):
-        async with self._lock:
-            current = time.time()
-            time_since_last = current - self.last_request
-
-            if time_since_last < self.min_interval:
-                wait_time = self.min_interval - time_since_last
-                await asyncio.sleep(wait_time)
-
-            # Jitter must run inside the lock so that the next caller waits
-            # min_interval since the actual fire time, not since the prior
-            # caller acquired the lock.
-            await asyncio.sleep(random.uniform(0, 0.5))
-            self.last_request = time.time()
+        self._bucket = _TokenBucket(max_per_second, burst)
+        self._endpoint_buckets: Dict[str, _TokenBucket] = {}
+        for prefix, options in (endpoints or {}).items():
+            options = options if isinstance(options, dict) else {}
+            rate = _positive(options.get("rate"))
+            if prefix and rate:
+                self._endpoint_buckets[str(prefix)] = _TokenBucket(
+                    rate, _positive(options.get("burst")) or 1
+                )
+        # 最长前缀优先匹配。
+        self._endpoint_prefixes = sorted(self._endpoint_buckets, key=len, reverse=True)
+        self.adaptive = bool(adaptive)
+        self.min_rate = min(_positive(min_rate) or max_per_second / 4, max_per_second)
+        self.max_rate = max(_positive(max_rate) or max_per_second, max_per_second)
+        self.increase_step = _positive(increase_step) or 0.1
+        factor = _positive(decrease_factor) or 0.5
+        self.decrease_factor = factor if factor < 1 else 0.5
+        self.recovery_seconds = max(float(recovery_seconds or 0), 0.0)
+
+        self._hold_until = 0.0
+        self._last_backoff = float("-inf")
+        self._successes = 0
+        self._risk_signals = 0
+        self._backoffs = 0
+        self._last_risk_reason = ""
+
+    @classmethod
+    def from_config(cls, config: Any) -> "RateLimiter":
+        """按 ``rate_limit``（起始速率）与 ``rate_control`` 配置段构建。"""
+        options = config.get("rate_control") or {}
+        if not isinstance(options, dict):
+            options = {}
+        endpoints = options.get("endpoints")
+        return cls(
+            max_per_second=float(config.get("rate_limit", 2) or 2),
+            adaptive=bool(options.get("adaptive", False)),
+            min_rate=options.get("min_rate"),
+            max_rate=options.get("max_rate"),
+            increase_step=options.get("increase_step", 0.1),
+            decrease_factor=options.get("decrease_factor", 0.5),
+            recovery_seconds=options.get("recovery_seconds", 30.0),
+            burst=options.get("burst", 1),
+            endpoints=endpoints if isinstance(endpoints, dict) else None,
+        )
+
+    async def acquire(self, endpoint: Optional[str] = None):
+        # 扣账与睡眠之间没有共享状态的读写，在事件循环里天然互斥，不需要锁。
+        bucket = self._bucket_for(endpoint)
+        delay = bucket.reserve(random.uniform(0, _JITTER_RATIO))
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _bucket_for(self, endpoint: Optional[str]) -> _TokenBucket:
+        if endpoint:
+            for prefix in self._endpoint_prefixes:
+                if endpoint.startswith(prefix):
+                    return self._endpoint_buckets[prefix]
+        return self._bucket
+
+    def record_success(self) -> None:
+        self._successes += 1
+        if not self.adaptive or self.max_per_second >= self.max_rate:
+            return
+        if time.monotonic() < self._hold_until:
+            return
+        self._set_rate(min(self.max_per_second + self.increase_step, self.max_rate))
+
+    def record_risk(self, reason: str) -> None:
+        self._risk_signals += 1
+        self._last_risk_reason = reason
+        if not self.adaptive:
+            return
+        now = time.monotonic()
+        self._hold_until = now + self.recovery_seconds
+        if now - self._last_backoff < _BACKOFF_DEBOUNCE_S:
+            return
+        self._last_backoff = now
+        self._backoffs += 1
+        previous = self.max_per_second
+        self._set_rate(max(previous * self.decrease_factor, self.min_rate))
+        # 清空积攒的突发额度，退避后不会先放一波请求出去。
+        for bucket in (self._bucket, *self._endpoint_buckets.values()):
+            bucket.tokens = min(bucket.tokens, 0.0)
+        logger.warning(
+            "Risk-control signal (%s): rate %.2f/s -> %.2f/s, hold increases for %.0fs",
+            reason,
+            previous,
+            self.max_per_second,
+            self.recovery_seconds,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """当前速率与退避状态。"""
+        return {
+            "rate": round(self.max_per_second, 3),
+            "min_rate": round(self.min_rate, 3),
+            "max_rate": round(self.max_rate, 3),
+            "adaptive": self.adaptive,
+            "in_backoff": self.adaptive and time.monotonic() < self._hold_until,
+            "successes": self._successes,
+            "risk_signals": self._risk_signals,
+            "backoffs": self._backoffs,
+            "last_risk_reason": self._last_risk_reason,
+            "buckets": {
+                prefix: {"rate": round(bucket.rate, 3), "burst": bucket.burst}
+                for prefix, bucket in self._endpoint_buckets.items()
+            },
+        }
+
+    def _set_rate(self, rate: float) -> None:
+        self.max_per_second = rate
+        self.min_interval = 1.0 / rate
+        self._bucket.rate = rate
+        # 风控不分接口：各接口桶按与全局速率相同的比例一起升降。
+        scale = rate / self._bucket.base_rate
+        for bucket in self._endpoint_buckets.values():
+            bucket.rate = bucket.base_rate * scale
@@ -0,0 +1,259 @@
+import asyncio
+from collections import deque
+from contextvars import ContextVar
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Union,
+)
+
+from utils.logger import setup_logger
+
+logger = setup_logger("WorkScheduler")
+
+# 优先级（数值越小越先执行）：主媒体 > 可选附件（封面/音乐/头像）> 评论。
+# 空闲 worker 总是先取高优先级的工作，低优先级只填补剩余的并发。
+PRIORITY_PRIMARY = 0
+PRIORITY_OPTIONAL = 1
+PRIORITY_COMMENTS = 2
+_PRIORITIES = (PRIORITY_PRIMARY, PRIORITY_OPTIONAL, PRIORITY_COMMENTS)
+
+_DEFAULT_WINDOW = 100
+
+# 当前正在执行的工作所属 job；worker 内部再提交的子工作（附件、评论）
+# 归入同一 job 参与公平调度。
+_current_job: ContextVar[Optional["SchedulerJob"]] = ContextVar("scheduler_job", default=None)
+
+
+class _WorkItem:
+    __slots__ = ("job", "func", "args", "future", "claimed", "task")
+
+    def __init__(self, job: "SchedulerJob", func: Callable[..., Awaitable[Any]], args, future):
+        self.job = job
+        self.func = func
+        self.args = args
+        self.future: asyncio.Future = future
+        # 已被 worker 或调用方认领；认领后的条目在队列里惰性跳过。
+        self.claimed = False
+        self.task: Optional[asyncio.Task] = None
+
+
+class SchedulerJob:
+    """一组同源工作（一次 ``map`` 调用）。
+
+    调度器在同一优先级内按 job 轮转取活，并发的多个 job（多个 URL / 模式）
+    平分 worker，不会被先提交的大 job 饿死。
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._queues: Dict[int, Deque[_WorkItem]] = {p: deque() for p in _PRIORITIES}
+        self._in_ring: Dict[int, bool] = {p: False for p in _PRIORITIES}
+        self._running: Set[_WorkItem] = set()
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """丢弃排队中的工作并取消正在执行的工作。"""
+        self.cancelled = True
+        for queue in self._queues.values():
+            while queue:
+                item = queue.popleft()
+                item.claimed = True
+                item.future.cancel()
+        for item in list(self._running):
+            if item.task is not None:
+                item.task.cancel()
+
+
+class WorkScheduler:
+    """固定数量的 worker 从多级队列取活的全局调度器。
+
+    - worker 数即全局下载并发上限；任务按需提交，不会为整批条目预先
+      创建协程或 Task。
+    - ``map`` 以滑动窗口提交条目、按完成顺序流式产出结果，内存占用与
+      列表长度无关；窗口满时暂停读取上游（背压）。
+    - 等待子工作（``gather``）时，没有空闲 worker 认领的子工作由调用方
+      就地执行，避免所有 worker 都在等子工作而死锁。
+    """
+
+    def __init__(self, max_workers: int = 5, *, window: int = _DEFAULT_WINDOW):
+        self.max_workers = max(int(max_workers or 1), 1)
+        self.window = max(int(window or 1), 1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: List[asyncio.Task] = []
+        self._rings: Dict[int, Deque[SchedulerJob]] = {p: deque() for p in _PRIORITIES}
+        self._available: Optional[asyncio.Semaphore] = None
+        self._default_job = SchedulerJob("default")
+
+    # ------------------------------------------------------------------ 提交
+
+    def submit(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+        priority: int = PRIORITY_PRIMARY,
+        job: Optional[SchedulerJob] = None,
+    ) -> asyncio.Future:
+        """提交一项工作，返回其结果 future（工作抛出的异常会设置到 future 上）。"""
+        return self._enqueue(func, args, priority, job).future
+
+    async def gather(
+        self,
+        calls: Iterable[Callable[[], Awaitable[Any]]],
+        *,
+        priority: int = PRIORITY_OPTIONAL,
+    ) -> List[Any]:
+        """并行执行一组无参调用，按顺序返回结果；失败项以异常实例出现。"""
+        items = [self._enqueue(call, (), priority, None) for call in calls]
+        # 调用方反正要等结果（常常自己就占着 worker）：先让出一次，给空闲
+        # worker 认领的机会，剩下的就地并发执行。
+        await asyncio.sleep(0)
+        inline = [item for item in items if not item.claimed]
+        for item in inline:
+            item.claimed = True
+        if inline:
+            await asyncio.gather(*(self._execute(item) for item in inline))
+        return list(await asyncio.gather(*(item.future for item in items), return_exceptions=True))
+
+    async def map(
+        self,
+        func: Callable[[Any], Awaitable[Any]],
+        items: Union[Iterable[Any], AsyncIterable[Any]],
+        *,
+        priority: int = PRIORITY_PRIMARY,
+        window: Optional[int] = None,
+        name: str = "",
+    ) -> AsyncIterator[Any]:
+        """对 ``items`` 逐个执行 ``func``，按完成顺序产出结果。
+
+        同时在途（已提交未产出）的条目不超过 ``window``。``func`` 抛出的异常
+        原样在迭代中抛出；调用方提前结束迭代时，剩余工作会被取消。
+        """
+        job = SchedulerJob(name)
+        limit = max(int(window or self.window), 1)
+        in_flight: Set[asyncio.Future] = set()
+
+        async def _drain(until: int) -> AsyncIterator[Any]:
+            while len(in_flight) > until:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    in_flight.discard(future)
+                    yield future.result()
+
+        try:
+            if isinstance(items, AsyncIterable):
+                async for item in items:
+                    async for result in _drain(limit - 1):
+                        yield result
+                    in_flight.add(self.submit(func, item, priority=priority, job=job))
+            else:
+                for item in items:
+                    async for result in _drain(limit - 1):
+                        yield result
+                    in_flight.add(self.submit(func, item, priority=priority, job=job))
+            async for result in _drain(0):
+                yield result
+        finally:
+            if in_flight:
+                job.cancel()
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+    # ------------------------------------------------------------------ 内部
+
+    def _enqueue(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        args: tuple,
+        priority: int,
+        job: Optional[SchedulerJob],
+    ) -> _WorkItem:
+        if priority not in self._rings:
+            raise ValueError(f"Unknown priority: {priority}")
+        loop = self._ensure_started()
+        job = job or _current_job.get() or self._default_job
+        item = _WorkItem(job, func, args, loop.create_future())
+        job._queues[priority].append(item)
+        if not job._in_ring[priority]:
+            job._in_ring[priority] = True
+            self._rings[priority].append(job)
+        assert self._available is not None
+        self._available.release()
+        return item
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or all(worker.done() for worker in self._workers):
+            # 首次使用，或换了事件循环（测试里多次 asyncio.run）：旧循环上的
+            # worker 与队列都已失效，整体重建。
+            self._loop = loop
+            self._rings = {p: deque() for p in _PRIORITIES}
+            self._default_job = SchedulerJob("default")
+            self._available = asyncio.Semaphore(0)
+            self._workers = [loop.create_task(self._worker_loop()) for _ in range(self.max_workers)]
+        return loop
+
+    def _pop(self) -> Optional[_WorkItem]:
+        for priority in _PRIORITIES:
+            ring = self._rings[priority]
+            while ring:
+                job = ring.popleft()
+                queue = job._queues[priority]
+                while queue and queue[0].claimed:
+                    queue.popleft()
+                if not queue:
+                    job._in_ring[priority] = False
+                    continue
+                item = queue.popleft()
+                if queue:
+                    ring.append(job)
+                else:
+                    job._in_ring[priority] = False
+                item.claimed = True
+                return item
+        return None
+
+    async def _worker_loop(self) -> None:
+        assert self._available is not None
+        available = self._available
+        while True:
+            await available.acquire()
+            item = self._pop()
+            if item is None:
+                continue
+            task = asyncio.get_running_loop().create_task(self._execute(item))
+            item.task = task
+            try:
+                await asyncio.wait([task])
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+
+    async def _execute(self, item: _WorkItem) -> None:
+        if item.future.done():
+            return
+        token = _current_job.set(item.job)
+        item.job._running.add(item)
+        try:
+            result = await item.func(*item.args)
+        except asyncio.CancelledError:
+            item.future.cancel()
+            if not item.job.cancelled:
+                raise
+        except Exception as exc:
+            if not item.future.done():
+                item.future.set_exception(exc)
+        else:
+            if not item.future.done():
+                item.future.set_result(result)
+        finally:
+            item.job._running.discard(item)
+            _current_job.reset(token)
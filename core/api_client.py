@@ -15,6 +15,7 @@ from urllib.parse import urlencode
 import aiohttp
 
 from auth import MsTokenManager
+from utils import json_codec
 from utils.cookie_utils import sanitize_cookies
 from utils.logger import safe_log_url, setup_logger
 from utils.xbogus import XBogus
@@ -45,6 +46,24 @@ _LOGIN_REQUIRED_STATUS_CODES = {2483}
 # that walk many pages degrade gracefully on an exhausted fetch instead.
 _RISK_CONTROL_HTTP_STATUSES = frozenset({403, 429})
 
+# aiohttp 连接器默认值（``connection`` 配置段可覆盖）。签名 API 调用与 CDN
+# 媒体传输各用一个 session / 连接池：长时间占着连接的视频流不会挤占分页、
+# 评论等小而对延迟敏感的 API 请求。aiohttp 默认 limit=100、DNS 缓存仅 10s、
+# keep-alive 15s，thread 调高后连接数与反复 DNS 解析会先成为瓶颈。
+#   limit / limit_per_host - 媒体连接池上限（0 沿用 aiohttp 语义「不限」）
+#   api_limit              - API 连接池上限（同时作为单主机上限）
+#   api_timeout            - API 请求总超时（秒）；媒体请求由调用方逐个设置
+_DEFAULT_CONNECTION_OPTIONS: Dict[str, Any] = {
+    "limit": 100,
+    "limit_per_host": 30,
+    "api_limit": 10,
+    "api_timeout": 30,
+    "dns_cache_ttl": 300,
+    "keepalive_timeout": 30,
+    "force_close": False,
+}
+_CONNECTION_POOLS = ("api", "media")
+
 _HOMEPAGE_SCREENSHOT_BRIDGE_ENV = "DOUYIN_HOMEPAGE_SCREENSHOT_BRIDGE"
 _HOMEPAGE_SCREENSHOT_MESSAGE_PREFIX = "DOUYIN_HOMEPAGE_SCREENSHOT_REQUEST "
 _HOMEPAGE_PROFILE_READY_SCRIPT = r"""(expected) => {
@@ -145,6 +164,18 @@ def _is_login_required(data: object) -> bool:
     return code in _LOGIN_REQUIRED_STATUS_CODES or "请先登录" in msg or "用户未登录" in msg
 
 
+def _extract_risk_flags(raw: Dict[str, Any]) -> Dict[str, bool]:
+    not_login_module = raw.get("not_login_module")
+    return {
+        "login_tip": bool(
+            not_login_module.get("guide_login_tip_exist")
+            if isinstance(not_login_module, dict)
+            else False
+        ),
+        "verify_page": bool(raw.get("verify_ticket")),
+    }
+
+
 def _summarize_api_response(data: object) -> Dict[str, Any]:
     """Keep response-shape diagnostics without persisting item payloads."""
 
@@ -248,10 +279,34 @@ class DouyinAPIClient:
         "login_time",
     }
 
-    def __init__(self, cookies: Dict[str, str], proxy: Optional[str] = None):
+    def __init__(
+        self,
+        cookies: Dict[str, str],
+        proxy: Optional[str] = None,
+        *,
+        connection_config: Optional[Dict[str, Any]] = None,
+        rate_limiter: Optional[Any] = None,
+        signing_config: Optional[Dict[str, Any]] = None,
+    ):
         self.cookies = sanitize_cookies(cookies or {})
+        # 可选：每次请求前按接口路径取令牌，并把响应的风控信号反馈给
+        # RateLimiter（AIMD 自适应限速）。
+        self.rate_limiter = rate_limiter
         self.proxy = str(proxy or "").strip()
+        # API 调用（www.douyin.com 等）专用 session；媒体下载用 _media_session。
         self._session: Optional[aiohttp.ClientSession] = None
+        self._media_session: Optional[aiohttp.ClientSession] = None
+        self.connection_options = self._resolve_connection_options(connection_config)
+        self._connection_stats: Dict[str, Dict[str, int]] = {
+            pool: {
+                "requests": 0,
+                "connections_created": 0,
+                "connections_reused": 0,
+                "dns_cache_hits": 0,
+                "dns_cache_misses": 0,
+            }
+            for pool in _CONNECTION_POOLS
+        }
         self._browser_post_aweme_items: Dict[str, Dict[str, Any]] = {}
         self._browser_post_stats: Dict[str, int] = {}
         selected_ua = random.choice(_USER_AGENT_POOL)
@@ -266,6 +321,15 @@ class DouyinAPIClient:
         self._ms_token_manager = MsTokenManager(user_agent=self.headers["User-Agent"])
         self._ms_token = (self.cookies.get("msToken") or "").strip()
         self._abogus_enabled = ABogus is not None and BrowserFingerprintGenerator is not None
+        # a_bogus 签名器按 client 缓存：指纹 / UA 在会话内保持稳定，UA 相关的
+        # 哈希只算一次。rotate_every > 0 时每签 N 次换一个新指纹。
+        signing = signing_config if isinstance(signing_config, dict) else {}
+        try:
+            self._abogus_rotate_every = max(int(signing.get("rotate_every") or 0), 0)
+        except (TypeError, ValueError):
+            self._abogus_rotate_every = 0
+        self._abogus_signer: Optional[Any] = None
+        self._abogus_signed = 0
 
     async def __aenter__(self) -> "DouyinAPIClient":
         await self._ensure_session()
@@ -274,24 +338,133 @@ class DouyinAPIClient:
     async def __aexit__(self, exc_type, exc, tb):
         await self.close()
 
+    @staticmethod
+    def _resolve_connection_options(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        options = dict(_DEFAULT_CONNECTION_OPTIONS)
+        if not isinstance(config, dict):
+            return options
+        for key in (
+            "limit",
+            "limit_per_host",
+            "api_limit",
+            "api_timeout",
+            "dns_cache_ttl",
+            "keepalive_timeout",
+        ):
+            value = config.get(key)
+            if value is None:
+                continue
+            try:
+                options[key] = max(0, int(value))
+            except (TypeError, ValueError):
+                logger.warning("Ignoring invalid connection.%s: %r", key, value)
+        if "force_close" in config:
+            options["force_close"] = bool(config.get("force_close"))
+        return options
+
+    def _build_connector(self, pool: str = "media") -> aiohttp.TCPConnector:
+        options = self.connection_options
+        dns_cache_ttl = options["dns_cache_ttl"]
+        if pool == "api":
+            limit = limit_per_host = options["api_limit"]
+        else:
+            limit, limit_per_host = options["limit"], options["limit_per_host"]
+        connector_kwargs: Dict[str, Any] = {
+            "limit": limit,
+            "limit_per_host": limit_per_host,
+            "use_dns_cache": dns_cache_ttl > 0,
+            "ttl_dns_cache": dns_cache_ttl or None,
+            "force_close": options["force_close"],
+        }
+        # aiohttp 不允许 force_close 与 keepalive_timeout 同时设置。
+        if not options["force_close"]:
+            connector_kwargs["keepalive_timeout"] = options["keepalive_timeout"]
+        return aiohttp.TCPConnector(**connector_kwargs)
+
+    def _build_trace_config(self, pool: str = "media") -> aiohttp.TraceConfig:
+        """统计连接复用与 DNS 缓存命中，见 :meth:`connection_stats`。"""
+        stats = self._connection_stats[pool]
+
+        def _counter(key: str):
+            async def _increment(_session, _ctx, _params) -> None:
+                stats[key] += 1
+
+            return _increment
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(_counter("requests"))
+        trace_config.on_connection_create_end.append(_counter("connections_created"))
+        trace_config.on_connection_reuseconn.append(_counter("connections_reused"))
+        trace_config.on_dns_cache_hit.append(_counter("dns_cache_hits"))
+        trace_config.on_dns_cache_miss.append(_counter("dns_cache_misses"))
+        return trace_config
+
+    def connection_stats(self) -> Dict[str, Dict[str, Any]]:
+        """按连接池（``api`` / ``media``）返回新建 / 复用连接数、DNS 缓存命中与复用率。"""
+        result: Dict[str, Dict[str, Any]] = {}
+        for pool, counters in self._connection_stats.items():
+            stats: Dict[str, Any] = dict(counters)
+            acquired = stats["connections_created"] + stats["connections_reused"]
+            stats["reuse_ratio"] = (
+                round(stats["connections_reused"] / acquired, 3) if acquired else 0.0
+            )
+            result[pool] = stats
+        return result
+
+    def _new_session(self, pool: str, timeout: aiohttp.ClientTimeout) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(
+            headers=self.headers,
+            cookies=self.cookies,
+            timeout=timeout,
+            raise_for_status=False,
+            connector=self._build_connector(pool),
+            trace_configs=[self._build_trace_config(pool)],
+        )
+
     async def _ensure_session(self):
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession(
-                headers=self.headers,
-                cookies=self.cookies,
-                timeout=aiohttp.ClientTimeout(total=30),
-                raise_for_status=False,
+            self._session = self._new_session(
+                "api",
+                aiohttp.ClientTimeout(total=self.connection_options["api_timeout"] or None),
             )
 
+    async def _ensure_media_session(self):
+        if self._media_session is None or self._media_session.closed:
+            # 媒体请求（FileManager / 直播录制）逐个传入各自的超时，这里不设总时长。
+            self._media_session = self._new_session("media", aiohttp.ClientTimeout(total=None))
+
     async def close(self):
-        if self._session and not self._session.closed:
-            await self._session.close()
+        closed = False
+        for session in (self._session, self._media_session):
+            if session and not session.closed:
+                await session.close()
+                closed = True
+        if closed:
+            logger.debug("Connection stats: %s", self.connection_stats())
 
     async def get_session(self) -> aiohttp.ClientSession:
-        await self._ensure_session()
-        if self._session is None:
+        """媒体传输用的 session（独立连接池，不与 API 请求争抢连接）。"""
+        await self._ensure_media_session()
+        if self._media_session is None:
             raise RuntimeError("Failed to create aiohttp session")
-        return self._session
+        return self._media_session
+
+    def _update_session_cookies(self, cookies: Dict[str, str]) -> None:
+        for session in (self._session, self._media_session):
+            if session and not session.closed:
+                session.cookie_jar.update_cookies(cookies)
+
+    def replace_cookies(self, cookies: Dict[str, str]) -> None:
+        """整体替换登录态（重新登录后使用），不与旧 Cookie 合并。
+
+        CLI 并发处理多个 URL 时共用同一个 client，无法像单 URL 那样重建。
+        """
+        self.cookies = sanitize_cookies(cookies or {})
+        self._ms_token = (self.cookies.get("msToken") or "").strip()
+        for session in (self._session, self._media_session):
+            if session and not session.closed:
+                session.cookie_jar.clear()
+        self._update_session_cookies(self.cookies)
 
     async def _ensure_ms_token(self) -> str:
         if self._ms_token:
@@ -304,8 +477,7 @@ class DouyinAPIClient:
         self._ms_token = token.strip()
         if self._ms_token:
             self.cookies["msToken"] = self._ms_token
-            if self._session and not self._session.closed:
-                self._session.cookie_jar.update_cookies({"msToken": self._ms_token})
+            self._update_session_cookies({"msToken": self._ms_token})
         return self._ms_token
 
     async def _default_query(self) -> Dict[str, Any]:
@@ -373,8 +545,7 @@ class DouyinAPIClient:
             return None
 
         try:
-            browser_fp = BrowserFingerprintGenerator.generate_fingerprint("Chrome")
-            signer = ABogus(fp=browser_fp, user_agent=self.headers["User-Agent"])
+            signer = self._get_abogus_signer()
             body = urlencode(request_data or {})
             params_with_ab, _ab, ua, _body = signer.generate_abogus(query, body)
             return f"{base_url}?{params_with_ab}", ua
@@ -382,6 +553,17 @@ class DouyinAPIClient:
             logger.warning("Failed to generate a_bogus, fallback to X-Bogus: %s", exc)
             return None
 
+    def _get_abogus_signer(self) -> Any:
+        signer = self._abogus_signer
+        rotate = self._abogus_rotate_every and self._abogus_signed >= self._abogus_rotate_every
+        if signer is None or rotate or signer.user_agent != self.headers["User-Agent"]:
+            browser_fp = BrowserFingerprintGenerator.generate_fingerprint("Chrome")
+            signer = ABogus(fp=browser_fp, user_agent=self.headers["User-Agent"])
+            self._abogus_signer = signer
+            self._abogus_signed = 0
+        self._abogus_signed += 1
+        return signer
+
     async def _request_json(
         self,
         path: str,
@@ -403,6 +585,9 @@ class DouyinAPIClient:
         risk_control_hit = False
 
         for attempt in range(max_retries):
+            if self.rate_limiter is not None:
+                # 按接口路径取令牌：配置了专属桶的接口（如评论）不占全局配额。
+                await self.rate_limiter.acquire(path)
             started = time.monotonic()
             risk_control_hit = False
             signing_kwargs: Dict[str, Any] = {}
@@ -452,27 +637,25 @@ class DouyinAPIClient:
                                 retry_status,
                             )
                             last_exc = RuntimeError(f"Empty 200 response for {path} (anti-bot)")
+                            self._report_rate_signal("empty_200")
                             if attempt < max_retries - 1:
                                 delay = delays[min(attempt, len(delays) - 1)]
                                 await asyncio.sleep(delay)
                             continue
+                        # 已读到的 body 只解码一次（orjson 可用时走 orjson）。
                         try:
-                            data = await response.json(content_type=None)
-                        except Exception:
-                            import json as _json
-
-                            try:
-                                data = _json.loads(body)
-                            except Exception:
-                                logger.warning(
-                                    "Non-JSON 200 response for %s, length=%d duration_ms=%d",
-                                    path,
-                                    len(body),
-                                    _elapsed_ms(started),
-                                )
-                                return {}
+                            data = json_codec.loads(body)
+                        except (ValueError, UnicodeDecodeError):
+                            logger.warning(
+                                "Non-JSON 200 response for %s, length=%d duration_ms=%d",
+                                path,
+                                len(body),
+                                _elapsed_ms(started),
+                            )
+                            return {}
                         result = data if isinstance(data, dict) else {}
                         _log_api_response(path, attempt, max_retries, body, result, started)
+                        self._report_response_risk(result)
                         if _is_login_required(result):
                             raise LoginRequiredError(
                                 int(result.get("status_code") or 0),
@@ -481,6 +664,8 @@ class DouyinAPIClient:
                             )
                         return result
                     risk_control_hit = response.status in _RISK_CONTROL_HTTP_STATUSES
+                    if risk_control_hit:
+                        self._report_rate_signal(f"http_{response.status}")
                     if response.status < 500 and not risk_control_hit:
                         log_fn = logger.info if suppress_error else logger.error
                         log_fn(
@@ -545,6 +730,23 @@ class DouyinAPIClient:
         )
         return {}
 
+    def _report_rate_signal(self, risk: Optional[str]) -> None:
+        """``risk`` 为 None 表示干净响应，否则为风控原因。"""
+        if self.rate_limiter is None:
+            return
+        if risk is None:
+            self.rate_limiter.record_success()
+        else:
+            self.rate_limiter.record_risk(risk)
+
+    def _report_response_risk(self, result: Dict[str, Any]) -> None:
+        risk_flags = _extract_risk_flags(result)
+        if risk_flags["verify_page"]:
+            self._report_rate_signal("verify_page")
+        elif not risk_flags["login_tip"]:
+            # 登录引导在匿名 Cookie 下几乎每页都有，不算风控、也不据此加速。
+            self._report_rate_signal(None)
+
     @staticmethod
     def _normalize_paged_response(
         raw_data: Any,
@@ -583,14 +785,7 @@ class DouyinAPIClient:
         except (TypeError, ValueError):
             status_code = 0
 
-        risk_flags = {
-            "login_tip": bool(
-                ((raw.get("not_login_module") or {}).get("guide_login_tip_exist"))
-                if isinstance(raw.get("not_login_module"), dict)
-                else False
-            ),
-            "verify_page": bool(raw.get("verify_ticket")),
-        }
+        risk_flags = _extract_risk_flags(raw)
 
         normalized = {
             "items": items,
@@ -1776,6 +1971,5 @@ class DouyinAPIClient:
             return
 
         self.cookies.update(merged)
-        if self._session and not self._session.closed:
-            self._session.cookie_jar.update_cookies(merged)
+        self._update_session_cookies(merged)
         logger.warning("Synced %s browser cookie(s) back to API client", len(merged))
@@ -1,22 +1,29 @@
 import asyncio
+import functools
 import json
+import os
 import re
+import threading
+import time
 from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Protocol, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Sequence, Tuple
 from urllib.parse import urlparse
 
 import aiohttp
 
 from auth import CookieManager
 from config import ConfigLoader
-from control import QueueManager, RateLimiter, RetryHandler
+from control import PRIORITY_COMMENTS, PRIORITY_OPTIONAL, QueueManager, RateLimiter, RetryHandler
 from core.api_client import DouyinAPIClient
 from core.metadata import extract_author_sec_uid, extract_video_cover_urls
 from core.transcript_manager import TranscriptManager
 from storage import Database, FileManager, MetadataHandler
-from storage.database import order_cover_mirrors
+from storage.database import aweme_tags, order_cover_mirrors
+from storage.local_index_watcher import LocalIndexWatcher
+from storage.local_media_index import INDEX_FILENAME, IndexScanCancelled, LocalMediaIndex
+from utils import json_codec
 from utils.logger import setup_logger
 from utils.naming import (
     DEFAULT_FILE_TEMPLATE,
@@ -28,12 +35,25 @@ from utils.naming import (
 logger = setup_logger("BaseDownloader")
 
 # 进程级本地作品索引缓存（按下载根目录）。批量任务会为每个 job 新建
-# downloader 实例，没有缓存时每个 job 首次下载前都要 rglob 全库一遍。
-# 同一根目录的所有实例共享同一个集合对象，_mark_local_aweme_downloaded
-# 的增量更新对后续 job 立即可见。缓存伴随进程存活：会话期间在应用外
-# 手动删除的文件要到进程重启后才会被重新检测（与原先单 job 内的索引
-# 是同一权衡，只是范围从单 job 扩大到进程）。
-_LOCAL_AWEME_INDEX_CACHE: Dict[str, set[str]] = {}
+# downloader 实例，没有缓存时每个 job 首次下载前都要扫描全库一遍。
+# 同一根目录的所有实例共享同一个索引（及其 aweme_ids 集合对象），
+# _mark_local_aweme_downloaded 的增量更新对后续 job 立即可见。索引默认
+# 持久化到下载根目录（local_index 配置），重启后只重扫 mtime 变化过的
+# 目录；进程内缓存期间在应用外手动删除的文件要到下次重启才会被检测到。
+_LOCAL_AWEME_INDEX_CACHE: Dict[str, LocalMediaIndex] = {}
+
+
+def save_local_media_indexes() -> None:
+    """把进程内各下载根目录的本地索引写盘（CLI 结束 / 服务关闭时调用）。"""
+    for index in list(_LOCAL_AWEME_INDEX_CACHE.values()):
+        index.save()
+
+
+def watch_local_media_index(base_path: Path) -> Optional[LocalIndexWatcher]:
+    """监听 ``base_path`` 的文件变化并实时更新其共享索引；未装 watchdog 时返回 None。"""
+    cache_key = str(Path(base_path).resolve())
+    watcher = LocalIndexWatcher(Path(cache_key), lambda: _LOCAL_AWEME_INDEX_CACHE.get(cache_key))
+    return watcher if watcher.start() else None
 
 
 class ProgressReporter(Protocol):
@@ -75,6 +95,10 @@ class BaseDownloader(ABC):
         self.cookie_manager = cookie_manager
         self.database = database
         self.rate_limiter = rate_limiter or RateLimiter()
+        # 限速在 API client 里按接口路径进行；client 建时没带限速器的话挂上
+        # 这一个，保证下载器发出的请求始终受限。
+        if getattr(api_client, "rate_limiter", False) is None:
+            api_client.rate_limiter = self.rate_limiter
         self.retry_handler = retry_handler or RetryHandler()
         thread_count = int(self.config.get("thread", 5) or 5)
         self.queue_manager = queue_manager or QueueManager(max_workers=thread_count)
@@ -85,26 +109,32 @@ class BaseDownloader(ABC):
         self.metadata_handler = MetadataHandler()
         self.transcript_manager = TranscriptManager(self.config, self.file_manager, self.database)
         self._local_aweme_ids: Optional[set[str]] = None
+        # _prefetch_downloaded 按页批量查出的 DB 去重结果；_should_download
+        # 取用一次即丢弃，没有预取的条目仍逐条查询。
+        self._db_downloaded_hint: Dict[str, bool] = {}
         # 延迟到事件循环内创建（3.9 上 asyncio.Lock() 在无运行循环时创建
         # 会绑定错误的 loop）。
         self._local_index_build_lock: Optional[asyncio.Lock] = None
-        self._aweme_id_pattern = re.compile(r"(?<!\d)(\d{15,20})(?!\d)")
-        self._local_media_suffixes = {
-            ".mp4",
-            ".jpg",
-            ".jpeg",
-            ".png",
-            ".webp",
-            ".gif",
-            ".mp3",
-            ".m4a",
-        }
+        self._local_index: Optional[LocalMediaIndex] = None
+        # 首次建索引的取消信号与发起方事件循环（进度回调从扫描线程切回）。
+        self._local_index_cancel: Optional[threading.Event] = None
+        self._local_index_loop: Optional[asyncio.AbstractEventLoop] = None
         # 控制终端错误日志量，避免进度条被大量日志打断后出现重复重绘。
         self._download_error_log_count = 0
         self._download_error_log_limit = 5
         # 本次任务已解析过的作者目录，键是 (昵称, sec_uid, 目录风格)。
         # 只为「打开输出文件夹」上报一次，避免每条作品都多敲一次 mkdir。
         self._author_dir_cache: Dict[Tuple[str, str, str], Path] = {}
+        # 镜像对冲（hedged request）：首个镜像在期限内没有首字节、或吞吐
+        # 低于下限时，并行拉起下一个候选，先完成者胜出。0 = 关闭（逐个尝试）。
+        download_config = self.config.get("download", {}) or {}
+        self._hedge_after_seconds = max(
+            0.0, float(download_config.get("hedge_after_seconds", 0) or 0)
+        )
+        self._hedge_min_bytes_per_second = (
+            max(0.0, float(download_config.get("hedge_min_speed_kbps", 0) or 0)) * 1024
+        )
+        self._hedge_max_parallel = max(2, int(download_config.get("hedge_max_parallel", 2) or 2))
 
     def _progress_update_step(self, step: str, detail: str = "") -> None:
         if not self.progress_reporter:
@@ -122,6 +152,17 @@ class BaseDownloader(ABC):
         except Exception as exc:
             logger.debug("Progress set_item_total failed: %s", exc)
 
+    def _progress_extend_item_total(self, total: int, detail: str = "") -> None:
+        # 可选能力：不实现 extend_item_total 的 reporter（如 server 侧）直接忽略，
+        # 流式下载结束时的计数仍以 DownloadResult 为准。
+        extender = getattr(self.progress_reporter, "extend_item_total", None)
+        if not callable(extender):
+            return
+        try:
+            extender(total, detail)
+        except Exception as exc:
+            logger.debug("Progress extend_item_total failed: %s", exc)
+
     def _progress_advance_item(self, status: str, detail: str = "") -> None:
         if not self.progress_reporter:
             return
@@ -207,12 +248,24 @@ class BaseDownloader(ABC):
     async def download(self, parsed_url: Dict[str, Any]) -> DownloadResult:
         pass
 
+    async def _prefetch_downloaded(self, aweme_ids: Iterable[Any]) -> None:
+        """一次查询拿到一批作品的 DB 去重结果，供随后的 ``_should_download`` 使用。"""
+        if not self.database:
+            return
+        ids = [str(aid) for aid in aweme_ids if aid]
+        if not ids:
+            return
+        downloaded = await self.database.is_downloaded_many(ids)
+        for aweme_id in ids:
+            self._db_downloaded_hint[aweme_id] = aweme_id in downloaded
+
     async def _should_download(self, aweme_id: str) -> bool:
         await self._ensure_local_aweme_index()
         in_local = self._is_locally_downloaded(aweme_id)
         in_db = False
         if self.database:
-            in_db = await self.database.is_downloaded(aweme_id)
+            hint = self._db_downloaded_hint.pop(aweme_id, None)
+            in_db = hint if hint is not None else await self.database.is_downloaded(aweme_id)
 
         if in_db and in_local:
             return False
@@ -233,10 +286,11 @@ class BaseDownloader(ABC):
     async def _ensure_local_aweme_index(self) -> None:
         """在工作线程中完成首次全库扫描建索引。
 
-        扫描是同步 rglob + stat 重活；直接跑在事件循环里会把整个 HTTP
+        扫描是同步 scandir + stat 重活；直接跑在事件循环里会把整个 HTTP
         服务冻住（大库/慢盘可达分钟级），桌面端看门狗会在连续两次
         /health 失联后强杀后台服务、丢掉运行中的 job。加锁避免并发
-        worker 对同一根目录重复扫描。
+        worker 对同一根目录重复扫描。等待方被取消（job 取消）时通知扫描
+        线程尽快停下，不把半截结果写进缓存。
         """
         if self._local_aweme_ids is not None:
             return
@@ -246,7 +300,15 @@ class BaseDownloader(ABC):
         async with lock:
             if self._local_aweme_ids is not None:
                 return
-            await asyncio.to_thread(self._build_local_aweme_index)
+            cancel = self._local_index_cancel = threading.Event()
+            self._local_index_loop = asyncio.get_running_loop()
+            try:
+                await asyncio.to_thread(self._build_local_aweme_index)
+            except asyncio.CancelledError:
+                cancel.set()
+                raise
+            finally:
+                self._local_index_loop = None
 
     def _is_locally_downloaded(self, aweme_id: str) -> bool:
         if not aweme_id:
@@ -262,42 +324,69 @@ class BaseDownloader(ABC):
     def _build_local_aweme_index(self):
         base_path = self.file_manager.base_path
         cache_key = str(base_path.resolve())
-        cached = _LOCAL_AWEME_INDEX_CACHE.get(cache_key)
-        if cached is not None:
-            self._local_aweme_ids = cached
-            return
+        index = _LOCAL_AWEME_INDEX_CACHE.get(cache_key)
+        if index is None:
+            index = LocalMediaIndex(Path(cache_key), self._local_index_path(base_path))
+            started = time.monotonic()
+            try:
+                scanned = index.refresh(
+                    workers=self._local_index_workers(),
+                    progress=self._report_local_index_progress,
+                    cancel=self._local_index_cancel,
+                )
+            except IndexScanCancelled:
+                logger.info("Local media index scan for %s cancelled", cache_key)
+                return
+            logger.info(
+                "Local media index for %s: %d ids, %d directories rescanned in %.2fs",
+                cache_key,
+                len(index.aweme_ids),
+                scanned,
+                time.monotonic() - started,
+            )
+            index.save()
+            _LOCAL_AWEME_INDEX_CACHE[cache_key] = index
+        self._local_index = index
+        self._local_aweme_ids = index.aweme_ids
 
-        aweme_ids: set[str] = set()
+    def _local_index_options(self) -> Dict[str, Any]:
+        options = self.config.get("local_index") or {}
+        return options if isinstance(options, dict) else {}
 
-        if base_path.exists():
-            for path in base_path.rglob("*"):
-                if not path.is_file():
-                    continue
-                if path.suffix.lower() not in self._local_media_suffixes:
-                    continue
-                # Optional sidecars include the aweme id in their filename but
-                # do not mean the primary video/gallery asset exists. Ignoring
-                # them lets a later run with ``video: true`` fetch the actual
-                # video after an earlier cover-only archive.
-                if path.stem.lower().endswith(("_cover", "_avatar", "_music")):
-                    continue
-                try:
-                    if path.stat().st_size <= 0:
-                        continue
-                except OSError:
-                    continue
-                for match in self._aweme_id_pattern.finditer(path.name):
-                    aweme_ids.add(match.group(1))
+    def _local_index_workers(self) -> int:
+        try:
+            return max(int(self._local_index_options().get("scan_workers", 8) or 1), 1)
+        except (TypeError, ValueError):
+            return 1
+
+    def _report_local_index_progress(self, directories: int, files: int) -> None:
+        # 在扫描线程里回调：日志可直接写，进度上报切回事件循环线程。
+        logger.info("Scanning local library: %d directories, %d media files", directories, files)
+        loop = self._local_index_loop
+        if loop is None or not self.progress_reporter:
+            return
+        try:
+            loop.call_soon_threadsafe(
+                self._progress_update_step,
+                "扫描本地文件",
+                f"已扫描 {directories} 个目录，{files} 个媒体文件",
+            )
+        except RuntimeError:  # 事件循环已关闭
+            pass
 
-        self._local_aweme_ids = aweme_ids
-        _LOCAL_AWEME_INDEX_CACHE[cache_key] = aweme_ids
+    def _local_index_path(self, base_path: Path) -> Optional[Path]:
+        options = self._local_index_options()
+        if not options.get("persistent", True):
+            return None
+        custom = str(options.get("path") or "").strip()
+        return Path(custom) if custom else base_path / INDEX_FILENAME
 
-    def _mark_local_aweme_downloaded(self, aweme_id: str):
+    def _mark_local_aweme_downloaded(self, aweme_id: str, files: Sequence[Path] = ()):
         if not aweme_id:
             return
 
         if self._local_aweme_ids is None:
-            # 绑定共享缓存集合后再标记。retry_executor 直接调用
+            # 绑定共享索引后再标记。retry_executor 直接调用
             # _download_aweme_assets（不经过 _should_download），此时索引
             # 还未建；若落入实例私有集合，id 进不了进程级缓存，同进程的
             # 后续 job 会把该作品当缺失重新下载。缓存命中时这里是纯字典
@@ -306,6 +395,9 @@ class BaseDownloader(ABC):
         if self._local_aweme_ids is None:  # pragma: no cover — 防御
             self._local_aweme_ids = set()
         self._local_aweme_ids.add(aweme_id)
+        if self._local_index is not None and files:
+            self._local_index.record_files(files)
+            self._local_index.maybe_save()
 
     def _filter_by_time(self, aweme_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         start_time = self.config.get("start_time")
@@ -452,7 +544,14 @@ class BaseDownloader(ABC):
             max_comments=int(comments_cfg.get("max_comments", 0) or 0),
             page_size=int(comments_cfg.get("page_size", 20) or 20),
         )
-        saved = await collector.collect_and_save(str(aweme_id), comments_path)
+        # 评论翻页请求多、又不影响作品本身成败，以最低优先级交给调度器：
+        # worker 空闲时并行抓取，满载时由当前作品就地执行。
+        (saved,) = await self.queue_manager.scheduler.gather(
+            [functools.partial(collector.collect_and_save, str(aweme_id), comments_path)],
+            priority=PRIORITY_COMMENTS,
+        )
+        if isinstance(saved, BaseException):
+            raise saved
         return saved is not None
 
     async def _collect_comments_for_existing_aweme(
@@ -525,10 +624,11 @@ class BaseDownloader(ABC):
         video_path: Optional[Path] = None
         primary_media_downloaded = False
         # 可选资产（封面/音乐/头像）相互独立且不影响主媒体成败：统一登记
-        # (保存路径, 未 await 的协程) 后并行下载，避免串行等待每个附件
-        # （尤其是慢镜像）时占住全局下载并发槽。视频关闭时这些附件仍可
-        # 独立保存，因此封面归档不再强制要求先下载 mp4。
-        optional_assets: List[Tuple[Path, Any]] = []
+        # (保存路径, 无参调用) 后交给调度器以 OPTIONAL 优先级并行下载，
+        # 避免串行等待每个附件（尤其是慢镜像）；主媒体排队时空闲 worker
+        # 优先去下主媒体。视频关闭时这些附件仍可独立保存，因此封面归档
+        # 不再强制要求先下载 mp4。
+        optional_assets: List[Tuple[Path, Callable[[], Any]]] = []
 
         if media_type == "video":
             if self.config.get("video", True):
@@ -555,7 +655,8 @@ class BaseDownloader(ABC):
                     optional_assets.append(
                         (
                             cover_path,
-                            self._download_first_available(
+                            functools.partial(
+                                self._download_first_available,
                                 cover_urls,
                                 cover_path,
                                 session,
@@ -572,7 +673,8 @@ class BaseDownloader(ABC):
                     optional_assets.append(
                         (
                             music_path,
-                            self._download_with_retry(
+                            functools.partial(
+                                self._download_with_retry,
                                 music_url,
                                 music_path,
                                 session,
@@ -608,6 +710,7 @@ class BaseDownloader(ABC):
                 # 就是重试机制（每镜像单次尝试），单镜像才保留退避重试——
                 # 否则死镜像 × 每镜像 4 次退避嵌套，一张图最坏能拖数分钟。
                 use_backoff = len(candidates) == 1
+                candidates = self._rank_by_cdn_health(candidates)
                 for url_index, image_url in enumerate(candidates):
                     is_last = url_index == len(candidates) - 1
                     suffix = self._infer_image_extension(image_url)
@@ -657,7 +760,8 @@ class BaseDownloader(ABC):
                 optional_assets.append(
                     (
                         avatar_path,
-                        self._download_first_available(
+                        functools.partial(
+                            self._download_first_available,
                             avatar_source,
                             avatar_path,
                             session,
@@ -668,12 +772,15 @@ class BaseDownloader(ABC):
                 )
 
         if optional_assets:
-            # 不变量：登记的协程（_download_first_available / _download_with_retry）
-            # 内部捕获所有 Exception 并返回 False，不会让 gather 抛出——
-            # 往这里登记新的协程时必须保持同样的不抛异常约定。
-            outcomes = await asyncio.gather(*(coro for _, coro in optional_assets))
+            # 调度器的 gather 把异常作为实例返回：可选附件抛错等同下载失败，
+            # 不影响主媒体结果。
+            outcomes = await self.queue_manager.scheduler.gather(
+                [call for _, call in optional_assets], priority=PRIORITY_OPTIONAL
+            )
             for (asset_path, _), outcome in zip(optional_assets, outcomes):
-                if outcome:
+                if isinstance(outcome, BaseException):
+                    logger.warning("Optional asset %s failed: %s", asset_path.name, outcome)
+                elif outcome:
                     downloaded_files.append(outcome if isinstance(outcome, Path) else asset_path)
 
         if self.config.get("json"):
@@ -695,8 +802,10 @@ class BaseDownloader(ABC):
             return False
 
         author = aweme_data.get("author", {})
+        tags = self._extract_tags(aweme_data)
         if self.database:
-            metadata_json = json.dumps(aweme_data, ensure_ascii=False)
+            # _data.json 保持缩进给人看；入库只需紧凑编码一次。
+            metadata_json = json_codec.dumps(aweme_data)
             cover_list = extract_video_cover_urls(aweme_data)
             if not cover_list:
                 # Image posts carry no video cover — fall back to the first
@@ -723,6 +832,8 @@ class BaseDownloader(ABC):
                     order_cover_mirrors(cover_list if isinstance(cover_list, list) else [])
                 ),
                 "job_id": self.job_id or "",
+                # 空格分隔，供全文检索（aweme_fts）索引。
+                "tags": " ".join(tags),
             }
             # Caller may opt into batched DB writes by passing a list; we just
             # accumulate the record and let the caller commit them all at once.
@@ -737,7 +848,7 @@ class BaseDownloader(ABC):
             "author_name": author.get("nickname", author_name),
             "desc": desc,
             "media_type": media_type,
-            "tags": self._extract_tags(aweme_data),
+            "tags": tags,
             "file_names": [path.name for path in downloaded_files],
             "file_paths": [self._to_manifest_path(path) for path in downloaded_files],
         }
@@ -766,7 +877,7 @@ class BaseDownloader(ABC):
                 )
 
         if primary_media_downloaded:
-            self._mark_local_aweme_downloaded(aweme_id)
+            self._mark_local_aweme_downloaded(aweme_id, downloaded_files)
         logger.info("Downloaded selected assets for %s: %s (%s)", media_type, desc, aweme_id)
         return True
 
@@ -781,7 +892,13 @@ class BaseDownloader(ABC):
         prefer_response_content_type: bool = False,
         return_saved_path: bool = False,
         retry: bool = True,
+        progress_callback: Optional[Callable[[int], None]] = None,
     ) -> bool | Path:
+        # 只在需要时透传，保持对只接受固定参数的 download_file 替身兼容。
+        extra_kwargs: Dict[str, Any] = {}
+        if progress_callback is not None:
+            extra_kwargs["progress_callback"] = progress_callback
+
         async def _task():
             download_result = await self.file_manager.download_file(
                 url,
@@ -791,6 +908,7 @@ class BaseDownloader(ABC):
                 proxy=getattr(self.api_client, "proxy", None),
                 prefer_response_content_type=prefer_response_content_type,
                 return_saved_path=return_saved_path,
+                **extra_kwargs,
             )
             if not download_result:
                 raise RuntimeError(f"Download failed for {url}")
@@ -822,8 +940,15 @@ class BaseDownloader(ABC):
         """
         if not candidates:
             return False
+        candidates = self._rank_by_cdn_health(candidates, key=lambda c: c[0])
 
         async def _attempt_round() -> bool:
+            if self._hedging_enabled(len(candidates)):
+                if await self._download_hedged(candidates, save_path, session, optional=True):
+                    return True
+                raise RuntimeError(
+                    f"All {len(candidates)} video url candidate(s) failed for {save_path.name}"
+                )
             for url, headers in candidates:
                 if await self._download_with_retry(
                     url,
@@ -863,8 +988,17 @@ class BaseDownloader(ABC):
         存在多个镜像时，镜像列表本身就是重试机制：每个镜像只尝试一次，
         避免在已知会持续 403 的死镜像上叠加多轮退避重试（单个封面最多
         可拖慢 20+ 秒并占用下载并发槽）。仅单一 URL 时保留退避重试。
+        启用镜像对冲时改为 ``_download_hedged`` 竞速。
         """
-        urls = self._extract_urls(source)
+        urls = self._rank_by_cdn_health(self._extract_urls(source))
+        if self._hedging_enabled(len(urls)):
+            return await self._download_hedged(
+                [(url, headers) for url in urls],
+                save_path,
+                session,
+                optional=optional,
+                **kwargs,
+            )
         use_backoff = len(urls) == 1
         result: bool | Path = False
         for index, url in enumerate(urls):
@@ -884,6 +1018,139 @@ class BaseDownloader(ABC):
                 return result
         return result
 
+    def _rank_by_cdn_health(self, items: List[Any], key: Callable[[Any], str] = str) -> List[Any]:
+        """按 CDN 主机的历史表现重排候选（快且健康的主机优先）。
+
+        静态顺序（直连优先、p3 置后等）只作为没有统计数据时的默认值；
+        长批量任务中记分板会学到当下哪些 ``v*-dy`` / ``p*-sign`` 镜像可用。
+        """
+        scoreboard = getattr(self.file_manager, "scoreboard", None)
+        if scoreboard is None or len(items) < 2:
+            return list(items)
+        return scoreboard.rank(items, key=key)
+
+    def _hedging_enabled(self, candidate_count: int) -> bool:
+        return self._hedge_after_seconds > 0 and candidate_count > 1
+
+    @staticmethod
+    def _hedge_path(save_path: Path, attempt: int) -> Path:
+        if attempt == 0:
+            return save_path
+        return save_path.with_name(f"{save_path.stem}.hedge{attempt}{save_path.suffix}")
+
+    async def _download_hedged(
+        self,
+        candidates: List[Tuple[str, Optional[Dict[str, str]]]],
+        save_path: Path,
+        session,
+        *,
+        optional: bool = False,
+        return_saved_path: bool = False,
+        **kwargs,
+    ) -> bool | Path:
+        """对冲下载：按序启动候选，慢的镜像不再拖住整条作品。
+
+        先只跑首个候选；每过 ``hedge_after_seconds`` 检查一次，若所有在跑的
+        尝试都还没收到首字节（或吞吐低于 ``hedge_min_speed_kbps``），就并行
+        拉起下一个候选（同时最多 ``hedge_max_parallel`` 个）。某个尝试失败时
+        立即补位。先完成者胜出，其余尝试被取消并清理 ``.tmp``。
+
+        首个候选直接写 ``save_path``（保留续传状态），对冲候选写到
+        ``<stem>.hedgeN<suffix>``，胜出后再原子改名，避免并发写同一个临时文件。
+        """
+        loop = asyncio.get_running_loop()
+        queue = list(enumerate(candidates))
+        running: Dict[asyncio.Task, Dict[str, Any]] = {}
+
+        def _launch() -> None:
+            attempt, (url, headers) = queue.pop(0)
+            state: Dict[str, Any] = {
+                "path": self._hedge_path(save_path, attempt),
+                "bytes": 0,
+                "started": loop.time(),
+            }
+
+            def _on_progress(size: int) -> None:
+                state["bytes"] += size
+
+            if attempt:
+                logger.debug("Hedging %s with candidate #%d", save_path.name, attempt)
+            task = asyncio.create_task(
+                self._download_with_retry(
+                    url,
+                    state["path"],
+                    session,
+                    headers=headers,
+                    optional=True,
+                    retry=False,
+                    return_saved_path=True,
+                    progress_callback=_on_progress,
+                    **kwargs,
+                )
+            )
+            running[task] = state
+
+        def _is_lagging() -> bool:
+            now = loop.time()
+            for state in running.values():
+                if state["bytes"] <= 0:
+                    continue
+                elapsed = max(now - state["started"], 1e-6)
+                if state["bytes"] / elapsed >= self._hedge_min_bytes_per_second:
+                    return False
+            return True
+
+        winner: Optional[Tuple[Path, Path]] = None
+        try:
+            _launch()
+            while running:
+                done, _ = await asyncio.wait(
+                    running,
+                    timeout=self._hedge_after_seconds,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    state = running.pop(task)
+                    result = task.result()
+                    if not result:
+                        continue
+                    saved = result if isinstance(result, Path) else state["path"]
+                    if winner is None:
+                        winner = (saved, state["path"])
+                    elif saved != winner[0]:
+                        # 同一轮里有两个尝试都完成：只保留胜者。
+                        saved.unlink(missing_ok=True)
+                if winner is not None:
+                    break
+                if not queue or len(running) >= self._hedge_max_parallel:
+                    continue
+                # 有尝试失败就立即补位；否则仅在全部尝试都慢时对冲。
+                if done or not running or _is_lagging():
+                    _launch()
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            for state in running.values():
+                self.file_manager.discard_partial(state["path"])
+
+        if winner is None:
+            if not optional:
+                self._log_download_error(
+                    logger.error,
+                    f"Download error for {save_path.name}: "
+                    f"all {len(candidates)} candidate(s) failed",
+                )
+            return False
+
+        saved, attempt_path = winner
+        if attempt_path != save_path:
+            final_path = save_path.with_suffix(saved.suffix)
+            os.replace(str(saved), str(final_path))
+            saved = final_path
+        return saved if return_saved_path else True
+
     # aweme_type codes that indicate image/note content
     _GALLERY_AWEME_TYPES = {2, 68, 150}
     _PLAY_ADDR_KEYS = (
@@ -1477,32 +1744,7 @@ class BaseDownloader(ABC):
 
     @staticmethod
     def _extract_tags(aweme_data: Dict[str, Any]) -> List[str]:
-        tags: List[str] = []
-
-        def _append_tag(raw_tag: Any):
-            if not raw_tag:
-                return
-            normalized_tag = str(raw_tag).strip().lstrip("#")
-            if normalized_tag and normalized_tag not in tags:
-                tags.append(normalized_tag)
-
-        for item in aweme_data.get("text_extra") or []:
-            if not isinstance(item, dict):
-                continue
-            _append_tag(item.get("hashtag_name"))
-            _append_tag(item.get("tag_name"))
-
-        for item in aweme_data.get("cha_list") or []:
-            if not isinstance(item, dict):
-                continue
-            _append_tag(item.get("cha_name"))
-            _append_tag(item.get("name"))
-
-        desc = aweme_data.get("desc") or ""
-        for hashtag in re.findall(r"#([^\s#]+)", desc):
-            _append_tag(hashtag)
-
-        return tags
+        return aweme_tags(aweme_data)
 
     def _to_manifest_path(self, path: Path) -> str:
         try:
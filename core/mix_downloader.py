@@ -73,8 +73,10 @@ class MixDownloader(BaseDownloader):
             self._progress_advance_item(status, str(aweme_id))
             return {"status": status, "aweme_id": aweme_id}
 
-        download_results = await self.queue_manager.download_batch(_process_aweme, aweme_list)
-        for entry in download_results:
+        await self._prefetch_downloaded(item.get("aweme_id") for item in aweme_list)
+        async for entry in self.queue_manager.stream(
+            _process_aweme, aweme_list, name=f"mix:{mix_id}"
+        ):
             status = entry.get("status") if isinstance(entry, dict) else None
             if status == "success":
                 result.success += 1
@@ -96,7 +98,6 @@ class MixDownloader(BaseDownloader):
         number_limit = int(self.config.get("number", {}).get("mix", 0) or 0)
 
         while has_more:
-            await self.rate_limiter.acquire()
             raw_page = await fetch_mix_aweme(mix_id, cursor=cursor, count=20)
             page = BaseUserModeStrategy._normalize_page_data(raw_page)
             items = page.get("items", [])
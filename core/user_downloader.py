@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import time
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
 
 from core.downloader_base import BaseDownloader, DownloadResult
 from core.user_mode_registry import UserModeRegistry
@@ -9,6 +9,11 @@ from utils.logger import setup_logger
 
 logger = setup_logger("UserDownloader")
 
+# 流式下载时 DB 记录的攒批条数：既保留批量事务的收益，又不至于整个主页
+# 的记录都压在内存里等到最后。
+_STREAM_DB_FLUSH_SIZE = 50
+_DEFAULT_PIPELINE_QUEUE_SIZE = 100
+
 
 def _user_info_summary(user_info: Dict[str, Any]) -> Dict[str, Any]:
     safe_keys = (
@@ -332,6 +337,11 @@ class UserDownloader(BaseDownloader):
         # Filtered path is request-scoped — never cached.
         return strategy_cls(self, collects_id=collects_id)
 
+    def _new_db_batch(self) -> Optional[List[Dict[str, Any]]]:
+        if not self.database or getattr(self.database, "write_behind", False) is True:
+            return None
+        return []
+
     async def _download_mode_items(
         self,
         mode: str,
@@ -343,9 +353,122 @@ class UserDownloader(BaseDownloader):
     ) -> DownloadResult:
         if seen_aweme_ids is None:
             seen_aweme_ids = set()
-        deduped_items: List[Dict[str, Any]] = []
+        deduped_items = self._dedupe_items(items, seen_aweme_ids, set())
+
+        result = DownloadResult()
+        result.total = len(deduped_items)
+        self._progress_set_item_total(result.total, "作品待下载")
+        self._progress_update_step("下载作品", f"待处理 {result.total} 条")
+
+        # Accumulate per-aweme DB records and flush in a single transaction
+        # at the end — avoids one fsync per item across the whole batch.
+        # The write-behind writer already group-commits per-item writes, and
+        # holding records until the end would only widen the crash-loss window.
+        db_batch = self._new_db_batch()
+        process_aweme = self._aweme_processor(
+            mode, author_name, db_batch=db_batch, author_sec_uid=author_sec_uid
+        )
+        await self._prefetch_downloaded(item.get("aweme_id") for item in deduped_items)
+
+        async for outcome in self.queue_manager.stream(
+            process_aweme, deduped_items, name=f"{mode}:{author_name}"
+        ):
+            self._tally_result(result, outcome)
+
+        if db_batch:
+            await self.database.add_aweme_batch(db_batch)
+        return result
+
+    async def _download_mode_stream(
+        self,
+        mode: str,
+        pages: AsyncIterator[List[Dict[str, Any]]],
+        author_name: str,
+        seen_aweme_ids: Optional[Set[str]] = None,
+        *,
+        author_sec_uid: Optional[str] = None,
+    ) -> DownloadResult:
+        """流式版 ``_download_mode_items``：分页产出一页就开始下载这一页。
+
+        在途条目不超过 ``pipeline.queue_size``，窗口满时分页暂停；总数随分页
+        增长，DB 记录每 ``_STREAM_DB_FLUSH_SIZE`` 条落盘一次，不再整批攒到最后。
+        """
+        if seen_aweme_ids is None:
+            seen_aweme_ids = set()
+        result = DownloadResult()
         local_seen: Set[str] = set()
+        db_batch = self._new_db_batch()
+        process_aweme = self._aweme_processor(
+            mode, author_name, db_batch=db_batch, author_sec_uid=author_sec_uid
+        )
+
+        async def _flush_db_batch() -> None:
+            if not db_batch:
+                return
+            pending = list(db_batch)
+            db_batch.clear()
+            await self.database.add_aweme_batch(pending)
 
+        async def _process_and_flush(item: Dict[str, Any]):
+            outcome = await process_aweme(item)
+            if db_batch is not None and len(db_batch) >= _STREAM_DB_FLUSH_SIZE:
+                await _flush_db_batch()
+            return outcome
+
+        paging_error: List[Exception] = []
+
+        async def _pending_items():
+            try:
+                async for page_items in pages:
+                    fresh = self._dedupe_items(page_items, seen_aweme_ids, local_seen)
+                    if not fresh:
+                        continue
+                    # 整页一次查完去重，worker 不再逐条访问数据库。
+                    await self._prefetch_downloaded(item.get("aweme_id") for item in fresh)
+                    result.total += len(fresh)
+                    self._progress_extend_item_total(result.total, f"已发现 {result.total} 条")
+                    self._progress_update_step(
+                        "下载作品", f"边拉取边下载，已发现 {result.total} 条"
+                    )
+                    for item in fresh:
+                        yield item
+            except Exception as exc:
+                # 分页出错时已交给 worker 的条目照常下载完，再把异常抛给调用方。
+                paging_error.append(exc)
+
+        self._progress_update_step("下载作品", "边拉取边下载")
+        try:
+            async for outcome in self.queue_manager.stream(
+                _process_and_flush,
+                _pending_items(),
+                window=self._pipeline_queue_size(),
+                name=f"{mode}:{author_name}",
+            ):
+                self._tally_result(result, outcome)
+        finally:
+            await _flush_db_batch()
+
+        if paging_error:
+            raise paging_error[0]
+        if result.total == 0:
+            self._progress_set_item_total(0, "作品待下载")
+        return result
+
+    def _pipeline_queue_size(self) -> int:
+        pipeline = self.config.get("pipeline") or {}
+        try:
+            size = int(pipeline.get("queue_size", _DEFAULT_PIPELINE_QUEUE_SIZE))
+        except (AttributeError, TypeError, ValueError):
+            size = _DEFAULT_PIPELINE_QUEUE_SIZE
+        return max(size, 1)
+
+    @staticmethod
+    def _dedupe_items(
+        items: List[Dict[str, Any]],
+        seen_aweme_ids: Set[str],
+        local_seen: Set[str],
+    ) -> List[Dict[str, Any]]:
+        deduped_items: List[Dict[str, Any]] = []
         for item in items:
             aweme_id = str(item.get("aweme_id") or "").strip()
             if not aweme_id:
@@ -355,16 +478,16 @@ class UserDownloader(BaseDownloader):
             local_seen.add(aweme_id)
             seen_aweme_ids.add(aweme_id)
             deduped_items.append(item)
+        return deduped_items
 
-        result = DownloadResult()
-        result.total = len(deduped_items)
-        self._progress_set_item_total(result.total, "作品待下载")
-        self._progress_update_step("下载作品", f"待处理 {result.total} 条")
-
-        # Accumulate per-aweme DB records and flush in a single transaction
-        # at the end — avoids one fsync per item across the whole batch.
-        db_batch: Optional[List[Dict[str, Any]]] = [] if self.database else None
-
+    def _aweme_processor(
+        self,
+        mode: str,
+        author_name: str,
+        *,
+        db_batch: Optional[List[Dict[str, Any]]],
+        author_sec_uid: Optional[str],
+    ) -> Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]:
         async def _process_aweme(item: Dict[str, Any]):
             aweme_id = item.get("aweme_id")
             if not await self._should_download(str(aweme_id or "")):
@@ -392,24 +515,19 @@ class UserDownloader(BaseDownloader):
                 "aweme_id": aweme_id,
             }
 
-        download_results = await self.queue_manager.download_batch(_process_aweme, deduped_items)
-
-        if db_batch:
-            await self.database.add_aweme_batch(db_batch)
-
-        for entry in download_results:
-            status = entry.get("status") if isinstance(entry, dict) else None
-            if status == "success":
-                result.success += 1
-            elif status == "failed":
-                result.failed += 1
-            elif status == "skipped":
-                result.skipped += 1
-            else:
-                result.failed += 1
-                self._progress_advance_item("failed", "unknown")
+        return _process_aweme
 
-        return result
+    def _tally_result(self, result: DownloadResult, entry: Any) -> None:
+        status = entry.get("status") if isinstance(entry, dict) else None
+        if status == "success":
+            result.success += 1
+        elif status == "failed":
+            result.failed += 1
+        elif status == "skipped":
+            result.skipped += 1
+        else:
+            result.failed += 1
+            self._progress_advance_item("failed", "unknown")
 
     # 向后兼容：旧测试仍直接调用 post 下载入口。
     async def _download_user_post(self, sec_uid: str, user_info: Dict[str, Any]) -> DownloadResult:
@@ -521,7 +639,6 @@ class UserDownloader(BaseDownloader):
             detail = browser_aweme_items.get(str(aweme_id))
             if not detail:
                 try:
-                    await self.rate_limiter.acquire()
                     detail = await self.api_client.get_video_detail(aweme_id, suppress_error=True)
                 except Exception as exc:
                     detail_failed += 1
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Set
 
 from core.downloader_base import DownloadResult
 from utils.logger import setup_logger
@@ -27,11 +27,20 @@ class BaseUserModeStrategy(ABC):
         user_info: Dict[str, Any],
         seen_aweme_ids: Optional[set[str]] = None,
     ) -> DownloadResult:
-        items = await self.collect_items(sec_uid, user_info)
-        items = self.apply_filters(items)
         author_name = user_info.get("nickname", "unknown")
         if seen_aweme_ids is None:
             seen_aweme_ids = set()
+        if self._streaming_enabled():
+            return await self.downloader._download_mode_stream(
+                mode=self.mode_name,
+                pages=self._iter_filtered_pages(self.stream_pages(sec_uid, user_info)),
+                author_name=author_name,
+                author_sec_uid=user_info.get("sec_uid") or sec_uid,
+                seen_aweme_ids=seen_aweme_ids,
+            )
+
+        items = await self.collect_items(sec_uid, user_info)
+        items = self.apply_filters(items)
         return await self.downloader._download_mode_items(
             mode=self.mode_name,
             items=items,
@@ -45,6 +54,48 @@ class BaseUserModeStrategy(ABC):
     async def collect_items(self, sec_uid: str, user_info: Dict[str, Any]) -> List[Dict[str, Any]]:
         return await self._collect_paged_aweme(sec_uid, user_info)
 
+    async def stream_pages(
+        self, sec_uid: str, user_info: Dict[str, Any]
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """流式模式的数据源：逐页产出未过滤的作品。
+
+        自行实现 ``collect_items`` 的策略（收藏夹、合集 / 音乐展开等）没有
+        逐页语义，整体作为一页产出。
+        """
+        if type(self).collect_items is not BaseUserModeStrategy.collect_items:
+            yield await self.collect_items(sec_uid, user_info)
+            return
+        async for page_items in self._iter_paged_aweme(sec_uid, user_info):
+            yield page_items
+
+    def _streaming_enabled(self) -> bool:
+        pipeline = self.downloader.config.get("pipeline") or {}
+        if not isinstance(pipeline, dict) or not pipeline.get("streaming"):
+            return False
+        return callable(getattr(self.downloader, "_download_mode_stream", None))
+
+    async def _iter_filtered_pages(
+        self, pages: AsyncIterator[List[Dict[str, Any]]]
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """逐页应用 ``apply_filters`` 的同一组过滤；number 上限按累计条数计算，
+        达到后立即停止上游分页。"""
+        limit = int(self.downloader.config.get("number", {}).get(self.mode_name, 0) or 0)
+        emitted = 0
+        try:
+            async for page_items in pages:
+                filtered = self._filter_pinned_items(page_items)
+                filtered = self.downloader._filter_by_time(filtered)
+                filtered = self._filter_by_media_type(filtered)
+                if limit > 0:
+                    filtered = filtered[: limit - emitted]
+                if filtered:
+                    emitted += len(filtered)
+                    yield filtered
+                if limit > 0 and emitted >= limit:
+                    break
+        finally:
+            await pages.aclose()
+
     def apply_filters(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         filtered = self._filter_pinned_items(items)
         filtered = self.downloader._filter_by_time(filtered)
@@ -84,6 +135,15 @@ class BaseUserModeStrategy(ABC):
     async def _collect_paged_aweme(
         self, sec_uid: str, user_info: Dict[str, Any]
     ) -> List[Dict[str, Any]]:
+        aweme_list: List[Dict[str, Any]] = []
+        async for page_items in self._iter_paged_aweme(sec_uid, user_info):
+            aweme_list.extend(page_items)
+        return aweme_list
+
+    async def _iter_paged_aweme(
+        self, sec_uid: str, user_info: Dict[str, Any]
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """逐页产出作品；增量截断与 number 截断都在产出前完成。"""
         fetcher = getattr(self.downloader.api_client, self.api_method_name, None)
         if not callable(fetcher):
             logger.warning(
@@ -91,9 +151,10 @@ class BaseUserModeStrategy(ABC):
                 self.mode_name,
                 self.api_method_name,
             )
-            return []
+            return
 
-        aweme_list: List[Dict[str, Any]] = []
+        collected = 0
+        matched = 0
         max_cursor = 0
         has_more = True
 
@@ -110,7 +171,6 @@ class BaseUserModeStrategy(ABC):
             latest_time = await self.downloader.database.get_latest_aweme_time(user_info.get("uid"))
 
         while has_more:
-            await self.downloader.rate_limiter.acquire()
             request_cursor = max_cursor
             page_data = await fetcher(sec_uid, request_cursor, 20)
             page = self._normalize_page_data(page_data)
@@ -119,30 +179,36 @@ class BaseUserModeStrategy(ABC):
                 break
 
             if stop_at_downloaded_aweme:
+                downloaded = await self._downloaded_aweme_ids(page_items)
                 new_items = []
                 for item in page_items:
-                    if await self._is_downloaded_aweme(item):
+                    if str(item.get("aweme_id") or "").strip() in downloaded:
                         break
                     new_items.append(item)
-                aweme_list.extend(new_items)
-                if len(new_items) < len(page_items):
-                    break
             elif increase_enabled and latest_time:
                 new_items = [a for a in page_items if a.get("create_time", 0) > latest_time]
-                aweme_list.extend(new_items)
-                if len(new_items) < len(page_items):
-                    break
             else:
-                aweme_list.extend(page_items)
+                new_items = page_items
+
+            # 增量模式遇到已下载 / 更早的作品即停止，此时不再做 number 截断。
+            if len(new_items) < len(page_items):
+                if new_items:
+                    yield new_items
+                break
 
             if number_limit > 0:
                 if media_filter_enabled:
-                    if len(self._filter_by_media_type(aweme_list)) >= number_limit:
+                    matched += len(self._filter_by_media_type(new_items))
+                    if matched >= number_limit:
+                        yield new_items
                         break
-                elif len(aweme_list) >= number_limit:
-                    aweme_list = aweme_list[:number_limit]
+                elif collected + len(new_items) >= number_limit:
+                    yield new_items[: number_limit - collected]
                     break
 
+            collected += len(new_items)
+            yield new_items
+
             has_more = bool(page.get("has_more", False))
             max_cursor = int(page.get("max_cursor", 0) or 0)
             if has_more and max_cursor == request_cursor:
@@ -153,13 +219,14 @@ class BaseUserModeStrategy(ABC):
                 )
                 break
 
-        return aweme_list
-
-    async def _is_downloaded_aweme(self, item: Dict[str, Any]) -> bool:
-        aweme_id = str(item.get("aweme_id") or "").strip()
-        if not aweme_id or not self.downloader.database:
-            return False
-        return await self.downloader.database.is_downloaded(aweme_id)
+    async def _downloaded_aweme_ids(self, items: List[Dict[str, Any]]) -> Set[str]:
+        """整页一次查询，返回其中已下载的 aweme_id。"""
+        if not self.downloader.database:
+            return set()
+        aweme_ids = [str(item.get("aweme_id") or "").strip() for item in items]
+        return await self.downloader.database.is_downloaded_many(
+            [aweme_id for aweme_id in aweme_ids if aweme_id]
+        )
 
     def select_items(self, page_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         items = page_data.get("items")
@@ -178,7 +245,6 @@ class BaseUserModeStrategy(ABC):
         has_more = True
 
         while has_more:
-            await self.downloader.rate_limiter.acquire()
             request_cursor = max_cursor
             page_data = await fetcher(*fetch_args, request_cursor, count)
             page = self._normalize_page_data(page_data)
@@ -234,7 +300,6 @@ class BaseUserModeStrategy(ABC):
             cursor = 0
             has_more = True
             while has_more:
-                await self.downloader.rate_limiter.acquire()
                 try:
                     page_data = await fetcher(str(entry_id), cursor=cursor, count=20)
                 except Exception as exc:
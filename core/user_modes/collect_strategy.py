@@ -49,7 +49,6 @@ class CollectUserModeStrategy(BaseUserModeStrategy):
         cursor = 0
         has_more = True
         while has_more:
-            await self.downloader.rate_limiter.acquire()
             page_data = await fetch_collect_aweme(str(collects_id), max_cursor=cursor, count=20)
             page = self._normalize_page_data(page_data)
             page_items = page.get("items", [])
@@ -114,7 +113,6 @@ class CollectUserModeStrategy(BaseUserModeStrategy):
             cursor = 0
             has_more = True
             while has_more:
-                await self.downloader.rate_limiter.acquire()
                 page_data = await fetch_collect_aweme(str(collects_id), max_cursor=cursor, count=20)
                 page = self._normalize_page_data(page_data)
                 page_items = page.get("items", [])
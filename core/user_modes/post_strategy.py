@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from core.user_modes.base_strategy import BaseUserModeStrategy
 from utils.logger import setup_logger
@@ -50,9 +50,39 @@ class PostUserModeStrategy(BaseUserModeStrategy):
             return []
 
         aweme_list, pagination_restricted = await self._collect_api_items(sec_uid, user_info)
-        if not pagination_restricted:
-            return aweme_list
+        if pagination_restricted:
+            await self._recover_restricted_pagination(sec_uid, user_info, aweme_list)
+        return aweme_list
+
+    async def stream_pages(
+        self, sec_uid: str, user_info: Dict[str, Any]
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        fetcher = getattr(self.downloader.api_client, self.api_method_name, None)
+        if not callable(fetcher):
+            logger.error("API client missing get_user_post")
+            return
+
+        state: Dict[str, Any] = {"items": [], "restricted": False}
+        async for page_items in self._iter_api_pages(sec_uid, user_info, state):
+            if page_items:
+                yield page_items
+        if not state["restricted"]:
+            return
 
+        # 浏览器回补需要完整的已抓取列表做去重与 number 判断，所以流式模式
+        # 下 post 仍保留已产出的条目；回补新增的部分最后作为一页产出。
+        aweme_list: List[Dict[str, Any]] = state["items"]
+        streamed = len(aweme_list)
+        await self._recover_restricted_pagination(sec_uid, user_info, aweme_list)
+        if len(aweme_list) > streamed:
+            yield aweme_list[streamed:]
+
+    async def _recover_restricted_pagination(
+        self,
+        sec_uid: str,
+        user_info: Dict[str, Any],
+        aweme_list: List[Dict[str, Any]],
+    ) -> None:
         self.downloader._progress_update_step("拉取作品列表", "分页受限，尝试浏览器回补")
         if self._media_type_filter_enabled():
             await self.downloader._recover_user_post_with_browser(
@@ -68,10 +98,21 @@ class PostUserModeStrategy(BaseUserModeStrategy):
                 "抖音接口未返回作品列表（可能触发了反爬限制），"
                 "请稍后重试或尝试重新登录抖音刷新 Cookie"
             )
-        return aweme_list
 
     async def _collect_api_items(self, sec_uid: str, user_info: Dict[str, Any]) -> _PostPageResult:
-        aweme_list: List[Dict[str, Any]] = []
+        state: Dict[str, Any] = {"items": [], "restricted": False}
+        async for _page_items in self._iter_api_pages(sec_uid, user_info, state):
+            pass
+        return state["items"], state["restricted"]
+
+    async def _iter_api_pages(
+        self,
+        sec_uid: str,
+        user_info: Dict[str, Any],
+        state: Dict[str, Any],
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """逐页产出新抓到的作品；累计列表与「分页是否受限」写回 ``state``。"""
+        aweme_list: List[Dict[str, Any]] = state["items"]
         max_cursor = 0
         raw_items_seen = 0
         page_number = 0
@@ -89,11 +130,14 @@ class PostUserModeStrategy(BaseUserModeStrategy):
                 collected_count=len(aweme_list),
             )
             if page_data is None:
-                return aweme_list, True
+                state["restricted"] = True
+                return
             page = self._normalize_page_data(page_data)
+            page_start = len(aweme_list)
             raw_page_count = self._append_page_items(page, aweme_list)
             if raw_page_count == 0:
-                return aweme_list, self._empty_page_is_restricted(page, request_cursor)
+                state["restricted"] = self._empty_page_is_restricted(page, request_cursor)
+                return
             raw_items_seen += raw_page_count
             has_more = bool(page.get("has_more", False))
             max_cursor = int(page.get("max_cursor", 0) or 0)
@@ -118,8 +162,11 @@ class PostUserModeStrategy(BaseUserModeStrategy):
                     and not pagination_restricted
                     and not media_filter_enabled
                 ):
-                    aweme_list = aweme_list[:number_limit]
-                return aweme_list, pagination_restricted
+                    del aweme_list[number_limit:]
+                state["restricted"] = pagination_restricted
+                yield aweme_list[page_start:]
+                return
+            yield aweme_list[page_start:]
 
     def _append_page_items(self, page: Dict[str, Any], aweme_list: List[Dict[str, Any]]) -> int:
         page_items = self.select_items(page)
@@ -166,7 +213,6 @@ class PostUserModeStrategy(BaseUserModeStrategy):
         collected_count: int,
     ) -> Optional[Dict[str, Any]]:
         started = time.monotonic()
-        await self.downloader.rate_limiter.acquire()
         self.downloader._progress_update_step(
             "拉取作品列表",
             f"请求第 {page_number} 页，已抓取 {collected_count} 条",
@@ -26,8 +26,6 @@ class VideoDownloader(BaseDownloader):
             self._progress_advance_item("skipped", str(aweme_id))
             return result
 
-        await self.rate_limiter.acquire()
-
         aweme_data = await self.api_client.get_video_detail(aweme_id)
         if not aweme_data:
             logger.error("Failed to get video detail: %s", aweme_id)
@@ -17,8 +17,9 @@ from pydantic import BaseModel
 
 from auth import CookieManager
 from config import ConfigLoader
-from control import QueueManager, RateLimiter, RetryHandler
+from control import CdnScoreboard, QueueManager, RateLimiter, RetryHandler
 from core import DouyinAPIClient, DownloaderFactory, URLParser
+from core.downloader_base import save_local_media_indexes, watch_local_media_index
 from server.jobs import JobManager
 from storage import FileManager
 from utils.logger import setup_logger
@@ -69,8 +70,12 @@ class _ServerDeps:
             # Trigger a load from disk so get_cookies() returns the persisted
             # session without requiring a fresh login on every app restart.
             self.cookie_manager.get_cookies()
-        self.file_manager = FileManager(config.get("path"))
-        self.rate_limiter = RateLimiter(max_per_second=float(config.get("rate_limit", 2) or 2))
+        self.file_manager = FileManager(
+            config.get("path"),
+            download_config=config.get("download"),
+            scoreboard=CdnScoreboard.from_config(config.get("download")),
+        )
+        self.rate_limiter = RateLimiter.from_config(config)
         self.retry_handler = RetryHandler(max_retries=int(config.get("retry_times", 3) or 3))
         self.queue_manager = QueueManager(max_workers=int(config.get("thread", 5) or 5))
 
@@ -87,6 +92,9 @@ async def _execute_download(url: str, deps: "_ServerDeps") -> Dict[str, int]:
     async with DouyinAPIClient(
         deps.cookie_manager.get_cookies(),
         proxy=deps.config.get("proxy"),
+        connection_config=deps.config.get("connection"),
+        rate_limiter=deps.rate_limiter,
+        signing_config=deps.config.get("signing"),
     ) as api_client:
         if is_short_url(url):
             resolved = await api_client.resolve_short_url(normalize_short_url(url))
@@ -140,10 +148,24 @@ def build_app(config: ConfigLoader) -> FastAPI:
         ),
     )
 
+    local_index_cfg = config.get("local_index") or {}
+    if not isinstance(local_index_cfg, dict):
+        local_index_cfg = {}
+
     @asynccontextmanager
     async def lifespan(app: FastAPI):
+        # 常驻服务里用户可能随时删除 / 移动已下载文件，按需监听下载目录。
+        watcher = None
+        if local_index_cfg.get("watch"):
+            watcher = watch_local_media_index(deps.file_manager.base_path)
         yield
+        if watcher is not None:
+            watcher.stop()
         await manager.shutdown()
+        await deps.file_manager.close()
+        if deps.file_manager.scoreboard is not None:
+            deps.file_manager.scoreboard.save()
+        save_local_media_indexes()
 
     app = FastAPI(
         title="Douyin Downloader API",
@@ -158,6 +180,10 @@ def build_app(config: ConfigLoader) -> FastAPI:
     async def health() -> Dict[str, str]:
         return {"status": "ok"}
 
+    @app.get("/api/v1/metrics")
+    async def metrics() -> Dict[str, Any]:
+        return {"rate_limiter": deps.rate_limiter.stats()}
+
     @app.post("/api/v1/download", response_model=JobResponse)
     async def create_job(req: DownloadRequest) -> JobResponse:
         if not req.url:
@@ -1,11 +1,22 @@
 import asyncio
 import json
+import re
+import sqlite3
+import zlib
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set
 from urllib.parse import urlparse
 
 import aiosqlite
 
+from utils import json_codec
+from utils.logger import setup_logger
+
+logger = setup_logger("Database")
+
 
 def order_cover_mirrors(urls: List[Any]) -> List[str]:
     """封面镜像排序:p3-* 域名 403 概率高,置后;保序截断 3 个。
@@ -19,6 +30,40 @@ def order_cover_mirrors(urls: List[Any]) -> List[str]:
     return (non_p3 + p3)[:3]
 
 
+def aweme_tags(aweme: Dict[str, Any]) -> List[str]:
+    """Hashtags of an aweme payload (text_extra, cha_list, ``#tag`` in desc),
+    de-duplicated in first-seen order.
+
+    Lives here rather than in core so the tags backfill below can share it.
+    """
+    tags: List[str] = []
+
+    def _append_tag(raw_tag: Any):
+        if not raw_tag:
+            return
+        normalized_tag = str(raw_tag).strip().lstrip("#")
+        if normalized_tag and normalized_tag not in tags:
+            tags.append(normalized_tag)
+
+    for item in aweme.get("text_extra") or []:
+        if not isinstance(item, dict):
+            continue
+        _append_tag(item.get("hashtag_name"))
+        _append_tag(item.get("tag_name"))
+
+    for item in aweme.get("cha_list") or []:
+        if not isinstance(item, dict):
+            continue
+        _append_tag(item.get("cha_name"))
+        _append_tag(item.get("name"))
+
+    desc = aweme.get("desc") or ""
+    for hashtag in re.findall(r"#([^\s#]+)", desc):
+        _append_tag(hashtag)
+
+    return tags
+
+
 def _escape_like(value: str) -> str:
     """Escape LIKE wildcards so user input matches literally.
 
@@ -37,7 +82,7 @@ def _cover_urls_from_metadata(metadata: str) -> str:
     if not metadata:
         return ""
     try:
-        meta = json.loads(metadata)
+        meta = json_codec.loads(metadata)
     except (ValueError, TypeError):
         return ""
     if not isinstance(meta, dict):
@@ -51,10 +96,145 @@ def _cover_urls_from_metadata(metadata: str) -> str:
     return json.dumps(ordered) if ordered else ""
 
 
+# is_downloaded_many 每条 IN (...) 语句的 id 数，低于 SQLite 历史参数上限 999。
+_ID_LOOKUP_CHUNK = 500
+# 与 is_downloaded 相同的"已下载"判定：file_path 非空。
+_DOWNLOADED_CLAUSE = "file_path IS NOT NULL AND file_path != ''"
+# aweme_blob 的压缩方式；codec 列留给以后换算法时区分旧数据。
+_BLOB_CODEC = "zlib"
+_BLOB_COMPRESS_LEVEL = 6
+# 迁移时每页搬运的行数：元数据单条 50-300 KB，一页约几十 MB 内存。
+_BLOB_MIGRATION_PAGE = 200
+# 短于 3 个字符的检索词 trigram 索引用不上，退回 LIKE。
+_FTS_MIN_TERM = 3
+_FTS_ROW = (
+    "INSERT INTO aweme_fts (rowid, title, author_name, tags) "
+    "VALUES (new.id, COALESCE(new.title, ''), COALESCE(new.author_name, ''), new.tags);"
+)
+_FTS_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS aweme_fts_ai AFTER INSERT ON aweme BEGIN {_FTS_ROW} END",
+    "CREATE TRIGGER IF NOT EXISTS aweme_fts_ad AFTER DELETE ON aweme BEGIN "
+    "DELETE FROM aweme_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS aweme_fts_au AFTER UPDATE OF title, author_name, tags ON aweme "
+    "WHEN old.title IS NOT new.title OR old.author_name IS NOT new.author_name "
+    "OR old.tags IS NOT new.tags BEGIN "
+    f"DELETE FROM aweme_fts WHERE rowid = old.id; {_FTS_ROW} END",
+)
+
+
+def _compress_metadata(metadata: str) -> bytes:
+    return zlib.compress(metadata.encode("utf-8"), _BLOB_COMPRESS_LEVEL)
+
+
+def _decompress_metadata(codec: str, data: bytes) -> str:
+    if codec != _BLOB_CODEC:
+        raise ValueError(f"unknown aweme_blob codec: {codec}")
+    return zlib.decompress(data).decode("utf-8")
+
+
+def _tags_from_row(metadata: Optional[str], codec: Optional[str], data: Optional[bytes]) -> str:
+    """tags 回填：从行内元数据或 aweme_blob 里解析出空格分隔的话题。"""
+    try:
+        if data is not None:
+            metadata = _decompress_metadata(codec or "", data)
+        meta = json_codec.loads(metadata) if metadata else None
+    except (ValueError, zlib.error):
+        return ""
+    return " ".join(aweme_tags(meta)) if isinstance(meta, dict) else ""
+
+
+_HISTORY_COLUMNS = (
+    "aweme_id, aweme_type, title, author_id, author_name, "
+    "author_sec_uid, create_time, download_time, file_path, cover_urls, job_id"
+)
+
+
+def _parse_covers(raw: Any) -> List[str]:
+    if not raw:
+        return []
+    try:
+        parsed = json.loads(raw)
+    except (ValueError, TypeError):
+        return []
+    if not isinstance(parsed, list):
+        return []
+    return [u for u in parsed if isinstance(u, str) and u]
+
+
+def _history_item(r: Sequence[Any]) -> Dict[str, Any]:
+    return {
+        "aweme_id": r[0],
+        "aweme_type": r[1],
+        "title": r[2],
+        "author_id": r[3],
+        "author_name": r[4],
+        "author_sec_uid": r[5],
+        "create_time": r[6],
+        "download_time": r[7],
+        "file_path": r[8],
+        "cover_urls": _parse_covers(r[9]),
+        "job_id": r[10] or "",
+    }
+
+
+def _fts_phrase(column: Optional[str], term: str) -> str:
+    phrase = '"' + term.replace('"', '""') + '"'
+    return f"{column} : {phrase}" if column else phrase
+
+
+@dataclass
+class _PendingWrite:
+    """写后台队列里的一条写入：同一条 SQL 的若干行参数。"""
+
+    sql: str
+    rows: List[Sequence[Any]]
+    # 已下载的作品 id：提交成功后记入 _downloaded_ids，成败都从 _pending_downloaded 移除。
+    aweme_ids: List[str] = field(default_factory=list)
+
+
 class Database:
-    def __init__(self, db_path: str = "dy_downloader.db"):
+    def __init__(
+        self,
+        db_path: str = "dy_downloader.db",
+        *,
+        cache_downloaded_ids: bool = False,
+        write_behind: bool = False,
+        write_batch_size: int = 200,
+        write_interval_ms: float = 500,
+        read_pool_size: int = 0,
+    ):
         self.db_path = db_path
+        # cache_downloaded_ids=True 时首次查询把全库已下载 id 读进内存，之后
+        # 随写入 / 删除增量维护，去重查询不再访问 SQLite。其他进程对同一个
+        # 库的写入不会反映到缓存里，因此默认关闭。
+        self._cache_downloaded_ids = cache_downloaded_ids
+        self._downloaded_ids: Optional[Set[str]] = None
+        # write_behind=True 时 add_aweme / add_aweme_batch / add_history 只入队，
+        # 由一个后台任务攒够 write_batch_size 行或等满 write_interval_ms 后在
+        # 一个事务里提交（group commit）。崩溃最多丢失这一个窗口内的写入；
+        # flush() / close() 是持久化点。
+        self.write_behind = write_behind
+        self._write_batch_size = max(int(write_batch_size), 1)
+        self._write_interval = max(float(write_interval_ms), 0.0) / 1000
+        self._write_buffer: List[_PendingWrite] = []
+        self._buffered_rows = 0
+        self._flush_waiters: List[asyncio.Future] = []
+        self._write_ready: Optional[asyncio.Event] = None
+        self._write_kick: Optional[asyncio.Event] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        # 已入队、尚未提交的已下载作品 id；去重查询把它们视为已下载。
+        self._pending_downloaded: Set[str] = set()
+        # read_pool_size > 0 时，读查询（历史列表、排行、任务记录、去重）走
+        # 最多这么多条只读连接。aiosqlite 每条连接一个工作线程，单连接时
+        # 大列表查询要排在逐条去重和写入后面；WAL 模式下多个读连接可以与
+        # 写连接并发。只读连接只看得到已提交的数据。
+        self._read_pool_size = max(int(read_pool_size), 0)
+        self._readers: List[aiosqlite.Connection] = []
+        self._readers_opening = 0
+        self._idle_readers: Optional[asyncio.Queue] = None
         self._initialized = False
+        # initialize() 确认 aweme_fts 可用后置 True；否则检索走 LIKE。
+        self._fts_enabled = False
         self._conn: Optional[aiosqlite.Connection] = None
         # 延迟到首次 _get_conn 调用时在当前 event loop 上创建 Lock，
         # 避免在 __init__ 阶段抢到错误的 loop。
@@ -70,6 +250,32 @@ class Database:
                 self._conn = await aiosqlite.connect(self.db_path)
         return self._conn
 
+    @asynccontextmanager
+    async def _read_conn(self) -> AsyncIterator[aiosqlite.Connection]:
+        """借一条只读连接；未开启读连接池、尚未初始化或内存库时用写连接。"""
+        if self._read_pool_size <= 0 or not self._initialized or self.db_path == ":memory:":
+            yield await self._get_conn()
+            return
+        if self._idle_readers is None:
+            self._idle_readers = asyncio.Queue()
+        if self._idle_readers.empty() and (
+            len(self._readers) + self._readers_opening < self._read_pool_size
+        ):
+            self._readers_opening += 1
+            try:
+                conn = await aiosqlite.connect(
+                    f"{Path(self.db_path).resolve().as_uri()}?mode=ro", uri=True
+                )
+            finally:
+                self._readers_opening -= 1
+            self._readers.append(conn)
+        else:
+            conn = await self._idle_readers.get()
+        try:
+            yield conn
+        finally:
+            self._idle_readers.put_nowait(conn)
+
     async def initialize(self):
         if self._initialized:
             return
@@ -153,9 +359,7 @@ class Database:
             )
         """)
 
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_aweme_id ON aweme(aweme_id)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_author_id ON aweme(author_id)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_download_time ON aweme(download_time)")
         await db.execute(
             "CREATE INDEX IF NOT EXISTS idx_transcript_aweme_id ON transcript_job(aweme_id)"
         )
@@ -224,23 +428,309 @@ class Database:
                 "ALTER TABLE aweme ADD COLUMN job_id TEXT NOT NULL DEFAULT ''"
             )
 
+        await self._ensure_aweme_indexes(db)
+
+        # Incremental migration: the full aweme-detail JSON moves out of
+        # aweme.metadata into a compressed side table, so listing queries
+        # stop paging 50-300 KB blobs through the cache. aweme.metadata is
+        # kept (empty for new rows) for schema compatibility; rows other
+        # writers still fill inline are read back by get_aweme_metadata.
+        cursor = await db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'aweme_blob'"
+        )
+        blob_table_exists = await cursor.fetchone() is not None
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS aweme_blob (
+                aweme_id TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                data BLOB NOT NULL
+            )
+        """)
+        await db.commit()
+
+        # Incremental migration: hashtags for full-text search. Backfilled
+        # once from the stored payloads (inline or already in aweme_blob);
+        # runs before the blob move so legacy rows parse without inflating.
+        if "tags" not in existing_columns:
+            await db.execute("ALTER TABLE aweme ADD COLUMN tags TEXT NOT NULL DEFAULT ''")
+            await db.commit()
+            await self._backfill_tags(db)
+
+        if not blob_table_exists:
+            await self._migrate_metadata_to_blobs(db)
+
+        self._fts_enabled = await self._ensure_fts(db)
+
         await db.commit()
         self._initialized = True
 
+    async def _ensure_aweme_indexes(self, db: aiosqlite.Connection) -> None:
+        """Composite / partial indexes shaped after the hot aweme queries.
+
+        tests/test_database_query_plans.py runs EXPLAIN QUERY PLAN on a
+        seeded 1M-row library and fails if any of them falls back to a
+        table scan — change a query's WHERE / ORDER BY, update these too.
+        Partial indexes carry the exact ``_DOWNLOADED_CLAUSE`` text so the
+        planner can prove the queries' downloaded-only predicate implies it.
+        """
+        # aweme_id 已有 UNIQUE 约束自带的索引，单列 idx_aweme_id 只是重复
+        # 维护一份；idx_download_time 被下面带 file_path 条件的部分索引取代。
+        await db.execute("DROP INDEX IF EXISTS idx_aweme_id")
+        await db.execute("DROP INDEX IF EXISTS idx_download_time")
+        # is_downloaded / is_downloaded_many / id 缓存加载：只查已下载行，
+        # 覆盖索引不回表；历史页的 COUNT(*) 也扫这份更小的索引。
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_aweme_downloaded "
+            f"ON aweme(aweme_id) WHERE {_DOWNLOADED_CLAUSE}"
+        )
+        # get_latest_aweme_time：作者增量基线，MAX(create_time) 直接取索引末端。
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_aweme_downloaded_author_ctime "
+            f"ON aweme(author_id, create_time) WHERE {_DOWNLOADED_CLAUSE}"
+        )
+        # get_aweme_history 两种排序的分页：按索引顺序取前 N 条，不做临时排序。
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_aweme_downloaded_dtime "
+            f"ON aweme(download_time) WHERE {_DOWNLOADED_CLAUSE}"
+        )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_aweme_downloaded_ctime "
+            f"ON aweme(create_time) WHERE {_DOWNLOADED_CLAUSE}"
+        )
+        # get_top_authors：create_time 区间 + 按 sec_uid 分组走覆盖索引；
+        # 取作者名的关联子查询按 sec_uid 定位、download_time 倒序（通常
+        # 回表一次就拿到非空作者名）。后者同时服务历史页按 author_sec_uid
+        # 过滤，rowid 隐含在末尾，download_time DESC, id DESC 无需再排序。
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_aweme_ctime_sec_uid "
+            "ON aweme(create_time, author_sec_uid)"
+        )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_aweme_sec_uid_dtime "
+            "ON aweme(author_sec_uid, download_time)"
+        )
+        # 任务详情页按 job_id 列出作品。
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_aweme_job_dtime ON aweme(job_id, download_time)"
+        )
+        await db.commit()
+
+    async def _backfill_tags(self, db: aiosqlite.Connection) -> None:
+        last_id = 0
+        while True:
+            cursor = await db.execute(
+                "SELECT a.id, a.metadata, b.codec, b.data FROM aweme a "
+                "LEFT JOIN aweme_blob b ON b.aweme_id = a.aweme_id "
+                "WHERE a.id > ? ORDER BY a.id LIMIT ?",
+                (last_id, _BLOB_MIGRATION_PAGE),
+            )
+            rows = await cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            def _parse(page: List[Any] = rows) -> List[tuple]:
+                updates = []
+                for row_id, metadata, codec, data in page:
+                    tags = _tags_from_row(metadata, codec, data)
+                    if tags:
+                        updates.append((tags, row_id))
+                return updates
+
+            updates = await asyncio.to_thread(_parse)
+            if updates:
+                await db.executemany("UPDATE aweme SET tags = ? WHERE id = ?", updates)
+            await db.commit()
+
+    async def _ensure_fts(self, db: aiosqlite.Connection) -> bool:
+        """Create the aweme_fts search index and its sync triggers, and
+        resume the backfill of pre-existing rows if one is unfinished.
+
+        trigram tokenizer: 中文标题没有空格分词，unicode61 会把整句当成一个
+        词；trigram 按三字滑窗建索引，短语查询就是子串匹配，与 LIKE
+        语义一致。SQLite 不带 FTS5 / trigram（< 3.34）时返回 False，检索
+        退回 LIKE 扫表。
+        """
+        cursor = await db.execute(
+            "SELECT name FROM sqlite_master WHERE name IN ('aweme_fts', 'aweme_fts_ai')"
+        )
+        existing = {row[0] for row in await cursor.fetchall()}
+        if "aweme_fts" not in existing or "aweme_fts_ai" not in existing:
+            # 虚表、触发器和回填进度在同一个事务里建好：此后任何进程（包括
+            # 桌面端）写入的行都由触发器同步，回填只需补齐建表前已有的行。
+            # 表在而触发器不在，是早先版本回填中途被打断留下的半成品，重建。
+            await db.commit()
+            await db.execute("BEGIN")
+            try:
+                await db.execute("DROP TABLE IF EXISTS aweme_fts")
+                await db.execute(
+                    "CREATE VIRTUAL TABLE aweme_fts "
+                    "USING fts5(title, author_name, tags, tokenize = 'trigram')"
+                )
+            except sqlite3.OperationalError as e:
+                await db.rollback()
+                logger.warning("SQLite FTS5 trigram unavailable, search falls back to LIKE: %s", e)
+                return False
+            await db.execute(
+                "CREATE TABLE IF NOT EXISTS aweme_fts_backfill "
+                "(last_id INTEGER NOT NULL, max_id INTEGER NOT NULL)"
+            )
+            await db.execute("DELETE FROM aweme_fts_backfill")
+            await db.execute(
+                "INSERT INTO aweme_fts_backfill (last_id, max_id) "
+                "SELECT 0, COALESCE(MAX(id), 0) FROM aweme"
+            )
+            for statement in _FTS_TRIGGERS:
+                await db.execute(statement)
+            await db.commit()
+        # IF NOT EXISTS：每次启动都补一遍，触发器被误删也能自愈。
+        for statement in _FTS_TRIGGERS:
+            await db.execute(statement)
+        await db.commit()
+        await self._backfill_fts(db)
+        return True
+
+    async def _backfill_fts(self, db: aiosqlite.Connection) -> None:
+        """Index rows that predate aweme_fts, resuming from the last committed
+        page. The progress row is dropped once done, so finished libraries
+        pay one sqlite_master lookup per start."""
+        cursor = await db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'aweme_fts_backfill'"
+        )
+        if await cursor.fetchone() is None:
+            return
+        cursor = await db.execute("SELECT last_id, max_id FROM aweme_fts_backfill")
+        progress = await cursor.fetchone()
+        last_id, max_id = progress if progress else (0, 0)
+        while last_id < max_id:
+            cursor = await db.execute(
+                "SELECT id, COALESCE(title, ''), COALESCE(author_name, ''), tags "
+                "FROM aweme WHERE id > ? AND id <= ? ORDER BY id LIMIT 5000",
+                (last_id, max_id),
+            )
+            rows = await cursor.fetchall()
+            last_id = rows[-1][0] if rows else max_id
+            # 触发器可能已经写过其中的行（建表后被更新过），OR REPLACE 保持幂等；
+            # 索引行与进度同一事务提交，中途被杀下次从这里接着补。
+            await db.executemany(
+                "INSERT OR REPLACE INTO aweme_fts (rowid, title, author_name, tags) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            await db.execute("UPDATE aweme_fts_backfill SET last_id = ?", (last_id,))
+            await db.commit()
+        await db.execute("DROP TABLE aweme_fts_backfill")
+        await db.commit()
+
+    async def _migrate_metadata_to_blobs(self, db: aiosqlite.Connection) -> None:
+        """One-shot move of inline metadata into aweme_blob (keyset-paginated
+        like the cover_urls backfill; each page commits on its own)."""
+        moved = 0
+        last_id = 0
+        while True:
+            cursor = await db.execute(
+                "SELECT id, aweme_id, metadata FROM aweme "
+                "WHERE id > ? AND metadata IS NOT NULL AND metadata != '' "
+                "ORDER BY id LIMIT ?",
+                (last_id, _BLOB_MIGRATION_PAGE),
+            )
+            rows = await cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            blobs = await asyncio.to_thread(
+                lambda: [(aid, _BLOB_CODEC, _compress_metadata(meta)) for _id, aid, meta in rows]
+            )
+            await db.executemany(self._BLOB_UPSERT_SQL, blobs)
+            await db.executemany(
+                "UPDATE aweme SET metadata = '' WHERE id = ?", [(row[0],) for row in rows]
+            )
+            await db.commit()
+            moved += len(rows)
+        if not moved:
+            return
+        logger.info("Moved metadata of %d awemes into aweme_blob, compacting database", moved)
+        try:
+            await db.execute("VACUUM")
+        except sqlite3.OperationalError as e:
+            # 其他进程（桌面端）正开着同一个库时拿不到独占锁；空闲页
+            # 之后会被新写入复用，下次也不会再重试。
+            logger.warning("VACUUM after metadata migration skipped: %s", e)
+
     async def is_downloaded(self, aweme_id: str) -> bool:
         # Row existence is NOT enough: rows can exist with an empty
         # file_path (e.g. synced from the desktop sibling's my-content
         # feature). Treating those as "downloaded" would make like-mode
         # incremental batches stop at the first such row.
-        db = await self._get_conn()
-        cursor = await db.execute(
-            "SELECT id FROM aweme WHERE aweme_id = ? "
-            "AND file_path IS NOT NULL AND file_path != ''",
-            (aweme_id,),
-        )
-        result = await cursor.fetchone()
+        if aweme_id in self._pending_downloaded:
+            return True
+        downloaded_ids = await self._cached_downloaded_ids()
+        if downloaded_ids is not None:
+            return aweme_id in downloaded_ids
+        async with self._read_conn() as db:
+            cursor = await db.execute(
+                "SELECT id FROM aweme WHERE aweme_id = ? "
+                f"AND {_DOWNLOADED_CLAUSE}",
+                (aweme_id,),
+            )
+            result = await cursor.fetchone()
         return result is not None
 
+    async def is_downloaded_many(self, aweme_ids: Iterable[str]) -> Set[str]:
+        """Return the subset of ``aweme_ids`` that is downloaded (same rule as
+        :meth:`is_downloaded`).
+
+        One ``IN (...)`` query per 500 ids — a 20-item page costs one
+        round-trip, or none when the id cache is enabled.
+        """
+        unique_ids = list(dict.fromkeys(str(aid) for aid in aweme_ids if aid))
+        if not unique_ids:
+            return set()
+        found = {aid for aid in unique_ids if aid in self._pending_downloaded}
+        downloaded_ids = await self._cached_downloaded_ids()
+        if downloaded_ids is not None:
+            return found | {aid for aid in unique_ids if aid in downloaded_ids}
+
+        async with self._read_conn() as db:
+            for start in range(0, len(unique_ids), _ID_LOOKUP_CHUNK):
+                chunk = unique_ids[start : start + _ID_LOOKUP_CHUNK]
+                placeholders = ",".join("?" for _ in chunk)
+                cursor = await db.execute(
+                    f"SELECT aweme_id FROM aweme "
+                    f"WHERE aweme_id IN ({placeholders}) AND {_DOWNLOADED_CLAUSE}",
+                    chunk,
+                )
+                found.update(row[0] for row in await cursor.fetchall())
+        return found
+
+    async def _cached_downloaded_ids(self) -> Optional[Set[str]]:
+        """开启 id 缓存时返回已下载 id 集合（首次调用时整表加载），否则 None。"""
+        if not self._cache_downloaded_ids:
+            return None
+        if self._downloaded_ids is None:
+            async with self._read_conn() as db:
+                # 部分索引只含已下载行、比整表窄；SQLite 不把它当覆盖索引，
+                # 有统计信息时会改扫整表，所以显式指定。
+                cursor = await db.execute(
+                    "SELECT aweme_id FROM aweme INDEXED BY idx_aweme_downloaded "
+                    f"WHERE {_DOWNLOADED_CLAUSE}"
+                )
+                loaded = {row[0] for row in await cursor.fetchall()}
+            # 加载期间可能已有写入抢先建好了集合，以先到者为准再合并。
+            if self._downloaded_ids is None:
+                self._downloaded_ids = loaded
+            else:
+                self._downloaded_ids |= loaded
+        return self._downloaded_ids
+
+    def _remember_downloaded(self, items: Iterable[Dict[str, Any]]) -> None:
+        # 保留式 upsert 不会清空已有的 file_path，所以只需要加、不需要删。
+        if self._downloaded_ids is None:
+            return
+        self._downloaded_ids.update(
+            str(item.get("aweme_id")) for item in items if item.get("file_path")
+        )
+
     # Preserving upsert: metadata-ish fields always update, but download
     # artifacts (file_path / metadata / download_time) and enrichments
     # (cover_urls / job_id) survive upserts that arrive without them.
@@ -249,8 +739,8 @@ class Database:
     _AWEME_UPSERT_SQL = """
         INSERT INTO aweme
         (aweme_id, aweme_type, title, author_id, author_name, author_sec_uid,
-         create_time, download_time, file_path, metadata, cover_urls, job_id)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+         create_time, download_time, file_path, metadata, cover_urls, job_id, tags)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ON CONFLICT(aweme_id) DO UPDATE SET
           aweme_type = CASE WHEN COALESCE(excluded.aweme_type, '') != ''
                             THEN excluded.aweme_type
@@ -284,9 +774,31 @@ class Database:
                             ELSE aweme.cover_urls END,
           job_id = CASE WHEN excluded.job_id != ''
                         THEN excluded.job_id
-                        ELSE aweme.job_id END
+                        ELSE aweme.job_id END,
+          tags = CASE WHEN excluded.tags != ''
+                      THEN excluded.tags
+                      ELSE aweme.tags END
+    """
+
+    # Same preserving rule as aweme.metadata: only non-empty payloads are
+    # written, so an empty projection never drops a stored blob.
+    _BLOB_UPSERT_SQL = """
+        INSERT INTO aweme_blob (aweme_id, codec, data) VALUES (?, ?, ?)
+        ON CONFLICT(aweme_id) DO UPDATE SET codec = excluded.codec, data = excluded.data
     """
 
+    @staticmethod
+    async def _blob_rows(items: Iterable[Dict[str, Any]]) -> List[tuple]:
+        payloads = [
+            (item.get("aweme_id"), item["metadata"]) for item in items if item.get("metadata")
+        ]
+        if not payloads:
+            return []
+        # zlib 压缩会释放 GIL；放进线程，避免大元数据压缩卡住事件循环。
+        return await asyncio.to_thread(
+            lambda: [(aid, _BLOB_CODEC, _compress_metadata(meta)) for aid, meta in payloads]
+        )
+
     @staticmethod
     def _aweme_upsert_row(
         item: Dict[str, Any], sec_uid: Optional[str], now_ts: int
@@ -302,9 +814,11 @@ class Database:
             item.get("create_time"),
             now_ts if file_path else None,
             item.get("file_path"),
-            item.get("metadata"),
+            # 完整元数据存进 aweme_blob（见 _blob_rows），行内列留空。
+            "",
             item.get("cover_urls") or "",
             item.get("job_id") or "",
+            item.get("tags") or "",
         )
 
     async def add_aweme(
@@ -317,11 +831,19 @@ class Database:
         # Prefer the explicit kwarg; fall back to a key on the payload so existing
         # callers (tests, legacy downloaders) keep working.
         sec_uid = author_sec_uid if author_sec_uid is not None else aweme_data.get("author_sec_uid")
-        await db.execute(
-            self._AWEME_UPSERT_SQL,
-            self._aweme_upsert_row(aweme_data, sec_uid, int(datetime.now().timestamp())),
-        )
-        await db.commit()
+        row = self._aweme_upsert_row(aweme_data, sec_uid, int(datetime.now().timestamp()))
+        blobs = await self._blob_rows([aweme_data])
+        if self.write_behind:
+            self._enqueue_aweme_rows([row], blobs, [aweme_data])
+            return
+        # 和写后台共用连接：不持锁的话，写后台组提交失败时的 rollback 会把
+        # 夹在中间的这次写入一并回滚。
+        async with self._get_conn_lock():
+            await db.execute(self._AWEME_UPSERT_SQL, row)
+            if blobs:
+                await db.executemany(self._BLOB_UPSERT_SQL, blobs)
+            await db.commit()
+        self._remember_downloaded([aweme_data])
 
     async def add_aweme_batch(self, items: List[Dict[str, Any]]) -> None:
         """Upsert N awemes in a single transaction (same preserving semantics
@@ -334,39 +856,175 @@ class Database:
             self._aweme_upsert_row(item, item.get("author_sec_uid"), now_ts)
             for item in items
         ]
-        await db.executemany(self._AWEME_UPSERT_SQL, rows)
-        await db.commit()
+        blobs = await self._blob_rows(items)
+        if self.write_behind:
+            self._enqueue_aweme_rows(rows, blobs, items)
+            return
+        async with self._get_conn_lock():
+            await db.executemany(self._AWEME_UPSERT_SQL, rows)
+            if blobs:
+                await db.executemany(self._BLOB_UPSERT_SQL, blobs)
+            await db.commit()
+        self._remember_downloaded(items)
+
+    def _enqueue_aweme_rows(
+        self, rows: List[tuple], blobs: List[tuple], items: Iterable[Dict[str, Any]]
+    ) -> None:
+        aweme_ids = [str(item.get("aweme_id")) for item in items if item.get("file_path")]
+        self._pending_downloaded.update(aweme_ids)
+        self._enqueue_write(_PendingWrite(self._AWEME_UPSERT_SQL, rows, aweme_ids))
+        if blobs:
+            self._enqueue_write(_PendingWrite(self._BLOB_UPSERT_SQL, blobs))
+
+    async def get_aweme_metadata(self, aweme_id: str) -> Optional[str]:
+        """Full aweme-detail JSON text for one aweme, or None when not stored.
+
+        Listing queries never touch the payload; callers that need it
+        fetch it here on demand.
+        """
+        await self.flush()
+        async with self._read_conn() as db:
+            cursor = await db.execute(
+                "SELECT codec, data FROM aweme_blob WHERE aweme_id = ?", (aweme_id,)
+            )
+            row = await cursor.fetchone()
+            if row is None:
+                # 迁移前写入、或其他进程仍按旧方式写在行内的元数据。
+                cursor = await db.execute(
+                    "SELECT metadata FROM aweme WHERE aweme_id = ?", (aweme_id,)
+                )
+                inline = await cursor.fetchone()
+                return inline[0] if inline and inline[0] else None
+        return await asyncio.to_thread(_decompress_metadata, row[0], row[1])
 
     async def get_latest_aweme_time(self, author_id: str) -> Optional[int]:
         # Same downloaded-only rule as is_downloaded(): non-downloaded rows
         # must not poison the author increment baseline.
-        db = await self._get_conn()
-        cursor = await db.execute(
-            "SELECT MAX(create_time) FROM aweme WHERE author_id = ? "
-            "AND file_path IS NOT NULL AND file_path != ''",
-            (author_id,),
-        )
-        result = await cursor.fetchone()
+        await self.flush()
+        async with self._read_conn() as db:
+            cursor = await db.execute(
+                "SELECT MAX(create_time) FROM aweme WHERE author_id = ? "
+                "AND file_path IS NOT NULL AND file_path != ''",
+                (author_id,),
+            )
+            result = await cursor.fetchone()
         return result[0] if result and result[0] else None
 
+    _HISTORY_INSERT_SQL = """
+        INSERT INTO download_history
+        (url, url_type, download_time, total_count, success_count, config)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """
+
     async def add_history(self, history_data: Dict[str, Any]):
         db = await self._get_conn()
-        await db.execute(
-            """
-            INSERT INTO download_history
-            (url, url_type, download_time, total_count, success_count, config)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """,
-            (
-                history_data.get("url"),
-                history_data.get("url_type"),
-                int(datetime.now().timestamp()),
-                history_data.get("total_count"),
-                history_data.get("success_count"),
-                history_data.get("config"),
-            ),
+        row = (
+            history_data.get("url"),
+            history_data.get("url_type"),
+            int(datetime.now().timestamp()),
+            history_data.get("total_count"),
+            history_data.get("success_count"),
+            history_data.get("config"),
         )
-        await db.commit()
+        if self.write_behind:
+            self._enqueue_write(_PendingWrite(self._HISTORY_INSERT_SQL, [row]))
+            return
+        async with self._get_conn_lock():
+            await db.execute(self._HISTORY_INSERT_SQL, row)
+            await db.commit()
+
+    # ------------------------------------------------------------------
+    # Write-behind group commit
+    # ------------------------------------------------------------------
+
+    def _enqueue_write(self, write: _PendingWrite) -> None:
+        if self._writer_task is None or self._writer_task.done():
+            self._write_ready = asyncio.Event()
+            self._write_kick = asyncio.Event()
+            self._writer_task = asyncio.get_running_loop().create_task(self._writer_loop())
+        self._write_buffer.append(write)
+        self._buffered_rows += len(write.rows)
+        self._write_ready.set()
+        if self._buffered_rows >= self._write_batch_size:
+            self._write_kick.set()
+
+    async def flush(self) -> None:
+        """等待此前入队的写入全部提交（持久化点）；未开启写后台时立即返回。"""
+        if self._writer_task is None or self._writer_task.done():
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._flush_waiters.append(waiter)
+        self._write_ready.set()
+        self._write_kick.set()
+        await waiter
+
+    async def _writer_loop(self) -> None:
+        while True:
+            await self._write_ready.wait()
+            if not self._write_kick.is_set():
+                try:
+                    await asyncio.wait_for(self._write_kick.wait(), self._write_interval)
+                except asyncio.TimeoutError:
+                    pass
+            batch, waiters = self._write_buffer, self._flush_waiters
+            self._write_buffer, self._flush_waiters, self._buffered_rows = [], [], 0
+            self._write_ready.clear()
+            self._write_kick.clear()
+            try:
+                await self._commit_writes(batch)
+            except Exception as e:  # noqa: BLE001 - 写后台任务不能因单次失败退出
+                logger.error("Database writer failed to commit %d writes: %s", len(batch), e)
+            finally:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+
+    async def _commit_writes(self, batch: List[_PendingWrite]) -> None:
+        if not batch:
+            return
+        # 同一条 SQL 的写入合并成一次 executemany。各条 SQL 写不同的表
+        # （aweme / aweme_blob / download_history），同一条 SQL 内保持入队顺序。
+        grouped: Dict[str, _PendingWrite] = {}
+        for write in batch:
+            group = grouped.setdefault(write.sql, _PendingWrite(write.sql, []))
+            group.rows.extend(write.rows)
+        groups = list(grouped.values())
+        committed: List[_PendingWrite] = []
+        db = await self._get_conn()
+        try:
+            async with self._get_conn_lock():
+                try:
+                    for group in groups:
+                        await db.executemany(group.sql, group.rows)
+                    await db.commit()
+                    committed = batch
+                except sqlite3.Error as e:
+                    # 整组失败（某一行违反约束等）时逐条重试，只丢坏掉的那条。
+                    logger.warning(
+                        "Group commit of %d writes failed, retrying one by one: %s", len(batch), e
+                    )
+                    await db.rollback()
+                    for write in batch:
+                        try:
+                            await db.executemany(write.sql, write.rows)
+                            await db.commit()
+                            committed.append(write)
+                        except sqlite3.Error as write_error:
+                            await db.rollback()
+                            logger.error("Dropped database write: %s", write_error)
+        finally:
+            # 进程级 id 缓存只收真正落盘的写入：被丢弃的作品不能在本次运行里
+            # 一直被当成已下载而跳过。先记缓存再出待提交集合，去重不留空窗。
+            if self._downloaded_ids is not None:
+                for write in committed:
+                    self._downloaded_ids.update(write.aweme_ids)
+            for write in batch:
+                self._pending_downloaded.difference_update(write.aweme_ids)
+
+    def _get_conn_lock(self) -> asyncio.Lock:
+        if self._conn_lock is None:
+            self._conn_lock = asyncio.Lock()
+        return self._conn_lock
 
     async def get_aweme_history(
         self,
@@ -390,15 +1048,14 @@ class Database:
         `author_sec_uid` and `job_id` are exact.
         `sort` is ``download_time`` (default) or ``create_time`` — both DESC.
         """
-        db = await self._get_conn()
+        await self.flush()
         # Rows without a file_path carry no downloaded artifact (the desktop
         # sibling's my-content sync inserts such rows) — History is a
         # download log, so they are always excluded.
         where: list = ["file_path IS NOT NULL AND file_path != ''"]
         params: list = []
         if author:
-            where.append("LOWER(COALESCE(author_name, '')) LIKE ? ESCAPE '\\'")
-            params.append(f"%{_escape_like(author.lower())}%")
+            self._add_text_filter(where, params, "author_name", author)
         if author_sec_uid:
             where.append("author_sec_uid = ?")
             params.append(author_sec_uid)
@@ -415,61 +1072,100 @@ class Database:
             where.append("aweme_type = ?")
             params.append(aweme_type)
         if title:
-            where.append("LOWER(COALESCE(title, '')) LIKE ? ESCAPE '\\'")
-            params.append(f"%{_escape_like(title.lower())}%")
+            self._add_text_filter(where, params, "title", title)
         where_sql = ("WHERE " + " AND ".join(where)) if where else ""
 
-        cursor = await db.execute(f"SELECT COUNT(*) FROM aweme {where_sql}", params)
-        row = await cursor.fetchone()
-        total = int(row[0]) if row else 0
-
         order_sql = (
             "create_time DESC, id DESC"
             if sort == "create_time"
             else "download_time DESC, id DESC"
         )
         offset = max(0, (page - 1) * size)
-        cursor = await db.execute(
-            f"SELECT aweme_id, aweme_type, title, author_id, author_name, "
-            f"author_sec_uid, create_time, download_time, file_path, cover_urls, job_id "
-            f"FROM aweme {where_sql} ORDER BY {order_sql} LIMIT ? OFFSET ?",
-            params + [int(size), int(offset)],
-        )
-        rows = await cursor.fetchall()
+        # 不带筛选的总数是整个库计一遍。SQLite 不把部分索引视为覆盖索引，
+        # ANALYZE 之后会改成扫整张表；这里指定扫更窄的部分索引。
+        count_source = "aweme INDEXED BY idx_aweme_downloaded_dtime" if len(where) == 1 else "aweme"
+        async with self._read_conn() as db:
+            cursor = await db.execute(f"SELECT COUNT(*) FROM {count_source} {where_sql}", params)
+            row = await cursor.fetchone()
+            total = int(row[0]) if row else 0
+            cursor = await db.execute(
+                f"SELECT {_HISTORY_COLUMNS} "
+                f"FROM aweme {where_sql} ORDER BY {order_sql} LIMIT ? OFFSET ?",
+                params + [int(size), int(offset)],
+            )
+            rows = await cursor.fetchall()
 
-        def _parse_covers(raw: Any) -> List[str]:
-            if not raw:
-                return []
-            try:
-                parsed = json.loads(raw)
-            except (ValueError, TypeError):
-                return []
-            if not isinstance(parsed, list):
-                return []
-            return [u for u in parsed if isinstance(u, str) and u]
-
-        items = [
-            {
-                "aweme_id": r[0],
-                "aweme_type": r[1],
-                "title": r[2],
-                "author_id": r[3],
-                "author_name": r[4],
-                "author_sec_uid": r[5],
-                "create_time": r[6],
-                "download_time": r[7],
-                "file_path": r[8],
-                "cover_urls": _parse_covers(r[9]),
-                "job_id": r[10] or "",
-            }
-            for r in rows
-        ]
+        items = [_history_item(r) for r in rows]
+        return {"total": total, "page": int(page), "size": int(size), "items": items}
+
+    def _add_text_filter(self, where: list, params: list, column: str, value: str) -> None:
+        """Case-insensitive substring filter on ``column``: through the
+        trigram index when possible, otherwise a LIKE scan."""
+        if self._fts_enabled and len(value) >= _FTS_MIN_TERM:
+            where.append("id IN (SELECT rowid FROM aweme_fts WHERE aweme_fts MATCH ?)")
+            params.append(_fts_phrase(column, value))
+        else:
+            where.append(f"LOWER(COALESCE({column}, '')) LIKE ? ESCAPE '\\'")
+            params.append(f"%{_escape_like(value.lower())}%")
+
+    async def search_aweme(self, query: str, *, page: int = 1, size: int = 50) -> Dict[str, Any]:
+        """Ranked full-text search over downloaded awemes' title, author name
+        and hashtags.
+
+        Whitespace-separated terms are AND-ed; each matches as a
+        case-insensitive substring of any of the three fields. Results are
+        ordered by BM25 relevance (title weighs most), then newest download.
+        Terms shorter than 3 characters cannot use the trigram index and are
+        matched with LIKE; a query made only of such terms (or a SQLite
+        without FTS5) falls back to a LIKE scan ordered by download time.
+        Returns the same shape as :meth:`get_aweme_history`.
+        """
+        await self.flush()
+        terms = query.split()
+        if not terms:
+            return {"total": 0, "page": int(page), "size": int(size), "items": []}
+        indexed = [t for t in terms if self._fts_enabled and len(t) >= _FTS_MIN_TERM]
+        where = ["a.file_path IS NOT NULL AND a.file_path != ''"]
+        params: list = []
+        for term in terms:
+            if term in indexed:
+                continue
+            where.append(
+                "LOWER(COALESCE(a.title, '') || ' ' || COALESCE(a.author_name, '') || ' ' "
+                "|| a.tags) LIKE ? ESCAPE '\\'"
+            )
+            params.append(f"%{_escape_like(term.lower())}%")
+        if indexed:
+            source = "aweme_fts f JOIN aweme a ON a.id = f.rowid"
+            where.insert(0, "aweme_fts MATCH ?")
+            params.insert(0, " AND ".join(_fts_phrase(None, t) for t in indexed))
+            order_sql = "bm25(aweme_fts, 4.0, 2.0, 1.0), a.download_time DESC, a.id DESC"
+        else:
+            source = "aweme a"
+            order_sql = "a.download_time DESC, a.id DESC"
+        where_sql = " AND ".join(where)
+        offset = max(0, (page - 1) * size)
+        columns = ", ".join(f"a.{column.strip()}" for column in _HISTORY_COLUMNS.split(","))
+        async with self._read_conn() as db:
+            cursor = await db.execute(f"SELECT COUNT(*) FROM {source} WHERE {where_sql}", params)
+            row = await cursor.fetchone()
+            total = int(row[0]) if row else 0
+            cursor = await db.execute(
+                f"SELECT {columns} FROM {source} WHERE {where_sql} "
+                f"ORDER BY {order_sql} LIMIT ? OFFSET ?",
+                params + [int(size), int(offset)],
+            )
+            rows = await cursor.fetchall()
+        items = [_history_item(r) for r in rows]
         return {"total": total, "page": int(page), "size": int(size), "items": items}
 
     async def get_aweme_count_by_author(self, author_id: str) -> int:
-        db = await self._get_conn()
-        cursor = await db.execute("SELECT COUNT(*) FROM aweme WHERE author_id = ?", (author_id,))
-        result = await cursor.fetchone()
+        await self.flush()
+        async with self._read_conn() as db:
+            cursor = await db.execute(
+                "SELECT COUNT(*) FROM aweme WHERE author_id = ?", (author_id,)
+            )
+            result = await cursor.fetchone()
         return result[0] if result else 0
 
     async def get_top_authors(self, *, days: int, limit: int) -> List[Dict[str, Any]]:
@@ -489,28 +1185,32 @@ class Database:
         ``download_count``.
         """
         cutoff = int(datetime.now().timestamp()) - int(days) * 86400
-        db = await self._get_conn()
-        cursor = await db.execute(
-            """
-            SELECT a.author_sec_uid,
-                   (SELECT a2.author_name FROM aweme a2
-                     WHERE a2.author_sec_uid = a.author_sec_uid
-                       AND a2.author_name IS NOT NULL
-                       AND a2.author_name != ''
-                     ORDER BY a2.download_time DESC
-                     LIMIT 1) AS author_name,
-                   COUNT(*) AS download_count
-              FROM aweme a
-             WHERE a.create_time >= ?
-               AND a.author_sec_uid IS NOT NULL
-               AND a.author_sec_uid != ''
-             GROUP BY a.author_sec_uid
-             ORDER BY download_count DESC, a.author_sec_uid ASC
-             LIMIT ?
-            """,
-            (cutoff, int(limit)),
-        )
-        rows = await cursor.fetchall()
+        await self.flush()
+        async with self._read_conn() as db:
+            # GROUP BY 上的一元 + 让规划器不去顺着 idx_aweme_sec_uid_dtime 全表
+            # 分组（省掉排序但要回表读每一行的 create_time），而是先用
+            # idx_aweme_ctime_sec_uid 圈出时间窗口内的行再分组。
+            cursor = await db.execute(
+                """
+                SELECT a.author_sec_uid,
+                       (SELECT a2.author_name FROM aweme a2
+                         WHERE a2.author_sec_uid = a.author_sec_uid
+                           AND a2.author_name IS NOT NULL
+                           AND a2.author_name != ''
+                         ORDER BY a2.download_time DESC
+                         LIMIT 1) AS author_name,
+                       COUNT(*) AS download_count
+                  FROM aweme a
+                 WHERE a.create_time >= ?
+                   AND a.author_sec_uid IS NOT NULL
+                   AND a.author_sec_uid != ''
+                 GROUP BY +a.author_sec_uid
+                 ORDER BY download_count DESC, a.author_sec_uid ASC
+                 LIMIT ?
+                """,
+                (cutoff, int(limit)),
+            )
+            rows = await cursor.fetchall()
         return [
             {
                 "sec_uid": row[0],
@@ -523,46 +1223,47 @@ class Database:
     async def upsert_transcript_job(self, job_data: Dict[str, Any]):
         now_ts = int(datetime.now().timestamp())
         db = await self._get_conn()
-        await db.execute(
-            """
-            INSERT INTO transcript_job (
-                aweme_id,
-                video_path,
-                transcript_dir,
-                text_path,
-                json_path,
-                model,
-                status,
-                skip_reason,
-                error_message,
-                created_at,
-                updated_at
+        async with self._get_conn_lock():
+            await db.execute(
+                """
+                INSERT INTO transcript_job (
+                    aweme_id,
+                    video_path,
+                    transcript_dir,
+                    text_path,
+                    json_path,
+                    model,
+                    status,
+                    skip_reason,
+                    error_message,
+                    created_at,
+                    updated_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(aweme_id, video_path, model) DO UPDATE SET
+                    transcript_dir = excluded.transcript_dir,
+                    text_path = excluded.text_path,
+                    json_path = excluded.json_path,
+                    status = excluded.status,
+                    skip_reason = excluded.skip_reason,
+                    error_message = excluded.error_message,
+                    updated_at = excluded.updated_at
+            """,
+                (
+                    job_data.get("aweme_id"),
+                    job_data.get("video_path"),
+                    job_data.get("transcript_dir"),
+                    job_data.get("text_path"),
+                    job_data.get("json_path"),
+                    job_data.get("model") or "gpt-4o-mini-transcribe",
+                    job_data.get("status"),
+                    job_data.get("skip_reason"),
+                    job_data.get("error_message"),
+                    now_ts,
+                    now_ts,
+                ),
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(aweme_id, video_path, model) DO UPDATE SET
-                transcript_dir = excluded.transcript_dir,
-                text_path = excluded.text_path,
-                json_path = excluded.json_path,
-                status = excluded.status,
-                skip_reason = excluded.skip_reason,
-                error_message = excluded.error_message,
-                updated_at = excluded.updated_at
-        """,
-            (
-                job_data.get("aweme_id"),
-                job_data.get("video_path"),
-                job_data.get("transcript_dir"),
-                job_data.get("text_path"),
-                job_data.get("json_path"),
-                job_data.get("model") or "gpt-4o-mini-transcribe",
-                job_data.get("status"),
-                job_data.get("skip_reason"),
-                job_data.get("error_message"),
-                now_ts,
-                now_ts,
-            ),
-        )
-        await db.commit()
+            await db.commit()
 
     async def get_transcript_job(self, aweme_id: str) -> Optional[Dict[str, Any]]:
         db = await self._get_conn()
@@ -615,6 +1316,7 @@ class Database:
                 seen[aid] = None
         unique_ids = list(seen.keys())
 
+        await self.flush()
         db = await self._get_conn()
         if self._conn_lock is None:
             self._conn_lock = asyncio.Lock()
@@ -630,21 +1332,32 @@ class Database:
                 )
                 if cursor.rowcount is not None and cursor.rowcount > 0:
                     deleted += cursor.rowcount
+                await db.execute(
+                    f"DELETE FROM aweme_blob WHERE aweme_id IN ({placeholders})",
+                    chunk,
+                )
             await db.commit()
+        if self._downloaded_ids is not None:
+            self._downloaded_ids.difference_update(unique_ids)
         return deleted
 
     async def truncate_history(self) -> None:
-        """Delete every row from `aweme` and `download_history`.
+        """Delete every row from `aweme` (with its `aweme_blob` payloads) and
+        `download_history`.
 
         Does not touch disk files or any other table (e.g. transcript_job).
         """
+        await self.flush()
         db = await self._get_conn()
         if self._conn_lock is None:
             self._conn_lock = asyncio.Lock()
         async with self._conn_lock:
             await db.execute("DELETE FROM aweme")
+            await db.execute("DELETE FROM aweme_blob")
             await db.execute("DELETE FROM download_history")
             await db.commit()
+        if self._downloaded_ids is not None:
+            self._downloaded_ids.clear()
 
     # ------------------------------------------------------------------
     # Task-center job persistence (see server/jobs.py)
@@ -740,10 +1453,6 @@ class Database:
         disk — see server/jobs.py — but we filter defensively in case an
         older build left stale rows.
         """
-        db = await self._get_conn()
-        if self._conn_lock is None:
-            self._conn_lock = asyncio.Lock()
-
         sql = (
             "SELECT job_id, url, status, created_at, started_at, finished_at, "
             "total, success, failed, skipped, error, author_nickname, "
@@ -755,7 +1464,7 @@ class Database:
         if limit is not None and limit > 0:
             sql += f" LIMIT {int(limit)}"
 
-        async with self._conn_lock:
+        async with self._read_conn() as db:
             cursor = await db.execute(sql)
             rows = await cursor.fetchall()
 
@@ -803,6 +1512,17 @@ class Database:
         return result
 
     async def close(self):
+        await self.flush()
+        readers, self._readers, self._idle_readers = self._readers, [], None
+        for reader in readers:
+            await reader.close()
+        writer, self._writer_task = self._writer_task, None
+        if writer is not None:
+            writer.cancel()
+            try:
+                await writer
+            except asyncio.CancelledError:
+                pass
         if self._conn is not None:
             await self._conn.close()
             self._conn = None
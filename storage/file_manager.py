@@ -1,12 +1,18 @@
+import asyncio
+import glob
+import json
 import os
 import re
+import time
 from pathlib import Path
-from typing import Dict, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
 
 import aiofiles
 import aiohttp
 import httpx
 
+from control.cdn_scoreboard import CdnScoreboard
 from utils.logger import setup_logger
 from utils.validators import sanitize_filename
 
@@ -30,6 +36,31 @@ _DOWNLOAD_TOTAL_TIMEOUT_S = 300
 _DOWNLOAD_CONNECT_TIMEOUT_S = 15
 _DOWNLOAD_READ_STALL_TIMEOUT_S = 60
 
+# 403 兜底用的 httpx 客户端在 FileManager 生命周期内复用（连接池 + TLS 会话），
+# 图集/批量封面不再每张图一次全新握手。池上限可由 download.httpx_* 配置。
+_DEFAULT_HTTPX_MAX_CONNECTIONS = 20
+_DEFAULT_HTTPX_MAX_KEEPALIVE = 10
+_HTTPX_KEEPALIVE_EXPIRY_S = 30.0
+
+# 分段并发下载（download.segments > 1 时启用）。单条 CDN 连接的吞吐有上限，
+# 几百 MB 的原画靠一条流拉会被单连接速度卡住；按字节区间切成 N 段并发拉取
+# 能把带宽用满。段太小时额外的握手/Range 请求得不偿失，因此每段至少
+# segment_min_size_mb，文件不够切两段时仍走单流。
+_DEFAULT_SEGMENT_COUNT = 1
+_DEFAULT_SEGMENT_MIN_SIZE_MB = 16
+_MAX_SEGMENT_COUNT = 16
+_RANGE_PROBE_TIMEOUT_S = 15
+
+_CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+# 断点续传（download.resume）。``<name>.tmp`` 旁边放一个很小的 sidecar，
+# 记录落点 URL 路径、ETag/Last-Modified、总大小和已落盘字节数；进程崩溃
+# 或被杀后下次用 ``Range: bytes=N-`` + ``If-Range`` 接着拉。sidecar 只在
+# flush 之后按检查点更新，恢复时以它为准截断 .tmp，避免把未落盘的尾巴
+# 当成有效数据。
+_RESUME_SIDECAR_SUFFIX = ".resume"
+_RESUME_CHECKPOINT_BYTES = 8 * 1024 * 1024
+
 
 class FileManager:
     _IMAGE_CONTENT_TYPE_SUFFIXES = {
@@ -44,9 +75,104 @@ class FileManager:
     # 的 Literal、前端下拉三处保持一致）。
     _AUTHOR_DIR_STYLES = ("nickname", "sec_uid", "nickname_uid", "user_sec_uid")
 
-    def __init__(self, base_path: str = "./Downloaded"):
+    def __init__(
+        self,
+        base_path: str = "./Downloaded",
+        *,
+        download_config: Optional[Dict[str, Any]] = None,
+        scoreboard: Optional[CdnScoreboard] = None,
+    ):
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
+        options = download_config if isinstance(download_config, dict) else {}
+        self.segment_count = self._bounded_int(
+            options.get("segments"), _DEFAULT_SEGMENT_COUNT, 1, _MAX_SEGMENT_COUNT
+        )
+        self.segment_min_size = (
+            self._bounded_int(
+                options.get("segment_min_size_mb"), _DEFAULT_SEGMENT_MIN_SIZE_MB, 1, 4096
+            )
+            * 1024
+            * 1024
+        )
+        self.resume_enabled = bool(options.get("resume", False))
+        # 每次下载的 TTFB / 吞吐 / 成败按 CDN 主机记入记分板，供下载器给
+        # 候选镜像排序；None 时不记录。
+        self.scoreboard = scoreboard
+        self.httpx_max_connections = self._bounded_int(
+            options.get("httpx_max_connections"), _DEFAULT_HTTPX_MAX_CONNECTIONS, 1, 1000
+        )
+        self.httpx_max_keepalive = self._bounded_int(
+            options.get("httpx_max_keepalive"),
+            _DEFAULT_HTTPX_MAX_KEEPALIVE,
+            0,
+            self.httpx_max_connections,
+        )
+        self.httpx_http2 = bool(options.get("httpx_http2", False)) and self._http2_available()
+        # 按代理区分的长期 httpx 客户端，附带创建时所在的事件循环。
+        self._httpx_clients: Dict[str, Tuple[httpx.AsyncClient, asyncio.AbstractEventLoop]] = {}
+        # 曾经 aiohttp 403、httpx 成功的主机：后续请求直接走 httpx，省掉注定
+        # 失败的那次 aiohttp 往返。httpx 也失败时移除，下次重新探测。
+        self._httpx_hosts: set[str] = set()
+
+    async def __aenter__(self) -> "FileManager":
+        return self
+
+    async def __aexit__(self, *_exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """关闭复用的 httpx 客户端（连接池）。可重复调用。"""
+        clients, self._httpx_clients = self._httpx_clients, {}
+        for client, _loop in clients.values():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.debug("Failed to close httpx client: %s", e)
+
+    @staticmethod
+    def _http2_available() -> bool:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("download.httpx_http2 requires the 'h2' package; using HTTP/1.1")
+            return False
+        return True
+
+    def _get_httpx_client(self, proxy: Optional[str]) -> httpx.AsyncClient:
+        key = proxy or ""
+        loop = asyncio.get_running_loop()
+        cached = self._httpx_clients.get(key)
+        # 连接绑定事件循环；换了循环（如 CLI 多次 asyncio.run）就重建。
+        if cached is not None and cached[1] is loop:
+            return cached[0]
+        client = httpx.AsyncClient(
+            # httpx 没有 aiohttp 那样的整体 wall-clock 上限：位置参数只作为
+            # write/pool 的默认值，connect/read 为逐操作超时。
+            timeout=httpx.Timeout(
+                _DOWNLOAD_TOTAL_TIMEOUT_S,
+                connect=_DOWNLOAD_CONNECT_TIMEOUT_S,
+                read=_DOWNLOAD_READ_STALL_TIMEOUT_S,
+            ),
+            limits=httpx.Limits(
+                max_connections=self.httpx_max_connections,
+                max_keepalive_connections=self.httpx_max_keepalive,
+                keepalive_expiry=_HTTPX_KEEPALIVE_EXPIRY_S,
+            ),
+            http2=self.httpx_http2,
+            proxy=proxy or None,
+            follow_redirects=True,
+        )
+        self._httpx_clients[key] = (client, loop)
+        return client
+
+    @staticmethod
+    def _bounded_int(value: Any, default: int, lower: int, upper: int) -> int:
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            return default
+        return max(lower, min(upper, number))
 
     def get_author_dir(
         self,
@@ -226,7 +352,87 @@ class FileManager:
         *,
         prefer_response_content_type: bool = False,
         return_saved_path: bool = False,
+        progress_callback: Optional[Callable[[int], None]] = None,
+    ) -> Union[bool, Path]:
+        if self.scoreboard is None:
+            return await self._download_file(
+                url,
+                save_path,
+                session,
+                headers,
+                proxy,
+                prefer_response_content_type=prefer_response_content_type,
+                return_saved_path=return_saved_path,
+                progress_callback=progress_callback,
+            )
+
+        started = time.monotonic()
+        transfer = {"first_byte": None, "bytes": 0, "final_url": None}
+
+        def _observe(size: int) -> None:
+            if transfer["first_byte"] is None:
+                transfer["first_byte"] = time.monotonic()
+            transfer["bytes"] += size
+            if progress_callback is not None:
+                progress_callback(size)
+
+        def _observe_response(final_url: str) -> None:
+            transfer["final_url"] = final_url
+
+        # 被取消（如对冲落败）时异常直接上抛，不计入记分板。
+        result = await self._download_file(
+            url,
+            save_path,
+            session,
+            headers,
+            proxy,
+            prefer_response_content_type=prefer_response_content_type,
+            return_saved_path=return_saved_path,
+            progress_callback=_observe,
+            response_url_callback=_observe_response,
+        )
+        first_byte = transfer["first_byte"]
+        # play 接口 302 到不同的 v*-dy 节点：按实际落点主机记账，排序时
+        # 记分板再把同一候选地址映射回这个主机。
+        self.scoreboard.record(
+            url,
+            final_url=transfer["final_url"],
+            ok=bool(result),
+            ttfb=first_byte - started if first_byte is not None else None,
+            size=transfer["bytes"],
+            elapsed=time.monotonic() - started,
+        )
+        return result
+
+    async def _download_file(
+        self,
+        url: str,
+        save_path: Path,
+        session: aiohttp.ClientSession = None,
+        headers: Optional[Dict[str, str]] = None,
+        proxy: Optional[str] = None,
+        *,
+        prefer_response_content_type: bool = False,
+        return_saved_path: bool = False,
+        progress_callback: Optional[Callable[[int], None]] = None,
+        response_url_callback: Optional[Callable[[str], None]] = None,
     ) -> Union[bool, Path]:
+        host = CdnScoreboard.host_of(url)
+        if host and host in self._httpx_hosts:
+            result = await self._download_via_httpx(
+                url,
+                save_path,
+                headers=headers,
+                proxy=proxy,
+                prefer_response_content_type=prefer_response_content_type,
+                return_saved_path=return_saved_path,
+                progress_callback=progress_callback,
+                response_url_callback=response_url_callback,
+            )
+            if not result:
+                self._httpx_hosts.discard(host)
+            return result
+
         should_close = False
         if session is None:
             default_headers = headers or {
@@ -240,7 +446,33 @@ class FileManager:
 
         final_path = save_path
         tmp_path = save_path.with_suffix(save_path.suffix + ".tmp")
+        # 图片按响应 Content-Type 改后缀，.tmp 路径要等响应回来才确定，
+        # 且体积小、无续传价值，因此只对固定路径的媒体启用续传。
+        resumable = self.resume_enabled and not prefer_response_content_type
+        resume_state = self._load_resume_state(save_path) if resumable else None
         try:
+            if self.segment_count > 1 and resume_state is None:
+                segmented = await self._try_segmented_download(
+                    url,
+                    save_path,
+                    session,
+                    headers=headers,
+                    proxy=proxy,
+                    prefer_response_content_type=prefer_response_content_type,
+                    return_saved_path=return_saved_path,
+                    progress_callback=progress_callback,
+                    response_url_callback=response_url_callback,
+                )
+                if segmented:
+                    return segmented
+            request_headers = headers
+            resume_offset = 0
+            if resume_state is not None:
+                resume_offset = int(resume_state["committed"])
+                request_headers = {**(headers or {}), "Range": f"bytes={resume_offset}-"}
+                validator = resume_state.get("etag") or resume_state.get("last_modified")
+                if validator:
+                    request_headers["If-Range"] = validator
             async with session.get(
                 url,
                 timeout=aiohttp.ClientTimeout(
@@ -248,10 +480,19 @@ class FileManager:
                     connect=_DOWNLOAD_CONNECT_TIMEOUT_S,
                     sock_read=_DOWNLOAD_READ_STALL_TIMEOUT_S,
                 ),
-                headers=headers,
+                headers=request_headers,
                 proxy=proxy or None,
             ) as response:
+                if response_url_callback is not None:
+                    response_url_callback(str(response.url))
                 if response.status == 200:
+                    if resume_state is not None:
+                        # 服务端忽略 Range 或 If-Range 校验失败（文件已变）：
+                        # 返回的是完整新内容，只能从零开始。
+                        logger.info(
+                            "Resume rejected by server for %s, restarting from byte 0",
+                            final_path.name,
+                        )
                     return await self._persist_stream(
                         response.content.iter_chunked(_DOWNLOAD_CHUNK_BYTES),
                         save_path,
@@ -259,16 +500,34 @@ class FileManager:
                         response.headers,
                         prefer_response_content_type=prefer_response_content_type,
                         return_saved_path=return_saved_path,
+                        resume_identity=(self._resume_identity(response) if resumable else None),
+                        progress_callback=progress_callback,
                     )
                 if response.status == 206:
-                    expected_size = self._complete_content_range_size(response.headers)
+                    expected_size = self._complete_content_range_size(
+                        response.headers, resume_from=resume_offset
+                    )
+                    if (
+                        expected_size is not None
+                        and resume_state is not None
+                        and not self._resume_matches(resume_state, response, expected_size)
+                    ):
+                        expected_size = None
                     if expected_size is None:
                         logger.warning(
                             "Rejected incomplete range response for %s: %s",
                             final_path.name,
                             response.headers.get("Content-Range") if response.headers else None,
                         )
+                        self._discard_resume_state(save_path)
                         return False
+                    if resume_offset:
+                        logger.info(
+                            "Resuming %s from byte %d of %d",
+                            final_path.name,
+                            resume_offset,
+                            expected_size,
+                        )
                     return await self._persist_stream(
                         response.content.iter_chunked(_DOWNLOAD_CHUNK_BYTES),
                         save_path,
@@ -276,45 +535,348 @@ class FileManager:
                         response.headers,
                         prefer_response_content_type=prefer_response_content_type,
                         return_saved_path=return_saved_path,
+                        resume_identity=(self._resume_identity(response) if resumable else None),
+                        resume_offset=resume_offset,
+                        progress_callback=progress_callback,
                     )
                 status = response.status
                 logger.debug("Download failed for %s, status=%s", final_path.name, status)
+            if status == 416 and resume_state is not None:
+                # Range 越界：服务端文件比记录的短，续传状态作废，下次从零开始。
+                self._discard_resume_state(save_path)
             # aiohttp connection released here. Douyin's image CDN 403s aiohttp's
             # TLS fingerprint for some assets (e.g. ``biz_tag=pcweb_cover`` covers)
             # while serving httpx/curl/requests fine, so retry those via httpx.
             if status == 403:
-                return await self._download_via_httpx(
+                result = await self._download_via_httpx(
                     url,
                     save_path,
                     headers=headers,
                     proxy=proxy,
                     prefer_response_content_type=prefer_response_content_type,
                     return_saved_path=return_saved_path,
+                    progress_callback=progress_callback,
+                    response_url_callback=response_url_callback,
                 )
+                if result and host:
+                    logger.debug("Routing later downloads from %s through httpx", host)
+                    self._httpx_hosts.add(host)
+                return result
             return False
         except Exception as e:
             logger.debug("Download error for %s: %s", final_path.name, e)
-            tmp_path.unlink(missing_ok=True)
+            # 续传模式下保留已落盘的部分（sidecar 记录了可信的字节数）。
+            if not (resumable and self._resume_sidecar_path(save_path).exists()):
+                tmp_path.unlink(missing_ok=True)
             return False
         finally:
             if should_close:
                 await session.close()
 
     @staticmethod
-    def _complete_content_range_size(response_headers) -> Optional[int]:
+    def _parse_content_range(response_headers) -> Optional[Tuple[int, int, int]]:
         if not response_headers:
             return None
         content_range = response_headers.get("Content-Range")
         if not content_range:
             return None
-        match = re.match(r"^bytes (\d+)-(\d+)/(\d+)$", content_range.strip())
+        match = _CONTENT_RANGE_RE.match(str(content_range).strip())
         if not match:
             return None
         start, end, total = (int(part) for part in match.groups())
-        if start != 0 or end + 1 != total:
+        return start, end, total
+
+    @classmethod
+    def _complete_content_range_size(
+        cls, response_headers, *, resume_from: int = 0
+    ) -> Optional[int]:
+        """Total size when the 206 covers ``[resume_from, total)``; else ``None``.
+
+        ``resume_from`` > 0 accepts the partial tail answering a resume request;
+        anything that does not reach EOF or starts elsewhere is rejected.
+        """
+        parsed = cls._parse_content_range(response_headers)
+        if parsed is None:
+            return None
+        start, end, total = parsed
+        if start != resume_from or end + 1 != total:
             return None
         return total
 
+    @staticmethod
+    def _resume_sidecar_path(save_path: Path) -> Path:
+        return save_path.with_suffix(save_path.suffix + ".tmp" + _RESUME_SIDECAR_SUFFIX)
+
+    @staticmethod
+    def _resume_identity(response) -> Optional[Dict[str, Any]]:
+        """Describe the response body so a later run can tell if it is resumable.
+
+        Returns ``None`` for encoded bodies: Range offsets count encoded bytes
+        while we persist decoded ones, so resuming them would corrupt the file.
+        """
+        response_headers = response.headers or {}
+        if response_headers.get("Content-Encoding"):
+            return None
+        etag = str(response_headers.get("ETag") or "")
+        return {
+            "url_path": urlparse(str(response.url)).path,
+            # 弱 ETag 不能用于 If-Range（RFC 9110 §13.1.5）。
+            "etag": "" if etag.startswith("W/") else etag,
+            "last_modified": str(response_headers.get("Last-Modified") or ""),
+        }
+
+    def _resume_matches(self, state: Dict[str, Any], response, total: int) -> bool:
+        if int(state.get("total") or 0) != total:
+            return False
+        identity = self._resume_identity(response)
+        if identity is None:
+            return False
+        if state.get("etag") or state.get("last_modified"):
+            # 有校验器时服务端已经按 If-Range 判过；这里只防御不支持
+            # If-Range、却照样回 206 的节点。
+            return not (identity["etag"] and state.get("etag") != identity["etag"])
+        return state.get("url_path") == identity["url_path"]
+
+    def _load_resume_state(self, save_path: Path) -> Optional[Dict[str, Any]]:
+        """Read the resume sidecar and trim ``.tmp`` back to the committed size.
+
+        Any inconsistency (missing/short ``.tmp``, unreadable sidecar, nothing
+        committed yet) discards both files so the download restarts cleanly.
+        """
+        sidecar = self._resume_sidecar_path(save_path)
+        tmp_path = save_path.with_suffix(save_path.suffix + ".tmp")
+        try:
+            state = json.loads(sidecar.read_text(encoding="utf-8"))
+            committed = int(state.get("committed") or 0)
+            total = int(state.get("total") or 0)
+            tmp_size = tmp_path.stat().st_size
+        except FileNotFoundError:
+            if sidecar.exists():
+                self._discard_resume_state(save_path)
+            return None
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.debug("Discarding unreadable resume state for %s: %s", save_path.name, e)
+            self._discard_resume_state(save_path)
+            return None
+        if committed <= 0 or total <= 0 or committed >= total or tmp_size < committed:
+            self._discard_resume_state(save_path)
+            return None
+        if tmp_size > committed:
+            try:
+                os.truncate(tmp_path, committed)
+            except OSError:
+                self._discard_resume_state(save_path)
+                return None
+        return state
+
+    def _save_resume_state(self, save_path: Path, state: Dict[str, Any]) -> None:
+        sidecar = self._resume_sidecar_path(save_path)
+        try:
+            sidecar.write_text(json.dumps(state), encoding="utf-8")
+        except OSError as e:
+            logger.debug("Failed to write resume state for %s: %s", save_path.name, e)
+
+    def _discard_resume_state(self, save_path: Path) -> None:
+        self._resume_sidecar_path(save_path).unlink(missing_ok=True)
+        save_path.with_suffix(save_path.suffix + ".tmp").unlink(missing_ok=True)
+
+    def discard_partial(self, save_path: Path) -> None:
+        """删除 ``save_path`` 未完成的下载残留（``.tmp`` 与续传 sidecar）。
+
+        按 Content-Type 改过后缀的图片，其 ``.tmp`` 不在 ``save_path`` 旁边的
+        固定位置，因此按文件名前缀匹配；已完成的正式文件不会被删除。
+        """
+        pattern = glob.escape(save_path.stem) + ".*"
+        partial_suffixes = (".tmp", ".tmp" + _RESUME_SIDECAR_SUFFIX)
+        for candidate in save_path.parent.glob(pattern):
+            if candidate.name.endswith(partial_suffixes):
+                candidate.unlink(missing_ok=True)
+
+    def _plan_segments(self, total: int) -> List[Tuple[int, int]]:
+        """Split ``[0, total)`` into inclusive byte ranges, or ``[]`` for one stream."""
+        count = min(self.segment_count, total // self.segment_min_size)
+        if count < 2:
+            return []
+        step = -(-total // count)
+        return [(start, min(start + step, total) - 1) for start in range(0, total, step)]
+
+    async def _probe_range_target(
+        self,
+        url: str,
+        session: aiohttp.ClientSession,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        proxy: Optional[str] = None,
+    ) -> Optional[Tuple[str, int, Any]]:
+        """Range 取 1 字节探测总大小，返回 (跟随 302 后的落点 URL, 总字节数, 响应头)。
+
+        只有 206 + 合法 Content-Range 才算支持分段；200（服务端忽略 Range）
+        或任何异常都返回 None，由调用方退回单流下载。返回落点 URL 是为了
+        让所有分段打到同一个 CDN 节点——play 端点每次 302 的落点都可能不同。
+        """
+        probe_headers = {**(headers or {}), "Range": "bytes=0-0"}
+        try:
+            async with session.get(
+                url,
+                headers=probe_headers,
+                proxy=proxy or None,
+                timeout=aiohttp.ClientTimeout(
+                    total=_RANGE_PROBE_TIMEOUT_S,
+                    connect=_DOWNLOAD_CONNECT_TIMEOUT_S,
+                ),
+            ) as response:
+                if response.status != 206:
+                    return None
+                parsed = self._parse_content_range(response.headers)
+                if parsed is None or parsed[0] != 0:
+                    return None
+                return str(response.url), parsed[2], response.headers
+        except Exception as e:
+            logger.debug("Range probe failed for %s: %s", url, e)
+            return None
+
+    async def _try_segmented_download(
+        self,
+        url: str,
+        save_path: Path,
+        session: aiohttp.ClientSession,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        proxy: Optional[str] = None,
+        prefer_response_content_type: bool = False,
+        return_saved_path: bool = False,
+        progress_callback: Optional[Callable[[int], None]] = None,
+        response_url_callback: Optional[Callable[[str], None]] = None,
+    ) -> Union[bool, Path]:
+        """分段并发下载；不适用（小文件/不支持 Range）或失败时返回 False。
+
+        返回 False 时调用方继续走原有单流路径，所以分段模式最坏只多一次
+        1 字节探测，不会让原本能下载成功的文件失败。
+        """
+        probed = await self._probe_range_target(url, session, headers=headers, proxy=proxy)
+        if probed is None:
+            return False
+        target_url, total, probe_headers = probed
+        if response_url_callback is not None:
+            response_url_callback(target_url)
+        segments = self._plan_segments(total)
+        if not segments:
+            return False
+
+        final_path = self._resolve_save_path_from_content_type(
+            save_path,
+            probe_headers,
+            prefer_response_content_type=prefer_response_content_type,
+        )
+        tmp_path = final_path.with_suffix(final_path.suffix + ".tmp")
+        reported = 0
+
+        def _on_segment_progress(size: int) -> None:
+            nonlocal reported
+            reported += size
+            if progress_callback is not None:
+                progress_callback(size)
+
+        tasks: List[asyncio.Task] = []
+        completed = False
+        try:
+            # 预分配完整大小，各段按偏移原地写入，无需事后拼接。
+            async with aiofiles.open(tmp_path, "wb") as f:
+                await f.truncate(total)
+            tasks = [
+                asyncio.create_task(
+                    self._fetch_segment(
+                        target_url,
+                        tmp_path,
+                        start,
+                        end,
+                        total,
+                        session,
+                        headers=headers,
+                        proxy=proxy,
+                        progress_callback=_on_segment_progress,
+                    )
+                )
+                for start, end in segments
+            ]
+            await asyncio.gather(*tasks)
+            os.replace(str(tmp_path), str(final_path))
+            completed = True
+        except Exception as e:
+            logger.debug(
+                "Segmented download failed for %s, falling back to single stream: %s",
+                final_path.name,
+                e,
+            )
+            return False
+        finally:
+            if not completed:
+                # gather 在首个异常处就返回，其余分段仍在往同一个 .tmp 写；
+                # 必须先取消并等它们退出，单流回退才不会被写坏。
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                tmp_path.unlink(missing_ok=True)
+                # 回退会重新下载全部字节，把已上报的进度退回去，避免重复计数。
+                if reported and progress_callback is not None:
+                    progress_callback(-reported)
+
+        logger.debug(
+            "Segmented download finished for %s: %d bytes in %d segments",
+            final_path.name,
+            total,
+            len(segments),
+        )
+        return final_path if return_saved_path else True
+
+    async def _fetch_segment(
+        self,
+        url: str,
+        tmp_path: Path,
+        start: int,
+        end: int,
+        total: int,
+        session: aiohttp.ClientSession,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        proxy: Optional[str] = None,
+        progress_callback: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        """拉取 ``[start, end]`` 并写入 ``tmp_path`` 对应偏移；任何偏差都抛异常。"""
+        segment_headers = {**(headers or {}), "Range": f"bytes={start}-{end}"}
+        async with session.get(
+            url,
+            headers=segment_headers,
+            proxy=proxy or None,
+            timeout=aiohttp.ClientTimeout(
+                total=_DOWNLOAD_TOTAL_TIMEOUT_S,
+                connect=_DOWNLOAD_CONNECT_TIMEOUT_S,
+                sock_read=_DOWNLOAD_READ_STALL_TIMEOUT_S,
+            ),
+        ) as response:
+            if response.status != 206:
+                raise RuntimeError(f"segment {start}-{end}: status={response.status}")
+            if self._parse_content_range(response.headers) != (start, end, total):
+                raise RuntimeError(
+                    f"segment {start}-{end}: unexpected Content-Range "
+                    f"{response.headers.get('Content-Range')!r}"
+                )
+            written = 0
+            expected = end - start + 1
+            async with aiofiles.open(tmp_path, "r+b") as f:
+                await f.seek(start)
+                async for chunk in response.content.iter_chunked(_DOWNLOAD_CHUNK_BYTES):
+                    written += len(chunk)
+                    if written > expected:
+                        raise RuntimeError(f"segment {start}-{end}: overlong body")
+                    await f.write(chunk)
+                    if progress_callback is not None:
+                        progress_callback(len(chunk))
+            if written != expected:
+                raise RuntimeError(
+                    f"segment {start}-{end}: expected {expected} bytes, got {written}"
+                )
+
     async def _persist_stream(
         self,
         chunk_iter,
@@ -324,11 +886,20 @@ class FileManager:
         *,
         prefer_response_content_type: bool = False,
         return_saved_path: bool = False,
+        resume_identity: Optional[Dict[str, Any]] = None,
+        resume_offset: int = 0,
+        progress_callback: Optional[Callable[[int], None]] = None,
     ) -> Union[bool, Path]:
         """Stream ``chunk_iter`` to a temp file and atomically rename it.
 
         Shared by the aiohttp and httpx download paths so the content-type
         resolution, size-mismatch guard, and atomic rename stay identical.
+
+        With ``resume_identity`` (resume mode, known total size) progress is
+        checkpointed to the resume sidecar, and a short body keeps ``.tmp``
+        for the next attempt instead of deleting it. ``resume_offset`` > 0
+        appends to the existing ``.tmp`` rather than truncating it.
+        ``progress_callback`` receives the size of every chunk written.
         """
         final_path = self._resolve_save_path_from_content_type(
             save_path,
@@ -336,11 +907,37 @@ class FileManager:
             prefer_response_content_type=prefer_response_content_type,
         )
         tmp_path = final_path.with_suffix(final_path.suffix + ".tmp")
-        written = 0
-        async with aiofiles.open(tmp_path, "wb") as f:
-            async for chunk in chunk_iter:
-                await f.write(chunk)
-                written += len(chunk)
+        resume_state: Optional[Dict[str, Any]] = None
+        if resume_identity is not None and expected_size:
+            resume_state = {**resume_identity, "total": expected_size, "committed": resume_offset}
+        elif resume_offset:
+            raise ValueError("resume_offset requires a resume identity and known size")
+        else:
+            self._resume_sidecar_path(final_path).unlink(missing_ok=True)
+
+        written = resume_offset
+        checkpoint = written
+        async with aiofiles.open(tmp_path, "ab" if resume_offset else "wb") as f:
+            try:
+                async for chunk in chunk_iter:
+                    await f.write(chunk)
+                    written += len(chunk)
+                    if progress_callback is not None:
+                        progress_callback(len(chunk))
+                    if (
+                        resume_state is not None
+                        and written - checkpoint >= _RESUME_CHECKPOINT_BYTES
+                    ):
+                        await f.flush()
+                        checkpoint = written
+                        resume_state["committed"] = written
+                        self._save_resume_state(final_path, resume_state)
+            finally:
+                # 中断（网络错误 / 取消）时也把已写入的字节记下来。
+                if resume_state is not None and written != checkpoint:
+                    await f.flush()
+                    resume_state["committed"] = written
+                    self._save_resume_state(final_path, resume_state)
         if expected_size is not None and written != expected_size:
             logger.warning(
                 "Size mismatch for %s: expected %d, got %d",
@@ -348,9 +945,12 @@ class FileManager:
                 expected_size,
                 written,
             )
-            tmp_path.unlink(missing_ok=True)
+            if resume_state is not None and 0 < written < expected_size:
+                return False
+            self._discard_resume_state(final_path)
             return False
         os.replace(str(tmp_path), str(final_path))
+        self._resume_sidecar_path(final_path).unlink(missing_ok=True)
         return final_path if return_saved_path else True
 
     async def _download_via_httpx(
@@ -362,45 +962,41 @@ class FileManager:
         proxy: Optional[str] = None,
         prefer_response_content_type: bool = False,
         return_saved_path: bool = False,
+        progress_callback: Optional[Callable[[int], None]] = None,
+        response_url_callback: Optional[Callable[[str], None]] = None,
     ) -> Union[bool, Path]:
         """Download an asset via httpx, whose TLS fingerprint the Douyin image
         CDN accepts when aiohttp's is rejected (403). Mirrors aiohttp's
-        redirect-following and streaming-to-disk behaviour."""
+        redirect-following and streaming-to-disk behaviour. The client is
+        pooled for the lifetime of this FileManager (see :meth:`close`)."""
         try:
-            async with httpx.AsyncClient(
-                # httpx 没有 aiohttp 那样的整体 wall-clock 上限：位置参数只作为
-                # write/pool 的默认值，connect/read 为逐操作超时。
-                timeout=httpx.Timeout(
-                    _DOWNLOAD_TOTAL_TIMEOUT_S,
-                    connect=_DOWNLOAD_CONNECT_TIMEOUT_S,
-                    read=_DOWNLOAD_READ_STALL_TIMEOUT_S,
-                ),
-                proxy=proxy or None,
-                follow_redirects=True,
-            ) as client:
-                async with client.stream("GET", url, headers=headers) as response:
-                    if response.status_code != 200:
-                        logger.debug(
-                            "httpx fallback failed for %s, status=%s",
-                            save_path.name,
-                            response.status_code,
-                        )
-                        return False
-                    # httpx auto-decompresses; Content-Length is the *compressed*
-                    # size, so only trust it when the body isn't encoded.
-                    expected_size: Optional[int] = None
-                    if not response.headers.get("Content-Encoding"):
-                        content_length = response.headers.get("Content-Length")
-                        if content_length is not None and content_length.isdigit():
-                            expected_size = int(content_length)
-                    return await self._persist_stream(
-                        response.aiter_bytes(),
-                        save_path,
-                        expected_size,
-                        response.headers,
-                        prefer_response_content_type=prefer_response_content_type,
-                        return_saved_path=return_saved_path,
+            client = self._get_httpx_client(proxy)
+            async with client.stream("GET", url, headers=headers) as response:
+                if response_url_callback is not None:
+                    response_url_callback(str(response.url))
+                if response.status_code != 200:
+                    logger.debug(
+                        "httpx fallback failed for %s, status=%s",
+                        save_path.name,
+                        response.status_code,
                     )
+                    return False
+                # httpx auto-decompresses; Content-Length is the *compressed*
+                # size, so only trust it when the body isn't encoded.
+                expected_size: Optional[int] = None
+                if not response.headers.get("Content-Encoding"):
+                    content_length = response.headers.get("Content-Length")
+                    if content_length is not None and content_length.isdigit():
+                        expected_size = int(content_length)
+                return await self._persist_stream(
+                    response.aiter_bytes(),
+                    save_path,
+                    expected_size,
+                    response.headers,
+                    prefer_response_content_type=prefer_response_content_type,
+                    return_saved_path=return_saved_path,
+                    progress_callback=progress_callback,
+                )
         except Exception as e:
             logger.debug("httpx fallback error for %s: %s", save_path.name, e)
             return False
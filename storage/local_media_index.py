@@ -0,0 +1,430 @@
+"""下载根目录的本地媒体索引（aweme id → 文件路径 / 大小 / mtime），可持久化。
+
+索引按目录记录：每个目录存它的 mtime、子目录名和其中的媒体文件。重启后
+``refresh`` 只对 mtime 变化过的目录重新 scandir，其余目录直接沿用记录，
+启动开销从「全库 rglob + stat」降到「每个目录一次 stat + 变化目录的列举」。
+
+目录 mtime 只在目录项增删 / 改名时变化；下载流程总是先写 .tmp 再改名，
+新文件一定会让所在目录的 mtime 前进。
+"""
+
+import os
+import re
+import stat
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from utils import json_codec
+from utils.logger import setup_logger
+
+logger = setup_logger("LocalMediaIndex")
+
+INDEX_FILENAME = ".dy_local_index.json"
+_INDEX_VERSION = 1
+# 持久化写盘最小间隔，避免每个作品下载完都重写一次索引文件。
+_SAVE_INTERVAL_S = 30.0
+# 扫描时 mtime 距今不足该时长的目录不记 mtime（记为 -1），下次必定重扫：
+# 粗粒度时间戳的文件系统上，同一时间片内随后的改动不会再推进 mtime。
+_RACY_WINDOW_NS = 2_000_000_000
+
+MEDIA_SUFFIXES = frozenset({".mp4", ".jpg", ".jpeg", ".png", ".webp", ".gif", ".mp3", ".m4a"})
+# 可选附件的文件名里也带作品 id，但不代表主媒体已下载。只下了封面的
+# 作品，之后开启 video 时仍要把视频补下来。
+_SIDECAR_STEM_SUFFIXES = ("_cover", "_avatar", "_music")
+_AWEME_ID_PATTERN = re.compile(r"(?<!\d)(\d{15,20})(?!\d)")
+# 全量重建时进度回调的最小间隔。
+_PROGRESS_INTERVAL_S = 1.0
+
+# progress(已遍历目录数, 已索引媒体文件数)
+ProgressCallback = Callable[[int, int], None]
+
+
+class IndexScanCancelled(Exception):
+    """refresh 被 cancel 事件中止；索引保持调用前的状态。"""
+
+
+def media_aweme_ids(name: str) -> List[str]:
+    """主媒体文件名里的作品 id；不是主媒体文件时返回空列表。"""
+    stem, suffix = os.path.splitext(name)
+    if suffix.lower() not in MEDIA_SUFFIXES:
+        return []
+    if stem.lower().endswith(_SIDECAR_STEM_SUFFIXES):
+        return []
+    return [match.group(1) for match in _AWEME_ID_PATTERN.finditer(name)]
+
+
+class LocalMediaIndex:
+    """一个下载根目录的媒体索引。
+
+    ``aweme_ids`` 是所有已索引媒体文件里出现过的作品 id；集合对象在索引
+    生命周期内不会替换，调用方可以直接持有引用。
+    """
+
+    def __init__(self, root: Path, persist_path: Optional[Path] = None):
+        self.root = Path(root)
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.aweme_ids: Set[str] = set()
+        # 作品 id → 引用它的媒体文件数；图集一个作品对应多个文件，删掉其中
+        # 一个不能把 id 移出 aweme_ids。
+        self._id_refs: Dict[str, int] = {}
+        # 相对路径（根目录为 ""）→ {"mtime_ns", "subdirs", "files"}；
+        # files: 文件名 → [size, mtime_ns, [aweme_id, ...]]
+        self._dirs: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._last_save = 0.0
+        self._lock = threading.Lock()
+        if self.persist_path is not None:
+            self.load()
+
+    def load(self) -> None:
+        if self.persist_path is None or not self.persist_path.exists():
+            return
+        try:
+            data = json_codec.loads(self.persist_path.read_bytes())
+        except (OSError, ValueError) as e:
+            logger.debug("Failed to load local media index %s: %s", self.persist_path, e)
+            return
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != _INDEX_VERSION
+            or data.get("root") != str(self.root)
+            or not isinstance(data.get("dirs"), dict)
+        ):
+            return
+        with self._lock:
+            self._dirs = data["dirs"]
+            self._rebuild_ids()
+
+    def save(self) -> None:
+        if self.persist_path is None:
+            return
+        with self._lock:
+            self._last_save = time.monotonic()
+            if not self._dirty:
+                return
+            payload = json_codec.dumps_bytes(
+                {"version": _INDEX_VERSION, "root": str(self.root), "dirs": self._dirs}
+            )
+            self._dirty = False
+        tmp_path = self.persist_path.with_name(self.persist_path.name + ".tmp")
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(payload)
+            os.replace(str(tmp_path), str(self.persist_path))
+        except OSError as e:
+            logger.debug("Failed to save local media index %s: %s", self.persist_path, e)
+
+    def maybe_save(self) -> None:
+        if self.persist_path is not None and time.monotonic() - self._last_save >= _SAVE_INTERVAL_S:
+            self.save()
+
+    def refresh(
+        self,
+        *,
+        workers: int = 1,
+        progress: Optional[ProgressCallback] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> int:
+        """按目录 mtime 增量校验索引，返回重新列举的目录数。
+
+        ``workers > 1`` 时目录在线程池里并发列举（scandir / stat 期间释放
+        GIL，慢盘、网络盘上收益明显）。``progress(目录数, 媒体文件数)`` 约每
+        ``_PROGRESS_INTERVAL_S`` 秒回调一次，结束时再回调一次。``cancel``
+        被置位时抛出 :class:`IndexScanCancelled`，索引保持调用前的状态。
+        """
+        with self._lock:
+            walk = _ParallelWalk(self, workers) if workers > 1 else _SerialWalk(self)
+            fresh, scanned = walk.run(progress, cancel)
+            if scanned or fresh.keys() != self._dirs.keys():
+                self._dirs = fresh
+                self._rebuild_ids()
+                self._dirty = True
+            return scanned
+
+    def _visit(self, rel: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """校验单个目录：mtime 未变沿用记录，否则重新列举。返回 (记录, 是否重扫)。"""
+        path = os.path.join(self.root, rel) if rel else str(self.root)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None, False
+        if not stat.S_ISDIR(st.st_mode):
+            return None, False
+        entry = self._dirs.get(rel)
+        if entry is not None and entry.get("mtime_ns") == st.st_mtime_ns:
+            return entry, False
+        return self._scan_dir(path, st.st_mtime_ns), True
+
+    def record_files(self, paths: Iterable[Path]) -> None:
+        """把刚下载完的媒体文件记进索引。
+
+        所在目录的 mtime 不更新：其他文件可能同时写进该目录，下次
+        ``refresh`` 会重新列举这些目录，保证不漏。
+        """
+        with self._lock:
+            for path in paths:
+                path = Path(path)
+                ids = media_aweme_ids(path.name)
+                if not ids:
+                    continue
+                try:
+                    rel = os.path.relpath(path.parent, self.root)
+                    st = path.stat()
+                except (OSError, ValueError):
+                    continue
+                if rel.startswith(os.pardir) or st.st_size <= 0:
+                    continue
+                rel = "" if rel == os.curdir else rel
+                entry = self._dirs.setdefault(rel, {"mtime_ns": -1, "subdirs": [], "files": {}})
+                self._put_file(entry, path.name, [st.st_size, st.st_mtime_ns, ids])
+                self._dirty = True
+
+    def apply_created(self, path: Path) -> None:
+        """文件系统里新出现了 ``path``（文件或目录，含移入）：增量并入索引。
+
+        目录会连同子树一起列举。父目录记录的 mtime 不动：它在磁盘上已经
+        前进，下次 ``refresh`` 自然会重扫父目录。
+        """
+        rel = self._relative(path)
+        if rel is None:
+            return
+        full = str(path)
+        try:
+            st = os.stat(full)
+        except OSError:
+            return
+        if not stat.S_ISDIR(st.st_mode):
+            self.record_files([Path(full)])
+            return
+        with self._lock:
+            self._forget_subtree(rel)
+            pending = [rel]
+            while pending:
+                current = pending.pop()
+                try:
+                    mtime_ns = os.stat(os.path.join(self.root, current)).st_mtime_ns
+                except OSError:
+                    continue
+                entry = self._scan_dir(os.path.join(self.root, current), mtime_ns)
+                files, entry["files"] = entry["files"], {}
+                self._dirs[current] = entry
+                for name, record in files.items():
+                    self._put_file(entry, name, record)
+                pending.extend(os.path.join(current, name) for name in entry["subdirs"])
+            self._link_to_parent(rel)
+            self._dirty = True
+
+    def apply_deleted(self, path: Path) -> None:
+        """``path``（文件或目录，含移出）已从文件系统消失：从索引里摘掉。"""
+        rel = self._relative(path)
+        if rel is None or rel == "":
+            return
+        parent, name = os.path.split(rel)
+        with self._lock:
+            changed = self._forget_subtree(rel)
+            entry = self._dirs.get(parent)
+            if entry is not None:
+                if name in entry["files"]:
+                    self._drop_file(entry, name)
+                    changed = True
+                if name in entry["subdirs"]:
+                    entry["subdirs"].remove(name)
+            if changed:
+                self._dirty = True
+
+    def apply_moved(self, src: Path, dest: Path) -> None:
+        """改名 / 移动：下载流程的 ``.tmp`` → 成品改名也走这里。"""
+        self.apply_deleted(src)
+        self.apply_created(dest)
+
+    def lookup(self, aweme_id: str) -> List[Dict[str, Any]]:
+        """包含 ``aweme_id`` 的已索引媒体文件（路径、大小、mtime）。"""
+        with self._lock:
+            return [
+                {"path": self.root / rel / name, "size": size, "mtime_ns": mtime_ns}
+                for rel, entry in self._dirs.items()
+                for name, (size, mtime_ns, ids) in entry["files"].items()
+                if aweme_id in ids
+            ]
+
+    def _scan_dir(self, path: str, mtime_ns: int) -> Dict[str, Any]:
+        subdirs: List[str] = []
+        files: Dict[str, List[Any]] = {}
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                            continue
+                        ids = media_aweme_ids(entry.name)
+                        if not ids or not entry.is_file():
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    if st.st_size > 0:
+                        files[entry.name] = [st.st_size, st.st_mtime_ns, ids]
+        except OSError as e:
+            logger.debug("Failed to scan %s: %s", path, e)
+            mtime_ns = -1
+        if time.time_ns() - mtime_ns < _RACY_WINDOW_NS:
+            mtime_ns = -1
+        return {"mtime_ns": mtime_ns, "subdirs": subdirs, "files": files}
+
+    def _relative(self, path: Path) -> Optional[str]:
+        try:
+            rel = os.path.relpath(path, self.root)
+        except ValueError:  # Windows 上跨盘符
+            return None
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+            return None
+        return "" if rel == os.curdir else rel
+
+    def _forget_subtree(self, rel: str) -> bool:
+        prefix = rel + os.sep
+        doomed = [key for key in self._dirs if key == rel or key.startswith(prefix)]
+        for key in doomed:
+            entry = self._dirs.pop(key)
+            for name in list(entry["files"]):
+                self._drop_file(entry, name)
+        return bool(doomed)
+
+    def _link_to_parent(self, rel: str) -> None:
+        if not rel:
+            return
+        parent, name = os.path.split(rel)
+        entry = self._dirs.get(parent)
+        if entry is None:
+            return
+        if name not in entry["subdirs"]:
+            entry["subdirs"].append(name)
+
+    def _put_file(self, entry: Dict[str, Any], name: str, record: List[Any]) -> None:
+        if name in entry["files"]:
+            self._drop_file(entry, name)
+        entry["files"][name] = record
+        for aweme_id in record[2]:
+            self._id_refs[aweme_id] = self._id_refs.get(aweme_id, 0) + 1
+            self.aweme_ids.add(aweme_id)
+
+    def _drop_file(self, entry: Dict[str, Any], name: str) -> None:
+        record = entry["files"].pop(name, None)
+        if record is None:
+            return
+        for aweme_id in record[2]:
+            refs = self._id_refs.get(aweme_id, 0) - 1
+            if refs > 0:
+                self._id_refs[aweme_id] = refs
+            else:
+                self._id_refs.pop(aweme_id, None)
+                self.aweme_ids.discard(aweme_id)
+
+    def _rebuild_ids(self) -> None:
+        # 原地更新：已经拿到集合引用的调用方能看到变化。
+        self.aweme_ids.clear()
+        self._id_refs.clear()
+        for entry in self._dirs.values():
+            for _size, _mtime_ns, ids in entry["files"].values():
+                for aweme_id in ids:
+                    self._id_refs[aweme_id] = self._id_refs.get(aweme_id, 0) + 1
+        self.aweme_ids.update(self._id_refs)
+
+
+class _Walk:
+    """一次 refresh 的遍历状态：汇总结果、计数并按时间节流进度回调。"""
+
+    def __init__(self, index: LocalMediaIndex):
+        self.index = index
+        self.fresh: Dict[str, Dict[str, Any]] = {}
+        self.scanned = 0
+        self.files = 0
+        self._last_report = time.monotonic()
+
+    def run(
+        self, progress: Optional[ProgressCallback], cancel: Optional[threading.Event]
+    ) -> Tuple[Dict[str, Dict[str, Any]], int]:
+        raise NotImplementedError
+
+    def _accept(self, rel: str, entry: Optional[Dict[str, Any]], rescanned: bool) -> List[str]:
+        if entry is None:
+            return []
+        self.fresh[rel] = entry
+        self.scanned += rescanned
+        self.files += len(entry["files"])
+        return [os.path.join(rel, name) for name in entry["subdirs"]]
+
+    def _report(self, progress: Optional[ProgressCallback], *, final: bool = False) -> None:
+        if progress is None:
+            return
+        now = time.monotonic()
+        if final or now - self._last_report >= _PROGRESS_INTERVAL_S:
+            self._last_report = now
+            progress(len(self.fresh), self.files)
+
+
+class _SerialWalk(_Walk):
+    def run(self, progress, cancel):
+        for rel, entry, rescanned in _walk_subtree(self.index, "", cancel):
+            self._accept(rel, entry, rescanned)
+            self._report(progress)
+        self._report(progress, final=True)
+        return self.fresh, self.scanned
+
+
+class _ParallelWalk(_Walk):
+    """按根目录下第一层（作者目录）扇出：每棵子树是线程池里的一个任务，
+    在工作线程里串行遍历后整体交回。
+
+    按目录粒度提交任务时，小目录的调度开销会超过 scandir 本身。
+    """
+
+    def __init__(self, index: LocalMediaIndex, workers: int):
+        super().__init__(index)
+        self.workers = workers
+
+    def run(self, progress, cancel):
+        children = self._accept("", *self.index._visit(""))
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="local-index") as pool:
+            pending = {pool.submit(self._collect, child, cancel) for child in children}
+            try:
+                while pending:
+                    done, pending = wait(
+                        pending, timeout=_PROGRESS_INTERVAL_S, return_when=FIRST_COMPLETED
+                    )
+                    if cancel is not None and cancel.is_set():
+                        raise IndexScanCancelled(str(self.index.root))
+                    for future in done:
+                        for rel, entry, rescanned in future.result():
+                            self._accept(rel, entry, rescanned)
+                    self._report(progress)
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+        self._report(progress, final=True)
+        return self.fresh, self.scanned
+
+    def _collect(
+        self, top: str, cancel: Optional[threading.Event]
+    ) -> List[Tuple[str, Dict[str, Any], bool]]:
+        return list(_walk_subtree(self.index, top, cancel))
+
+
+def _walk_subtree(
+    index: LocalMediaIndex, top: str, cancel: Optional[threading.Event]
+) -> Iterator[Tuple[str, Dict[str, Any], bool]]:
+    """深度优先校验 ``top`` 及其子目录，逐个产出 (相对路径, 记录, 是否重扫)。"""
+    pending = [top]
+    while pending:
+        if cancel is not None and cancel.is_set():
+            raise IndexScanCancelled(str(index.root))
+        rel = pending.pop()
+        entry, rescanned = index._visit(rel)
+        if entry is None:
+            continue
+        yield rel, entry, rescanned
+        pending.extend(os.path.join(rel, name) for name in entry["subdirs"])
@@ -1,11 +1,11 @@
 import asyncio
-import json
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict
 
 import aiofiles
 
+from utils import json_codec
 from utils.logger import setup_logger
 
 logger = setup_logger("MetadataHandler")
@@ -18,7 +18,7 @@ class MetadataHandler:
     async def save_metadata(self, data: Dict[str, Any], save_path: Path) -> bool:
         try:
             async with aiofiles.open(save_path, "w", encoding="utf-8") as f:
-                await f.write(json.dumps(data, ensure_ascii=False, indent=2))
+                await f.write(json_codec.dumps(data, indent=True))
             return True
         except Exception as e:
             logger.error("Failed to save metadata: %s, error: %s", save_path, e)
@@ -34,7 +34,7 @@ class MetadataHandler:
         try:
             async with self._manifest_lock:
                 async with aiofiles.open(manifest_path, "a", encoding="utf-8") as f:
-                    await f.write(json.dumps(normalized_record, ensure_ascii=False))
+                    await f.write(json_codec.dumps(normalized_record))
                     await f.write("\n")
             return True
         except Exception as e:
@@ -45,7 +45,7 @@ class MetadataHandler:
         try:
             async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
                 content = await f.read()
-                return json.loads(content)
+                return json_codec.loads(content)
         except Exception as e:
             logger.error("Failed to load metadata: %s, error: %s", file_path, e)
             return {}
@@ -850,3 +850,245 @@ async def test_get_video_detail_returns_on_first_success():
     assert detail is not None
     assert detail["aweme_id"] == "456"
     assert call_count == 1  # no retry needed
+
+
+def test_connector_uses_connection_config(monkeypatch):
+    captured = {}
+    monkeypatch.setattr(
+        "core.api_client.aiohttp.TCPConnector", lambda **kwargs: captured.update(kwargs)
+    )
+    client = DouyinAPIClient(
+        {},
+        connection_config={
+            "limit": 64,
+            "limit_per_host": 8,
+            "dns_cache_ttl": 120,
+            "keepalive_timeout": 45,
+        },
+    )
+
+    client._build_connector()
+
+    assert captured == {
+        "limit": 64,
+        "limit_per_host": 8,
+        "use_dns_cache": True,
+        "ttl_dns_cache": 120,
+        "force_close": False,
+        "keepalive_timeout": 45,
+    }
+
+
+def test_force_close_connector_omits_keepalive(monkeypatch):
+    captured = {}
+    monkeypatch.setattr(
+        "core.api_client.aiohttp.TCPConnector", lambda **kwargs: captured.update(kwargs)
+    )
+    client = DouyinAPIClient({}, connection_config={"force_close": True, "dns_cache_ttl": 0})
+
+    client._build_connector()
+
+    # aiohttp 拒绝同时设置 force_close 与 keepalive_timeout。
+    assert captured["force_close"] is True
+    assert "keepalive_timeout" not in captured
+    assert captured["use_dns_cache"] is False
+
+
+def test_invalid_connection_values_fall_back_to_defaults():
+    client = DouyinAPIClient({}, connection_config={"limit": "many", "limit_per_host": -3})
+
+    assert client.connection_options["limit"] == 100
+    assert client.connection_options["limit_per_host"] == 0
+
+
+@pytest.mark.asyncio
+async def test_connection_stats_count_reused_connections():
+    from aiohttp import web
+
+    async def _ok(_request):
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_get("/", _ok)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    client = DouyinAPIClient({})
+    try:
+        session = await client.get_session()
+        for _ in range(3):
+            async with session.get(f"http://127.0.0.1:{port}/") as response:
+                await response.read()
+        stats = client.connection_stats()
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+    media = stats["media"]
+    assert media["requests"] == 3
+    assert media["connections_created"] == 1
+    assert media["connections_reused"] == 2
+    assert media["reuse_ratio"] == round(2 / 3, 3)
+    assert stats["api"]["requests"] == 0
+
+
+@pytest.mark.asyncio
+async def test_api_requests_not_blocked_by_saturated_media_pool():
+    from aiohttp import web
+
+    release = asyncio.Event()
+
+    async def _slow_media(_request):
+        await release.wait()
+        return web.Response(body=b"video")
+
+    async def _api(_request):
+        return web.json_response({"status_code": 0})
+
+    app = web.Application()
+    app.router.add_get("/media", _slow_media)
+    app.router.add_get("/api", _api)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    client = DouyinAPIClient({}, connection_config={"limit": 1, "limit_per_host": 1})
+    try:
+        media_session = await client.get_session()
+
+        async def _stream():
+            async with media_session.get(f"{base}/media") as response:
+                return await response.read()
+
+        stream_task = asyncio.create_task(_stream())
+        await asyncio.sleep(0.05)  # 媒体池唯一的连接已被占住
+
+        await client._ensure_session()
+        assert client._session is not media_session
+
+        async def _call_api():
+            async with client._session.get(f"{base}/api") as response:
+                return await response.json()
+
+        payload = await asyncio.wait_for(_call_api(), timeout=2)
+
+        assert payload == {"status_code": 0}
+        assert not stream_task.done()
+        release.set()
+        assert await stream_task == b"video"
+    finally:
+        release.set()
+        await client.close()
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_replace_cookies_drops_stale_session_cookies():
+    client = DouyinAPIClient({"msToken": "old-token", "stale": "x"})
+    try:
+        session = await client.get_session()
+        client.replace_cookies({"msToken": "new-token", "sessionid": "fresh"})
+
+        jar = {cookie.key: cookie.value for cookie in session.cookie_jar}
+        assert jar == {"msToken": "new-token", "sessionid": "fresh"}
+        assert client._ms_token == "new-token"
+        assert "stale" not in client.cookies
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_request_json_reports_risk_signals_to_rate_limiter():
+    from aiohttp import web
+
+    responses = {
+        "/blocked": web.Response(status=429),
+        "/empty": web.Response(status=200, body=b""),
+        "/verify": web.json_response({"status_code": 0, "verify_ticket": "t"}),
+        "/login-tip": web.json_response(
+            {"status_code": 0, "not_login_module": {"guide_login_tip_exist": True}}
+        ),
+        "/ok": web.json_response({"status_code": 0, "aweme_list": []}),
+    }
+
+    async def _handler(request):
+        return responses[request.path]
+
+    app = web.Application()
+    for path in responses:
+        app.router.add_get(path, _handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    class _RecordingLimiter:
+        def __init__(self):
+            self.signals = []
+            self.acquired = []
+
+        async def acquire(self, endpoint=None):
+            self.acquired.append(endpoint)
+
+        def record_success(self):
+            self.signals.append("ok")
+
+        def record_risk(self, reason):
+            self.signals.append(reason)
+
+    limiter = _RecordingLimiter()
+    client = DouyinAPIClient({}, rate_limiter=limiter)
+    try:
+        for path in responses:
+            await client._request_json(path, {}, base_url=base, max_retries=1)
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+    # 登录引导既不算风控也不算干净响应。
+    assert limiter.signals == ["http_429", "empty_200", "verify_page", "ok"]
+    # 每次请求前按接口路径取令牌。
+    assert limiter.acquired == list(responses)
+
+
+def test_abogus_signer_is_reused_and_rotated(monkeypatch):
+    import core.api_client as api_module
+
+    fingerprints = iter(f"fp-{i}" for i in range(10))
+    built = []
+
+    class _FakeFp:
+        @staticmethod
+        def generate_fingerprint(_browser):
+            return next(fingerprints)
+
+    class _FakeABogus:
+        def __init__(self, fp, user_agent):
+            self.fp = fp
+            self.user_agent = user_agent
+            built.append(fp)
+
+        def generate_abogus(self, params, body=""):
+            return (f"{params}&a_bogus={self.fp}", self.fp, self.user_agent, body)
+
+    monkeypatch.setattr(api_module, "BrowserFingerprintGenerator", _FakeFp)
+    monkeypatch.setattr(api_module, "ABogus", _FakeABogus)
+
+    client = DouyinAPIClient({"msToken": "token-1"})
+    client._abogus_enabled = True
+    for _ in range(3):
+        client.build_signed_path("/aweme/v1/web/aweme/detail/", {"a": 1})
+    assert built == ["fp-0"]
+
+    rotating = DouyinAPIClient({"msToken": "token-1"}, signing_config={"rotate_every": 2})
+    rotating._abogus_enabled = True
+    signed = [
+        rotating.build_signed_path("/aweme/v1/web/aweme/detail/", {"a": 1})[0] for _ in range(5)
+    ]
+    assert [url.rsplit("=", 1)[1] for url in signed] == ["fp-1", "fp-1", "fp-2", "fp-2", "fp-3"]
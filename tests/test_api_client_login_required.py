@@ -103,7 +103,7 @@ async def test_request_json_raises_login_required_to_caller(monkeypatch):
 @pytest.mark.asyncio
 async def test_request_json_returns_dict_on_normal_response(monkeypatch):
     client = DouyinAPIClient({"sessionid": "x"})
-    resp = _FakeResp(200, b'{"status_code":0}', {"status_code": 0, "data": []})
+    resp = _FakeResp(200, b'{"status_code":0,"data":[]}', {"status_code": 0, "data": []})
     _install_fake_session(monkeypatch, client, resp)
 
     result = await client._request_json("/x", {})
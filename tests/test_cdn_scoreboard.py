@@ -0,0 +1,169 @@
+import time
+
+import pytest
+
+from control import cdn_scoreboard
+from control.cdn_scoreboard import CdnScoreboard
+from storage.file_manager import FileManager
+
+
+@pytest.fixture(autouse=True)
+def _clear_shared_scoreboards():
+    cdn_scoreboard._SHARED_SCOREBOARDS.clear()
+    yield
+    cdn_scoreboard._SHARED_SCOREBOARDS.clear()
+
+
+def test_rank_keeps_order_without_stats():
+    board = CdnScoreboard()
+    urls = ["https://v3-dy.example/a.mp4", "https://v9-dy.example/a.mp4"]
+    assert board.rank(urls) == urls
+
+
+def test_rank_moves_failing_host_behind_healthy_one():
+    board = CdnScoreboard()
+    board.record("https://v3-dy.example/x.mp4", ok=False)
+    board.record("https://v9-dy.example/y.mp4", ok=True, ttfb=0.1, size=1024 * 1024, elapsed=0.6)
+
+    urls = ["https://v3-dy.example/a.mp4", "https://v9-dy.example/a.mp4"]
+    assert board.rank(urls) == list(reversed(urls))
+
+
+def test_rank_prefers_faster_host_and_keeps_unknown_neutral():
+    board = CdnScoreboard()
+    mb = 1024 * 1024
+    board.record("https://slow.example/x", ok=True, ttfb=2.0, size=mb, elapsed=6.0)
+    board.record("https://fast.example/x", ok=True, ttfb=0.1, size=mb, elapsed=0.3)
+
+    candidates = [
+        ("https://slow.example/a", {}),
+        ("https://unknown.example/a", {}),
+        ("https://fast.example/a", {}),
+    ]
+    ranked = board.rank(candidates, key=lambda c: c[0])
+
+    assert [c[0] for c in ranked] == [
+        "https://fast.example/a",
+        "https://unknown.example/a",
+        "https://slow.example/a",
+    ]
+
+
+def test_stale_stats_are_ignored():
+    board = CdnScoreboard(max_age_seconds=60)
+    board.record("https://v3-dy.example/x", ok=False)
+    board._hosts["v3-dy.example"]["updated_at"] = time.time() - 120
+
+    assert board.cost("v3-dy.example") is None
+    assert board.snapshot() == {}
+
+
+def test_scoreboard_persists_across_instances(tmp_path):
+    path = tmp_path / "cdn_scores.json"
+    board = CdnScoreboard(str(path))
+    board.record("https://p3-sign.example/c.jpg", ok=False)
+    board.save()
+
+    reloaded = CdnScoreboard(str(path))
+    assert reloaded.snapshot()["p3-sign.example"]["error_rate"] == 1.0
+
+
+def test_from_config_shares_instance_and_honours_switch():
+    first = CdnScoreboard.from_config({"cdn_scoreboard": True})
+    assert first is CdnScoreboard.from_config(None)
+    assert CdnScoreboard.from_config({"cdn_scoreboard": False}) is None
+
+
+class _Content:
+    async def iter_chunked(self, _size):
+        yield b"abcd"
+
+
+class _Response:
+    status = 200
+    content_length = 4
+    headers = {"Content-Type": "video/mp4"}
+    content = _Content()
+    url = "https://v5-dy.example/obj.mp4"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc):
+        return False
+
+
+class _Session:
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, *args, **kwargs):
+        return self.response
+
+
+@pytest.mark.asyncio
+async def test_download_file_records_outcome_per_host(tmp_path):
+    board = CdnScoreboard()
+    manager = FileManager(str(tmp_path), scoreboard=board)
+
+    ok = await manager.download_file(
+        "https://v5-dy.example/obj.mp4", tmp_path / "a.mp4", _Session(_Response())
+    )
+    failed = _Response()
+    failed.status = 404
+    failed.url = "https://v6-dy.example/obj.mp4"
+    not_ok = await manager.download_file(
+        "https://v6-dy.example/obj.mp4", tmp_path / "b.mp4", _Session(failed)
+    )
+
+    assert ok is True and not_ok is False
+    stats = board.snapshot()
+    assert stats["v5-dy.example"]["error_rate"] == 0.0
+    assert "ttfb" in stats["v5-dy.example"]
+    assert stats["v6-dy.example"]["error_rate"] == 1.0
+
+
+def test_redirected_candidates_are_scored_by_final_host():
+    board = CdnScoreboard()
+    slow = "https://www.douyin.com/aweme/v1/play/?video_id=v1&line=0"
+    fast = "https://www.douyin.com/aweme/v1/play/?video_id=v1&line=1"
+    board.record(slow, final_url="https://v3-dy.example/a.mp4", ok=True, ttfb=2.0)
+    board.record(fast, final_url="https://v9-dy.example/a.mp4", ok=True, ttfb=0.1)
+
+    stats = board.snapshot()
+    assert set(stats) == {"v3-dy.example", "v9-dy.example"}
+    assert board.resolve_host(slow) == "v3-dy.example"
+    assert board.rank([slow, fast]) == [fast, slow]
+
+
+def test_redirect_target_carries_over_to_other_signed_play_urls():
+    board = CdnScoreboard()
+
+    def play(video_id, ratio, ts):
+        return (
+            "https://www.douyin.com/aweme/v1/play/"
+            f"?video_id={video_id}&ratio={ratio}&line=0&is_play_url=1"
+            f"&ts={ts}&X-Bogus=DFSz{ts}&a_bogus=sig{video_id}"
+        )
+
+    board.record(play("A", "1080p", 1), final_url="https://v3-dy.example/a.mp4", ok=False)
+    board.record(play("A", "720p", 2), final_url="https://v9-dy.example/a.mp4", ok=True, ttfb=0.1)
+
+    # 另一个作品的新签名地址：签名、video_id、时间戳都没见过，仍按同形态的落点排序。
+    slow, fast = play("B", "1080p", 3), play("B", "720p", 4)
+    assert board.resolve_host(slow) == "v3-dy.example"
+    assert board.rank([slow, fast]) == [fast, slow]
+    assert len(board._redirects) == 2
+
+
+@pytest.mark.asyncio
+async def test_download_file_records_redirect_target_host(tmp_path):
+    board = CdnScoreboard()
+    manager = FileManager(str(tmp_path), scoreboard=board)
+    play_url = "https://www.douyin.com/aweme/v1/play/?video_id=v1"
+
+    ok = await manager.download_file(play_url, tmp_path / "a.mp4", _Session(_Response()))
+
+    assert ok is True
+    assert set(board.snapshot()) == {"v5-dy.example"}
+    assert board.resolve_host(play_url) == "v5-dy.example"
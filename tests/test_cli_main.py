@@ -12,7 +12,7 @@ class _FakeCookieManager:
 
 
 class _FakeAPIClient:
-    def __init__(self, _cookies, proxy=None):
+    def __init__(self, _cookies, proxy=None, **_kwargs):
         self.proxy = proxy
         self.resolved_urls = []
 
@@ -74,9 +74,10 @@ async def test_download_url_passes_proxy_to_api_client(monkeypatch, tmp_path):
     captured = {}
 
     class _ProxyAPIClient(_FakeAPIClient):
-        def __init__(self, cookies, proxy=None):
+        def __init__(self, cookies, proxy=None, **kwargs):
             captured["cookies"] = cookies
             captured["proxy"] = proxy
+            captured["connection_config"] = kwargs.get("connection_config")
             super().__init__(cookies, proxy=proxy)
 
     monkeypatch.setattr(main_module, "DouyinAPIClient", _ProxyAPIClient)
@@ -102,6 +103,7 @@ async def test_download_url_passes_proxy_to_api_client(monkeypatch, tmp_path):
     assert result is not None
     assert result.success == 1
     assert captured["proxy"] == "http://127.0.0.1:8899"
+    assert captured["connection_config"] == config.get("connection")
 
 
 @pytest.mark.asyncio
@@ -117,7 +119,7 @@ async def test_discovery_subcommand_passes_proxy_to_api_client(monkeypatch, tmp_
     captured = {}
 
     class _ProxyAPIClient(_FakeAPIClient):
-        def __init__(self, cookies, proxy=None):
+        def __init__(self, cookies, proxy=None, **_kwargs):
             captured["proxy"] = proxy
             super().__init__(cookies, proxy=proxy)
 
@@ -133,3 +135,93 @@ async def test_discovery_subcommand_passes_proxy_to_api_client(monkeypatch, tmp_
     await main_module._run_discovery_subcommand(args, config, _FakeCookieManager())
 
     assert captured["proxy"] == "http://127.0.0.1:8899"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_urls_share_one_context(monkeypatch, tmp_path):
+    import asyncio
+
+    config = main_module.ConfigLoader()
+    config.update(path=str(tmp_path), database=False)
+
+    clients = []
+
+    class _CountingAPIClient(_FakeAPIClient):
+        def __init__(self, cookies, proxy=None, **kwargs):
+            clients.append(self)
+            super().__init__(cookies, proxy=proxy)
+
+    running = {"now": 0, "peak": 0}
+    seen_contexts = []
+
+    class _SlowDownloader:
+        async def download(self, parsed):
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+            return SimpleNamespace(total=1, success=1, failed=0, skipped=0, id=parsed["id"])
+
+    def _fake_create(_type, _config, api_client, file_manager, *_args, **_kwargs):
+        seen_contexts.append((api_client, file_manager))
+        return _SlowDownloader()
+
+    monkeypatch.setattr(main_module, "DouyinAPIClient", _CountingAPIClient)
+    monkeypatch.setattr(main_module.URLParser, "parse", lambda url: {"type": "video", "id": url})
+    monkeypatch.setattr(main_module.DownloaderFactory, "create", _fake_create)
+
+    urls = [f"https://www.douyin.com/video/{i}" for i in range(5)]
+    results = await main_module._download_urls_concurrently(
+        urls, config, _FakeCookieManager(), None, 2
+    )
+
+    assert [r.id for r in results] == urls
+    assert running["peak"] == 2
+    assert len(clients) == 1
+    assert len({id(api) for api, _ in seen_contexts}) == 1
+    assert len({id(fm) for _, fm in seen_contexts}) == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_urls_relogin_only_once(monkeypatch, tmp_path):
+    import asyncio
+
+    from auth import CookieManager
+    from core import LoginRequiredError
+
+    config = main_module.ConfigLoader()
+    config.update(path=str(tmp_path), database=False)
+    cookie_manager = CookieManager()
+    cookie_manager.set_cookies({"sessionid": "old"})
+
+    replaced = []
+
+    class _ReloginAPIClient(_FakeAPIClient):
+        def replace_cookies(self, cookies):
+            replaced.append(dict(cookies))
+
+    # downloader.download 的异常会被 download_url 吞掉，这里在工厂阶段抛出。
+    def _fake_create(*_args, **_kwargs):
+        if cookie_manager.get_cookies().get("sessionid") != "fresh":
+            raise LoginRequiredError(2483, "请先登录", "/aweme")
+        return _FakeDownloader()
+
+    relogins = {"n": 0}
+
+    async def _fake_relogin(cookies_path=None):
+        relogins["n"] += 1
+        await asyncio.sleep(0.01)
+        return {"sessionid": "fresh"}
+
+    monkeypatch.setattr(main_module, "DouyinAPIClient", _ReloginAPIClient)
+    monkeypatch.setattr(main_module.URLParser, "parse", lambda url: {"type": "video"})
+    monkeypatch.setattr(main_module.DownloaderFactory, "create", _fake_create)
+    monkeypatch.setattr(main_module, "can_interactive_login", lambda *, serve=False: True)
+    monkeypatch.setattr(main_module, "interactive_relogin", _fake_relogin)
+
+    urls = [f"https://www.douyin.com/video/{i}" for i in range(3)]
+    results = await main_module._download_urls_concurrently(urls, config, cookie_manager, None, 3)
+
+    assert len(results) == 3
+    assert relogins["n"] == 1
+    assert replaced and replaced[-1] == {"sessionid": "fresh"}
@@ -1,5 +1,6 @@
 import asyncio
 import json
+import sqlite3
 
 import pytest
 
@@ -287,11 +288,12 @@ async def test_add_aweme_preserves_downloaded_fields_on_sync_upsert(tmp_path):
 
     db = await database._get_conn()
     cursor = await db.execute(
-        "SELECT title, file_path, metadata, cover_urls FROM aweme WHERE aweme_id = ?",
+        "SELECT title, file_path, cover_urls FROM aweme WHERE aweme_id = ?",
         ("A1",),
     )
     row = await cursor.fetchone()
-    assert row == ("new", "/tmp/a1.mp4", '{"k":1}', '["https://p9/c.jpg"]')
+    assert row == ("new", "/tmp/a1.mp4", '["https://p9/c.jpg"]')
+    assert await database.get_aweme_metadata("A1") == '{"k":1}'
 
     await database.close()
 
@@ -356,11 +358,10 @@ async def test_add_aweme_batch_preserves_download_fields_on_empty_payload(tmp_pa
     )
 
     db = await database._get_conn()
-    cursor = await db.execute(
-        "SELECT title, file_path, metadata FROM aweme WHERE aweme_id = ?", ("B1",)
-    )
+    cursor = await db.execute("SELECT title, file_path FROM aweme WHERE aweme_id = ?", ("B1",))
     row = await cursor.fetchone()
-    assert row == ("new", "/tmp/b1.mp4", '{"m":1}')
+    assert row == ("new", "/tmp/b1.mp4")
+    assert await database.get_aweme_metadata("B1") == '{"m":1}'
 
     await database.close()
 
@@ -483,3 +484,258 @@ async def test_add_aweme_empty_payload_fields_do_not_regress_row(tmp_path):
     assert row == ("gallery", "真标题", "AUTH", "作者甲", 1_700_000_000)
 
     await database.close()
+
+
+async def _add_rows(database, rows):
+    for aweme_id, file_path in rows:
+        await database.add_aweme(
+            {"aweme_id": aweme_id, "aweme_type": "video", "file_path": file_path, "metadata": ""}
+        )
+
+
+@pytest.mark.asyncio
+async def test_is_downloaded_many_uses_one_query_per_chunk(tmp_path):
+    database = Database(str(tmp_path / "test.db"))
+    await database.initialize()
+    await _add_rows(database, [("DL1", "/tmp/a"), ("DL2", "/tmp/b"), ("SYNC1", "")])
+    await database.add_aweme_batch(
+        [
+            {"aweme_id": f"BULK{i}", "aweme_type": "video", "file_path": "/tmp/bulk"}
+            for i in range(600)
+        ]
+    )
+
+    db = await database._get_conn()
+    statements = []
+    original_execute = db.execute
+
+    def _counting_execute(sql, *args):
+        statements.append(sql)
+        return original_execute(sql, *args)
+
+    db.execute = _counting_execute
+    page = ["DL1", "SYNC1", "MISSING", "DL2", "DL1"] + [f"P{i}" for i in range(15)]
+    assert await database.is_downloaded_many(page) == {"DL1", "DL2"}
+    assert len(statements) == 1
+
+    statements.clear()
+    many = [f"BULK{i}" for i in range(600)] + ["DL1"]
+    assert len(await database.is_downloaded_many(many)) == 601
+    assert len(statements) == 2
+    assert await database.is_downloaded_many([]) == set()
+
+    await database.close()
+
+
+@pytest.mark.asyncio
+async def test_downloaded_id_cache_tracks_writes_without_queries(tmp_path):
+    database = Database(str(tmp_path / "test.db"), cache_downloaded_ids=True)
+    await database.initialize()
+    await _add_rows(database, [("DL1", "/tmp/a"), ("SYNC1", "")])
+
+    assert await database.is_downloaded_many(["DL1", "SYNC1"]) == {"DL1"}
+
+    db = await database._get_conn()
+    statements = []
+    original_execute = db.execute
+
+    def _counting_execute(sql, *args):
+        statements.append(sql)
+        return original_execute(sql, *args)
+
+    db.execute = _counting_execute
+    await _add_rows(database, [("SYNC1", "/tmp/now-downloaded"), ("DL1", "")])
+    await database.add_aweme_batch(
+        [{"aweme_id": "B1", "aweme_type": "video", "file_path": "/tmp/b"}]
+    )
+    statements.clear()
+
+    # 保留式 upsert 不清空 DL1 的 file_path，缓存里它仍是已下载。
+    assert await database.is_downloaded_many(["DL1", "SYNC1", "B1", "X"]) == {"DL1", "SYNC1", "B1"}
+    assert await database.is_downloaded("B1") is True
+    assert statements == []
+
+    await database.delete_aweme_by_ids(["DL1"])
+    assert await database.is_downloaded("DL1") is False
+    await database.truncate_history()
+    assert await database.is_downloaded_many(["SYNC1", "B1"]) == set()
+
+    await database.close()
+
+
+def _committed_ids(db_path):
+    # 另开一个连接，只能看到已提交的数据。
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return {row[0] for row in conn.execute("SELECT aweme_id FROM aweme")}
+    finally:
+        conn.close()
+
+
+@pytest.mark.asyncio
+async def test_write_behind_group_commits_and_flushes(tmp_path):
+    db_path = tmp_path / "test.db"
+    database = Database(
+        str(db_path), write_behind=True, write_batch_size=3, write_interval_ms=60_000
+    )
+    await database.initialize()
+
+    await _add_rows(database, [("W1", "/tmp/a"), ("W2", "")])
+    # 入队即可见：去重不会因为写入还没提交而重复下载。
+    assert await database.is_downloaded("W1") is True
+    assert await database.is_downloaded_many(["W1", "W2"]) == {"W1"}
+    assert _committed_ids(db_path) == set()
+
+    # 攒满 batch_size 行后不等 interval 就提交。
+    await database.add_aweme_batch([{"aweme_id": "W3", "aweme_type": "video", "file_path": "/b"}])
+    for _ in range(50):
+        if _committed_ids(db_path):
+            break
+        await asyncio.sleep(0.01)
+    assert _committed_ids(db_path) == {"W1", "W2", "W3"}
+
+    await database.add_history({"url": "u", "url_type": "user", "total_count": 1})
+    await database.flush()
+    db = await database._get_conn()
+    cursor = await db.execute("SELECT COUNT(*) FROM download_history")
+    assert (await cursor.fetchone())[0] == 1
+
+    await _add_rows(database, [("W4", "/tmp/c")])
+    await database.close()
+    assert _committed_ids(db_path) == {"W1", "W2", "W3", "W4"}
+
+
+@pytest.mark.asyncio
+async def test_write_behind_commits_after_interval_and_drops_only_bad_rows(tmp_path):
+    db_path = tmp_path / "test.db"
+    database = Database(str(db_path), write_behind=True, write_interval_ms=20)
+    await database.initialize()
+
+    await _add_rows(database, [("OK1", "/tmp/a")])
+    await database.add_aweme({"aweme_id": "BAD", "aweme_type": None, "file_path": "/tmp/x"})
+    await _add_rows(database, [("OK2", "/tmp/b")])
+    for _ in range(100):
+        # OK1 可能先单独成批提交，等到两条好行都落盘。
+        if {"OK1", "OK2"} <= _committed_ids(db_path):
+            break
+        await asyncio.sleep(0.01)
+
+    assert _committed_ids(db_path) == {"OK1", "OK2"}
+    assert await database.is_downloaded("BAD") is False
+    # 读路径先 flush，读到的数据不会落后于已入队的写入。
+    await database.add_aweme(
+        {"aweme_id": "OK3", "aweme_type": "video", "author_id": "A", "file_path": "/tmp/c"}
+    )
+    assert await database.get_aweme_count_by_author("A") == 1
+    await database.close()
+
+
+@pytest.mark.asyncio
+async def test_id_cache_only_keeps_committed_writes(tmp_path):
+    database = Database(
+        str(tmp_path / "test.db"),
+        cache_downloaded_ids=True,
+        write_behind=True,
+        write_interval_ms=60_000,
+    )
+    await database.initialize()
+    assert await database.is_downloaded("OK") is False
+
+    await _add_rows(database, [("OK", "/tmp/a")])
+    await database.add_aweme({"aweme_id": "BAD", "aweme_type": None, "file_path": "/tmp/x"})
+    assert await database.is_downloaded_many(["OK", "BAD"]) == {"OK", "BAD"}
+    await database.flush()
+
+    # 被丢弃的写入不能留在进程级缓存里，否则本次运行会一直跳过它。
+    assert database._downloaded_ids == {"OK"}
+    assert await database.is_downloaded_many(["OK", "BAD"]) == {"OK"}
+    await database.close()
+
+
+@pytest.mark.asyncio
+async def test_direct_write_survives_a_failed_group_commit(tmp_path):
+    db_path = tmp_path / "test.db"
+    database = Database(str(db_path), write_behind=True, write_interval_ms=60_000)
+    await database.initialize()
+    conn = await database._get_conn()
+    group_started = asyncio.Event()
+    upsert_executed = asyncio.Event()
+    original_execute, original_executemany = conn.execute, conn.executemany
+    original_rollback = conn.rollback
+
+    async def executemany(sql, rows):
+        group_started.set()
+        return await original_executemany(sql, rows)
+
+    async def execute(sql, *args):
+        cursor = await original_execute(sql, *args)
+        if "transcript_job" in sql:
+            # 执行完先让出，写后台的 rollback 若能插进来就会把这次写入回滚掉。
+            upsert_executed.set()
+            await asyncio.sleep(0.05)
+        return cursor
+
+    async def rollback():
+        try:
+            await asyncio.wait_for(upsert_executed.wait(), 0.2)
+        except asyncio.TimeoutError:
+            pass
+        await original_rollback()
+
+    conn.execute, conn.executemany, conn.rollback = execute, executemany, rollback
+    await database.add_aweme({"aweme_id": "BAD", "aweme_type": None, "file_path": "/tmp/x"})
+    flush = asyncio.create_task(database.flush())
+    await group_started.wait()
+    await database.upsert_transcript_job(
+        {"aweme_id": "T1", "video_path": "/tmp/t.mp4", "status": "success"}
+    )
+    await flush
+    del conn.execute, conn.executemany, conn.rollback
+    await database.close()
+
+    check = sqlite3.connect(str(db_path))
+    try:
+        rows = check.execute("SELECT aweme_id, status FROM transcript_job").fetchall()
+    finally:
+        check.close()
+    assert rows == [("T1", "success")]
+
+
+@pytest.mark.asyncio
+async def test_read_pool_serves_reads_off_the_write_connection(tmp_path):
+    database = Database(str(tmp_path / "test.db"), read_pool_size=2)
+    await database.initialize()
+    await database.add_aweme(
+        {"aweme_id": "R1", "aweme_type": "video", "author_id": "A", "file_path": "/tmp/r"}
+    )
+    await database.upsert_job(
+        {"job_id": "j1", "url": "u", "status": "success", "created_at": "2026-01-01"}
+    )
+
+    writer = await database._get_conn()
+
+    def _no_reads_on_writer(sql, *_args):
+        raise AssertionError(f"read on write connection: {sql}")
+
+    writer.execute = _no_reads_on_writer
+
+    results = await asyncio.gather(
+        *(database.is_downloaded("R1") for _ in range(6)),
+        database.is_downloaded_many(["R1", "X"]),
+        database.get_aweme_history(),
+        database.load_terminal_jobs(),
+        database.get_aweme_count_by_author("A"),
+    )
+
+    assert results[:6] == [True] * 6
+    assert results[6] == {"R1"}
+    assert [item["aweme_id"] for item in results[7]["items"]] == ["R1"]
+    assert [job["job_id"] for job in results[8]] == ["j1"]
+    assert results[9] == 1
+    assert len(database._readers) == 2
+    with pytest.raises(sqlite3.OperationalError):
+        await database._readers[0].execute("DELETE FROM aweme")
+
+    del writer.execute
+    await database.close()
+    assert database._readers == []
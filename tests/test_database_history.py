@@ -329,3 +329,151 @@ async def test_history_author_filter_treats_wildcards_literally(tmp_path):
         assert page["total"] == 2
     finally:
         await db.close()
+
+
+async def _add_searchable(db, aweme_id, title, author_name, tags="", file_path="/tmp/x"):
+    await db.add_aweme(
+        {
+            "aweme_id": aweme_id,
+            "aweme_type": "video",
+            "title": title,
+            "author_name": author_name,
+            "file_path": file_path,
+            "tags": tags,
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_aweme_ranks_matches_across_title_author_and_tags(tmp_path):
+    db = Database(db_path=str(tmp_path / "t.db"))
+    await db.initialize()
+    assert db._fts_enabled is True
+    await _add_searchable(db, "tag", "周末日常", "路人", tags="成都美食 探店")
+    await _add_searchable(db, "title", "成都美食合集第二期", "美食家")
+    await _add_searchable(db, "author", "vlog", "成都美食日记")
+    await _add_searchable(db, "other", "上海咖啡", "路人")
+    await _add_searchable(db, "synced", "成都美食", "路人", file_path="")
+
+    result = await db.search_aweme("成都美食")
+    assert result["total"] == 3
+    assert [item["aweme_id"] for item in result["items"]][0] == "title"
+    assert {item["aweme_id"] for item in result["items"]} == {"tag", "title", "author"}
+
+    # 多个词取交集；短于 3 字的词走 LIKE。
+    both = await db.search_aweme("成都美食 探店")
+    assert [item["aweme_id"] for item in both["items"]] == ["tag"]
+    short = await db.search_aweme("咖啡")
+    assert [item["aweme_id"] for item in short["items"]] == ["other"]
+    assert (await db.search_aweme("   "))["total"] == 0
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_search_index_follows_updates_and_deletes(tmp_path):
+    db = Database(db_path=str(tmp_path / "t.db"))
+    await db.initialize()
+    await _add_searchable(db, "a1", "Old Title", "Alice")
+    await _add_searchable(db, "a1", "Brand New Title", "")
+
+    assert (await db.search_aweme("old title"))["total"] == 0
+    assert [i["aweme_id"] for i in (await db.search_aweme("brand new"))["items"]] == ["a1"]
+    # 保留式 upsert 没有改 author_name，索引里也保持原值。
+    assert (await db.search_aweme("alice"))["total"] == 1
+    history = await db.get_aweme_history(title="new tit")
+    assert [item["aweme_id"] for item in history["items"]] == ["a1"]
+
+    await db.delete_aweme_by_ids(["a1"])
+    assert (await db.search_aweme("brand"))["total"] == 0
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_search_index_backfills_existing_rows_and_tags(tmp_path):
+    import json
+
+    import aiosqlite
+
+    db_path = str(tmp_path / "legacy.db")
+    async with aiosqlite.connect(db_path) as conn:
+        await conn.execute(
+            "CREATE TABLE aweme (id INTEGER PRIMARY KEY AUTOINCREMENT, aweme_id TEXT UNIQUE "
+            "NOT NULL, aweme_type TEXT NOT NULL, title TEXT, author_id TEXT, author_name TEXT, "
+            "create_time INTEGER, download_time INTEGER, file_path TEXT, metadata TEXT)"
+        )
+        await conn.execute(
+            "INSERT INTO aweme (aweme_id, aweme_type, title, author_name, file_path, metadata) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                "legacy",
+                "video",
+                "老视频",
+                "作者",
+                "/tmp/l",
+                json.dumps({"text_extra": [{"hashtag_name": "旅行日记"}]}),
+            ),
+        )
+        await conn.commit()
+
+    db = Database(db_path=db_path)
+    await db.initialize()
+    result = await db.search_aweme("旅行日记")
+    assert [item["aweme_id"] for item in result["items"]] == ["legacy"]
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_search_index_backfill_resumes_after_interruption(tmp_path):
+    import aiosqlite
+
+    db_path = str(tmp_path / "t.db")
+    db = Database(db_path=db_path)
+    await db.initialize()
+    for i in range(4):
+        await _add_searchable(db, f"a{i}", f"旅行日记第{i}期", "作者")
+    await db.close()
+
+    # 模拟回填写完第一页就被杀：只有 id<=2 进了索引，进度表还在。
+    async with aiosqlite.connect(db_path) as conn:
+        await conn.execute("DELETE FROM aweme_fts WHERE rowid > 2")
+        await conn.execute("CREATE TABLE aweme_fts_backfill (last_id INTEGER, max_id INTEGER)")
+        await conn.execute("INSERT INTO aweme_fts_backfill VALUES (2, 4)")
+        await conn.commit()
+
+    db = Database(db_path=db_path)
+    await db.initialize()
+    assert (await db.search_aweme("旅行日记"))["total"] == 4
+    await _add_searchable(db, "a9", "旅行日记番外", "作者")
+    assert (await db.search_aweme("旅行日记"))["total"] == 5
+    await db.close()
+
+    async with aiosqlite.connect(db_path) as conn:
+        cursor = await conn.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'aweme_fts_backfill'"
+        )
+        assert await cursor.fetchone() is None
+
+
+@pytest.mark.asyncio
+async def test_search_index_without_triggers_is_rebuilt(tmp_path):
+    import aiosqlite
+
+    db_path = str(tmp_path / "t.db")
+    db = Database(db_path=db_path)
+    await db.initialize()
+    await _add_searchable(db, "a1", "旅行日记", "作者")
+    await db.close()
+
+    # 早先版本先回填、最后才建触发器；回填中途被杀会留下没有触发器的半个索引。
+    async with aiosqlite.connect(db_path) as conn:
+        for name in ("aweme_fts_ai", "aweme_fts_ad", "aweme_fts_au"):
+            await conn.execute(f"DROP TRIGGER {name}")
+        await conn.execute("DELETE FROM aweme_fts")
+        await conn.commit()
+
+    db = Database(db_path=db_path)
+    await db.initialize()
+    assert (await db.search_aweme("旅行日记"))["total"] == 1
+    await _add_searchable(db, "a2", "旅行日记续", "作者")
+    assert (await db.search_aweme("旅行日记"))["total"] == 2
+    await db.close()
@@ -384,3 +384,60 @@ async def test_cover_backfill_runs_only_at_migration_time(tmp_path):
         assert cover_urls == ""  # untouched: backfill only runs when the column is added
     finally:
         await db2.close()
+
+
+async def test_migration_moves_inline_metadata_into_compressed_blobs(tmp_path):
+    db_path = str(tmp_path / "legacy.db")
+    payload = json.dumps({"desc": "标题", "video": {"bit_rate": [{"gear": i} for i in range(200)]}})
+    async with aiosqlite.connect(db_path) as conn:
+        await conn.execute(_LEGACY_AWEME_DDL)
+        await conn.executemany(
+            "INSERT INTO aweme (aweme_id, aweme_type, file_path, metadata) VALUES (?, ?, ?, ?)",
+            [("m1", "video", "/tmp/m1", payload), ("m2", "video", "/tmp/m2", "")],
+        )
+        await conn.commit()
+
+    db = Database(db_path=db_path)
+    await db.initialize()
+    try:
+        conn = await db._get_conn()
+        cursor = await conn.execute("SELECT aweme_id, metadata FROM aweme ORDER BY aweme_id")
+        assert await cursor.fetchall() == [("m1", ""), ("m2", "")]
+        cursor = await conn.execute("SELECT aweme_id, codec, LENGTH(data) FROM aweme_blob")
+        [(aweme_id, codec, size)] = await cursor.fetchall()
+        assert (aweme_id, codec) == ("m1", "zlib")
+        assert size < len(payload.encode("utf-8")) / 4
+
+        assert await db.get_aweme_metadata("m1") == payload
+        assert await db.get_aweme_metadata("m2") is None
+        assert await db.delete_aweme_by_ids(["m1"]) == 1
+        assert await db.get_aweme_metadata("m1") is None
+    finally:
+        await db.close()
+
+
+async def test_blob_migration_runs_once_and_inline_rows_stay_readable(tmp_path):
+    db_path = str(tmp_path / "t.db")
+    db = Database(db_path=db_path)
+    await db.initialize()
+    await db.add_aweme(
+        {"aweme_id": "new", "aweme_type": "video", "file_path": "/tmp/n", "metadata": '{"n":1}'}
+    )
+    # 其他进程仍按旧方式把元数据写在行内。
+    conn = await db._get_conn()
+    await conn.execute(
+        "INSERT INTO aweme (aweme_id, aweme_type, metadata) VALUES ('inline', 'video', '{\"i\":1}')"
+    )
+    await conn.commit()
+    await db.close()
+
+    db2 = Database(db_path=db_path)
+    await db2.initialize()
+    try:
+        conn = await db2._get_conn()
+        cursor = await conn.execute("SELECT metadata FROM aweme WHERE aweme_id = 'new'")
+        assert await cursor.fetchone() == ("",)
+        assert await db2.get_aweme_metadata("new") == '{"n":1}'
+        assert await db2.get_aweme_metadata("inline") == '{"i":1}'
+    finally:
+        await db2.close()
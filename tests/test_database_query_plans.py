@@ -0,0 +1,222 @@
+"""Query-plan regression suite for the hot ``Database`` reads.
+
+Seeds a 1M-row library once per module, calls each hot ``Database`` method
+with a SQLite trace callback installed, and runs ``EXPLAIN QUERY PLAN`` on
+every SELECT it actually issued. A bare ``SCAN <table>`` (full table scan)
+fails the test, as does a temp-B-tree sort on paged listings that are meant
+to walk an index in order.
+
+Plans are checked twice: as shipped (no ``sqlite_stat1`` — the planner
+falls back to heuristics) and after ``ANALYZE`` (row-count statistics for
+1M rows, which is what flips plans on real libraries).
+"""
+
+import asyncio
+import re
+import sqlite3
+import time
+
+import pytest
+
+from storage.database import _FTS_TRIGGERS, Database
+
+ROWS = 1_000_000
+AUTHORS = 2000
+# 每行间隔 30 秒，1M 行覆盖约 347 天；get_top_authors(days=30) 约命中 8.6 万行。
+ROW_INTERVAL_S = 30
+
+_TABLE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+def _aweme_id(i: int) -> str:
+    return f"73{i:017d}"
+
+
+async def _create_schema(path: str) -> None:
+    db = Database(db_path=path)
+    await db.initialize()
+    await db.close()
+
+
+@pytest.fixture(scope="module")
+def library(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("plans") / "library.db")
+    asyncio.run(_create_schema(path))
+    conn = sqlite3.connect(path)
+    try:
+        # FTS 内容不影响查询计划，灌数时先摘掉同步触发器；二级索引也先删掉，
+        # 灌完再由 initialize() 整体重建（同时走一遍老库补建索引的路径），
+        # 比逐行维护快几倍。
+        schema = conn.execute(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE type IN ('trigger', 'index') AND tbl_name = 'aweme' AND sql IS NOT NULL"
+        ).fetchall()
+        for kind, name in schema:
+            conn.execute(f"DROP {kind.upper()} {name}")
+        now = int(time.time())
+        # 每 10 行一条未下载（file_path 为空），每 100 行挂一个 job_id。
+        conn.execute(
+            """
+            WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < ?)
+            INSERT INTO aweme (aweme_id, aweme_type, title, author_id, author_name,
+                               author_sec_uid, create_time, download_time, file_path,
+                               metadata, job_id)
+            SELECT printf('73%017d', i),
+                   CASE WHEN i % 5 = 0 THEN 'gallery' ELSE 'video' END,
+                   'title ' || i,
+                   'uid' || (i % ?), 'name' || (i % ?), 'MS4wLj' || (i % ?),
+                   ? - i * ?, ? - i * ? + 60,
+                   CASE WHEN i % 10 = 0 THEN '' ELSE '/downloads/' || i || '.mp4' END,
+                   '',
+                   CASE WHEN i % 100 = 0 THEN 'job' || (i / 1000) ELSE '' END
+              FROM seq
+            """,
+            (ROWS, AUTHORS, AUTHORS, AUTHORS, now, ROW_INTERVAL_S, now, ROW_INTERVAL_S),
+        )
+        if any(kind == "trigger" for kind, _name in schema):
+            for statement in _FTS_TRIGGERS:
+                conn.execute(statement)
+        conn.commit()
+    finally:
+        conn.close()
+    asyncio.run(_create_schema(path))
+    return path
+
+
+@pytest.fixture(scope="module", params=["no_stats", "analyzed"])
+def library_db(request, library):
+    conn = sqlite3.connect(library)
+    try:
+        if request.param == "analyzed":
+            conn.execute("ANALYZE")
+        else:
+            conn.execute("DROP TABLE IF EXISTS sqlite_stat1")
+        conn.commit()
+    finally:
+        conn.close()
+    return library
+
+
+# (名称, 调用, 计划里必须用到的索引, 是否要求按索引顺序分页——不允许为
+# ORDER BY 建临时 B 树)。点名索引能抓住"没扫表但走错索引"的退化，比如
+# get_top_authors 顺着 sec_uid 索引整库分组。
+HOT_QUERIES = [
+    ("is_downloaded", lambda db: db.is_downloaded(_aweme_id(12345)), (), False),
+    (
+        "is_downloaded_many",
+        lambda db: db.is_downloaded_many([_aweme_id(i) for i in range(500, 520)]),
+        (),
+        False,
+    ),
+    (
+        "get_latest_aweme_time",
+        lambda db: db.get_latest_aweme_time("uid17"),
+        ("idx_aweme_downloaded_author_ctime",),
+        False,
+    ),
+    (
+        "get_aweme_count_by_author",
+        lambda db: db.get_aweme_count_by_author("uid17"),
+        ("idx_author_id",),
+        False,
+    ),
+    (
+        "get_top_authors",
+        lambda db: db.get_top_authors(days=30, limit=10),
+        ("idx_aweme_ctime_sec_uid", "idx_aweme_sec_uid_dtime"),
+        False,
+    ),
+    ("get_aweme_metadata", lambda db: db.get_aweme_metadata(_aweme_id(12345)), (), False),
+    (
+        "history",
+        lambda db: db.get_aweme_history(page=3, size=50),
+        ("idx_aweme_downloaded_dtime",),
+        True,
+    ),
+    (
+        "history_by_create_time",
+        lambda db: db.get_aweme_history(page=3, size=50, sort="create_time"),
+        ("idx_aweme_downloaded_ctime",),
+        True,
+    ),
+    (
+        "history_by_sec_uid",
+        lambda db: db.get_aweme_history(author_sec_uid="MS4wLj17"),
+        ("idx_aweme_sec_uid_dtime",),
+        True,
+    ),
+    (
+        "history_by_job",
+        lambda db: db.get_aweme_history(job_id="job17"),
+        ("idx_aweme_job_dtime",),
+        True,
+    ),
+]
+
+FTS_QUERIES = [
+    ("history_by_title", lambda db: db.get_aweme_history(title="title 4242")),
+    ("history_by_author", lambda db: db.get_aweme_history(author="name17")),
+    ("search_aweme", lambda db: db.search_aweme("title 4242 name42")),
+]
+
+
+async def _plans(path, call, **db_kwargs):
+    """Run ``call(db)`` and return ``[(sql, [plan detail, ...]), ...]`` for
+    every SELECT it issued."""
+    db = Database(db_path=path, **db_kwargs)
+    await db.initialize()
+    conn = await db._get_conn()
+    statements = []
+    try:
+        await conn.set_trace_callback(statements.append)
+        try:
+            await call(db)
+        finally:
+            await conn.set_trace_callback(None)
+        plans = []
+        for sql in statements:
+            # FTS5 自己读影子表（aweme_fts_config 等）的语句不归我们管。
+            if not sql.lstrip().upper().startswith("SELECT") or "'main'." in sql:
+                continue
+            cursor = await conn.execute(f"EXPLAIN QUERY PLAN {sql}")
+            plans.append((sql, [row[3] for row in await cursor.fetchall()]))
+        return db._fts_enabled, plans
+    finally:
+        await db.close()
+
+
+def _assert_indexed(plans, *, indexes=(), ordered=False):
+    assert plans, "query issued no SELECT"
+    for sql, details in plans:
+        shown = " ".join(sql.split())
+        scans = [d for d in details if _TABLE_SCAN.match(d)]
+        assert not scans, f"table scan in {details} for: {shown}"
+        if ordered and not sql.lstrip().upper().startswith("SELECT COUNT"):
+            sorts = [d for d in details if d.startswith("USE TEMP B-TREE") and "ORDER BY" in d]
+            assert not sorts, f"sort instead of index order in {details} for: {shown}"
+    used = " ".join(d for _sql, details in plans for d in details)
+    for index in indexes:
+        assert f"INDEX {index} " in f"{used} ", f"{index} not used: {plans}"
+
+
+@pytest.mark.parametrize("name,call,indexes,ordered", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+async def test_hot_queries_use_indexes(library_db, name, call, indexes, ordered):
+    _fts, plans = await _plans(library_db, call)
+    _assert_indexed(plans, indexes=indexes, ordered=ordered)
+
+
+@pytest.mark.parametrize("name,call", FTS_QUERIES, ids=[q[0] for q in FTS_QUERIES])
+async def test_text_search_goes_through_fts(library_db, name, call):
+    fts_enabled, plans = await _plans(library_db, call)
+    if not fts_enabled:
+        pytest.skip("SQLite build without FTS5 trigram")
+    _assert_indexed(plans)
+    assert all("VIRTUAL TABLE" in " ".join(details) for _sql, details in plans)
+
+
+async def test_cached_id_load_reads_the_downloaded_index(library_db):
+    # 整库加载本身就是 O(n)，但应该扫更窄的部分索引而不是整张表。
+    _fts, plans = await _plans(
+        library_db, lambda db: db.is_downloaded(_aweme_id(1)), cache_downloaded_ids=True
+    )
+    _assert_indexed(plans, indexes=("idx_aweme_downloaded",))
@@ -9,9 +9,11 @@
    job 都 rglob 全库；一个 job 标记的已下载 id 对后续 job 立即可见。
 3. ``_download_aweme_assets`` 中封面/音乐/头像并行下载且互不阻塞，
    任一可选资产失败不影响主视频成功。
+4. 镜像对冲：慢镜像超时无首字节时并行拉起下一个候选，败者取消并清理。
 """
 
 import asyncio
+import os
 import threading
 import time
 
@@ -26,9 +28,11 @@ from core.video_downloader import VideoDownloader
 from storage import FileManager
 
 
-def _build_downloader(tmp_path, max_retries: int = 3):
+def _build_downloader(tmp_path, max_retries: int = 3, download_config=None):
     config = ConfigLoader()
     config.update(path=str(tmp_path))
+    if download_config:
+        config.update(download=download_config)
 
     file_manager = FileManager(str(tmp_path))
     cookie_manager = CookieManager(str(tmp_path / ".cookies.json"))
@@ -226,6 +230,43 @@ async def test_mark_before_index_build_reaches_shared_cache(tmp_path):
     await api_b.close()
 
 
+@pytest.mark.asyncio
+async def test_local_index_persists_across_restarts(tmp_path, monkeypatch):
+    media = tmp_path / "author" / "post"
+    media.mkdir(parents=True)
+    (media / "2026-01-01_title_7346971177114611007.mp4").write_bytes(b"x")
+    # 目录 mtime 拨回过去，避开刚写入目录的 racy 窗口（该窗口内的目录每次都重扫）。
+    for directory in (tmp_path, tmp_path / "author", media):
+        os.utime(directory, ns=(1_600_000_000_000_000_000,) * 2)
+    downloader_a, api_a = _build_downloader(tmp_path)
+    assert downloader_a._is_locally_downloaded("7346971177114611007") is True
+
+    new_file = media / "2026-01-02_title_7346971177114611008.mp4"
+    new_file.write_bytes(b"y")
+    downloader_a._mark_local_aweme_downloaded("7346971177114611008", [new_file])
+    downloader_base.save_local_media_indexes()
+
+    # 模拟重启：进程内缓存清空，新实例从索引文件恢复，未变化的目录不重新列举。
+    downloader_base._LOCAL_AWEME_INDEX_CACHE.clear()
+    scanned = []
+    original_scan = downloader_base.LocalMediaIndex._scan_dir
+
+    def _tracking_scan(self, path, mtime_ns):
+        scanned.append(path)
+        return original_scan(self, path, mtime_ns)
+
+    monkeypatch.setattr(downloader_base.LocalMediaIndex, "_scan_dir", _tracking_scan)
+    downloader_b, api_b = _build_downloader(tmp_path)
+
+    assert downloader_b._is_locally_downloaded("7346971177114611007") is True
+    assert downloader_b._is_locally_downloaded("7346971177114611008") is True
+    assert (tmp_path / downloader_base.INDEX_FILENAME).exists()
+    assert str(tmp_path / "author") not in scanned
+
+    await api_a.close()
+    await api_b.close()
+
+
 # ---------------------------------------------------------------------------
 # 2b. 本地索引扫描不得阻塞事件循环
 # ---------------------------------------------------------------------------
@@ -304,6 +345,43 @@ async def test_concurrent_dedupe_checks_scan_once(tmp_path):
     await api.close()
 
 
+@pytest.mark.asyncio
+async def test_cancelled_dedupe_check_stops_index_scan(tmp_path, monkeypatch):
+    """job 取消时扫描线程要尽快停下，半截结果不能进共享缓存。"""
+    (tmp_path / "author" / "post").mkdir(parents=True)
+    downloader, api = _build_downloader(tmp_path)
+    scanning = threading.Event()
+    finished = threading.Event()
+    original_scan = downloader_base.LocalMediaIndex._scan_dir
+    original_build = downloader._build_local_aweme_index
+
+    def _blocking_scan(self, path, mtime_ns):
+        scanning.set()
+        downloader._local_index_cancel.wait(5)
+        return original_scan(self, path, mtime_ns)
+
+    def _tracking_build():
+        try:
+            original_build()
+        finally:
+            finished.set()
+
+    monkeypatch.setattr(downloader_base.LocalMediaIndex, "_scan_dir", _blocking_scan)
+    downloader._build_local_aweme_index = _tracking_build
+
+    task = asyncio.create_task(downloader._should_download("7346971177114611003"))
+    assert await asyncio.to_thread(scanning.wait, 5)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert await asyncio.to_thread(finished.wait, 5)
+
+    assert downloader._local_aweme_ids is None
+    assert str(tmp_path) not in downloader_base._LOCAL_AWEME_INDEX_CACHE
+
+    await api.close()
+
+
 # ---------------------------------------------------------------------------
 # 3. 可选资产并行且失败不影响主媒体
 # ---------------------------------------------------------------------------
@@ -384,3 +462,139 @@ async def test_optional_asset_failure_keeps_video_success(tmp_path, monkeypatch)
     assert ok is True
 
     await api_client.close()
+
+
+# ---------------------------------------------------------------------------
+# 4. 镜像对冲
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_hedged_download_races_stalled_mirror(tmp_path, monkeypatch):
+    downloader, api_client = _build_downloader(
+        tmp_path, download_config={"hedge_after_seconds": 0.05}
+    )
+    cancelled = []
+
+    async def _fake_download_file(url, save_path, session, **kwargs):
+        if "slow" in url:
+            save_path.with_suffix(save_path.suffix + ".tmp").write_bytes(b"partial")
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(save_path.name)
+                raise
+        kwargs["progress_callback"](4)
+        save_path.write_bytes(b"fast")
+        return save_path if kwargs.get("return_saved_path") else True
+
+    monkeypatch.setattr(downloader.file_manager, "download_file", _fake_download_file)
+
+    result = await downloader._download_video_with_fallback(
+        [("https://slow.example/v.mp4", {}), ("https://fast.example/v.mp4", {})],
+        tmp_path / "video.mp4",
+        session=object(),
+    )
+
+    assert result is True
+    assert cancelled == ["video.mp4"]
+    assert (tmp_path / "video.mp4").read_bytes() == b"fast"
+    # 胜出的对冲文件已改名，败者的 .tmp 已清理。
+    assert sorted(p.name for p in tmp_path.iterdir() if p.name.startswith("video")) == ["video.mp4"]
+
+    await api_client.close()
+
+
+@pytest.mark.asyncio
+async def test_hedged_download_leaves_streaming_mirror_alone(tmp_path, monkeypatch):
+    downloader, api_client = _build_downloader(
+        tmp_path, download_config={"hedge_after_seconds": 0.02}
+    )
+    attempts = []
+
+    async def _fake_download_file(url, save_path, session, **kwargs):
+        attempts.append(url)
+        kwargs["progress_callback"](1024)
+        await asyncio.sleep(0.1)
+        return True
+
+    monkeypatch.setattr(downloader.file_manager, "download_file", _fake_download_file)
+
+    result = await downloader._download_first_available(
+        {"url_list": ["https://p3/a.jpg", "https://p9/a.jpg"]},
+        tmp_path / "cover.jpg",
+        session=object(),
+    )
+
+    assert result is True
+    # 首个镜像已在持续出数据，不应被对冲。
+    assert attempts == ["https://p3/a.jpg"]
+
+    await api_client.close()
+
+
+@pytest.mark.asyncio
+async def test_hedged_download_replaces_failed_mirror_immediately(tmp_path, monkeypatch):
+    downloader, api_client = _build_downloader(
+        tmp_path, download_config={"hedge_after_seconds": 30}
+    )
+    attempts = []
+
+    async def _fake_download_file(url, save_path, session, **kwargs):
+        attempts.append(url)
+        if "p3" in url:
+            return False
+        save_path.write_bytes(b"ok")
+        return save_path
+
+    monkeypatch.setattr(downloader.file_manager, "download_file", _fake_download_file)
+
+    result = await asyncio.wait_for(
+        downloader._download_first_available(
+            {"url_list": ["https://p3/a.jpg", "https://p9/a.jpg"]},
+            tmp_path / "cover.jpg",
+            session=object(),
+            return_saved_path=True,
+        ),
+        timeout=5,
+    )
+
+    # 失败立即补位，不必等对冲期限。
+    assert result == tmp_path / "cover.jpg"
+    assert attempts == ["https://p3/a.jpg", "https://p9/a.jpg"]
+    assert (tmp_path / "cover.jpg").read_bytes() == b"ok"
+
+    await api_client.close()
+
+
+@pytest.mark.asyncio
+async def test_first_available_tries_healthy_host_first(tmp_path, monkeypatch):
+    from control import CdnScoreboard
+
+    downloader, api_client = _build_downloader(tmp_path)
+    downloader.file_manager.scoreboard = CdnScoreboard()
+    downloader.file_manager.scoreboard.record("https://p3-sign.douyinpic.com/x.jpg", ok=False)
+    attempts = []
+
+    async def _fake_download_file(url, save_path, session, **_kwargs):
+        attempts.append(url)
+        return True
+
+    monkeypatch.setattr(downloader.file_manager, "download_file", _fake_download_file)
+
+    result = await downloader._download_first_available(
+        {
+            "url_list": [
+                "https://p3-sign.douyinpic.com/c.jpg",
+                "https://p9-sign.douyinpic.com/c.jpg",
+            ]
+        },
+        tmp_path / "cover.jpg",
+        session=object(),
+    )
+
+    assert result is True
+    # 记分板上 p3 刚失败过，应先试 p9。
+    assert attempts == ["https://p9-sign.douyinpic.com/c.jpg"]
+
+    await api_client.close()
@@ -1,5 +1,7 @@
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
+import aiohttp
 import pytest
 
 from storage.file_manager import FileManager
@@ -412,6 +414,9 @@ class _FakeHttpxClient:
         self._calls.append((method, url, headers))
         return self._response
 
+    async def aclose(self):
+        self._calls.append(("CLOSE", None, None))
+
 
 @pytest.mark.asyncio
 async def test_download_file_falls_back_to_httpx_on_403(tmp_path, monkeypatch):
@@ -598,3 +603,411 @@ async def test_download_file_rejects_incomplete_partial_content_206(tmp_path):
 
     assert ok is False
     assert not target.exists()
+
+
+class _RangeServingSession:
+    """Serve ``payload`` honouring ``Range`` headers, recording each request."""
+
+    def __init__(self, payload, *, final_url="https://v3-cdn.example/final.mp4", fail_range=None):
+        self.payload = payload
+        self.final_url = final_url
+        self.fail_range = fail_range
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        range_header = (headers or {}).get("Range")
+        self.requests.append((url, range_header))
+        total = len(self.payload)
+        if range_header is None:
+            response = _FakeResponse(status=200, chunks=(self.payload,), headers={})
+            response.content_length = total
+        else:
+            start, end = (int(part) for part in range_header[len("bytes=") :].split("-"))
+            end = min(end, total - 1)
+            body = self.payload[start : end + 1]
+            if range_header == self.fail_range:
+                body = body[:-1]
+            response = _FakeResponse(
+                status=206,
+                chunks=(body,),
+                headers={
+                    "Content-Type": "video/mp4",
+                    "Content-Range": f"bytes {start}-{end}/{total}",
+                },
+            )
+        response.url = self.final_url
+        return response
+
+
+@pytest.mark.asyncio
+async def test_download_file_segmented_writes_ranges_at_offsets(tmp_path):
+    payload = bytes(range(256)) * 40  # 10240 bytes
+    fm = FileManager(str(tmp_path), download_config={"segments": 4})
+    fm.segment_min_size = 1024
+    session = _RangeServingSession(payload)
+    target = tmp_path / "big.mp4"
+
+    ok = await fm.download_file(
+        "https://www.douyin.com/aweme/v1/play/?x=1", target, session=session
+    )
+
+    assert ok is True
+    assert target.read_bytes() == payload
+    assert not target.with_suffix(".mp4.tmp").exists()
+    probe, *segments = session.requests
+    assert probe[1] == "bytes=0-0"
+    assert [r for _u, r in segments] == [
+        "bytes=0-2559",
+        "bytes=2560-5119",
+        "bytes=5120-7679",
+        "bytes=7680-10239",
+    ]
+    # Segments reuse the probe's redirect target so they all hit one CDN node.
+    assert {u for u, _r in segments} == {"https://v3-cdn.example/final.mp4"}
+
+
+@pytest.mark.asyncio
+async def test_download_file_segmented_small_file_uses_single_stream(tmp_path):
+    payload = b"x" * 3000
+    fm = FileManager(str(tmp_path), download_config={"segments": 4})
+    fm.segment_min_size = 2048
+    session = _RangeServingSession(payload)
+    target = tmp_path / "small.mp4"
+
+    ok = await fm.download_file("https://cdn.example/small.mp4", target, session=session)
+
+    assert ok is True
+    assert target.read_bytes() == payload
+    assert [r for _u, r in session.requests] == ["bytes=0-0", None]
+
+
+@pytest.mark.asyncio
+async def test_download_file_segmented_failure_falls_back_to_single_stream(tmp_path):
+    payload = bytes(range(256)) * 16  # 4096 bytes
+    fm = FileManager(str(tmp_path), download_config={"segments": 2})
+    fm.segment_min_size = 1024
+    session = _RangeServingSession(payload, fail_range="bytes=2048-4095")
+    target = tmp_path / "flaky.mp4"
+
+    ok = await fm.download_file("https://cdn.example/flaky.mp4", target, session=session)
+
+    assert ok is True
+    assert target.read_bytes() == payload
+    assert session.requests[-1][1] is None
+
+
+class _SlowContent:
+    """Stream ``body`` in small chunks, yielding to the loop between them."""
+
+    def __init__(self, body, log):
+        self._body = body
+        self._log = log
+
+    async def iter_chunked(self, _size):
+        try:
+            for offset in range(0, len(self._body), 256):
+                await asyncio.sleep(0.01)
+                yield self._body[offset : offset + 256]
+        except asyncio.CancelledError:
+            self._log.append("cancelled")
+            raise
+        self._log.append("finished")
+
+
+class _FailingContent:
+    async def iter_chunked(self, _size):
+        await asyncio.sleep(0.02)
+        raise aiohttp.ClientPayloadError("connection reset")
+        yield b""  # pragma: no cover
+
+
+class _SlowSegmentSession(_RangeServingSession):
+    """Segments stream slowly; ``failing_range`` errors out mid-body."""
+
+    def __init__(self, payload, *, failing_range=None):
+        super().__init__(payload)
+        self.failing_range = failing_range
+        self.slow_log = []
+
+    def get(self, url, headers=None, **kwargs):
+        response = super().get(url, headers=headers, **kwargs)
+        range_header = (headers or {}).get("Range")
+        if range_header == self.failing_range:
+            response.content = _FailingContent()
+        elif range_header not in (None, "bytes=0-0"):
+            start, end = (int(part) for part in range_header[len("bytes=") :].split("-"))
+            response.content = _SlowContent(self.payload[start : end + 1], self.slow_log)
+        return response
+
+
+@pytest.mark.asyncio
+async def test_download_file_segment_failure_cancels_siblings_before_fallback(tmp_path):
+    payload = bytes(range(256)) * 16  # 4096 bytes
+    fm = FileManager(str(tmp_path), download_config={"segments": 2})
+    fm.segment_min_size = 1024
+    session = _SlowSegmentSession(payload, failing_range="bytes=2048-4095")
+    target = tmp_path / "slow.mp4"
+    progress = []
+
+    ok = await fm.download_file(
+        "https://cdn.example/slow.mp4", target, session=session, progress_callback=progress.append
+    )
+    await asyncio.sleep(0.1)  # 残留分段若还活着，会在这期间继续写
+
+    assert ok is True
+    assert session.slow_log == ["cancelled"]
+    assert session.requests[-1][1] is None
+    assert target.read_bytes() == payload
+    assert not target.with_suffix(".mp4.tmp").exists()
+    # 分段阶段上报的字节在回退时被退回，净进度恰好是文件大小。
+    assert sum(progress) == len(payload)
+
+
+@pytest.mark.asyncio
+async def test_download_file_cancelled_segmented_download_removes_tmp(tmp_path):
+    payload = bytes(range(256)) * 16
+    fm = FileManager(str(tmp_path), download_config={"segments": 2})
+    fm.segment_min_size = 1024
+    session = _SlowSegmentSession(payload)
+    target = tmp_path / "cancel.mp4"
+    tmp = target.with_suffix(".mp4.tmp")
+
+    task = asyncio.create_task(
+        fm.download_file("https://cdn.example/cancel.mp4", target, session=session)
+    )
+    while not tmp.exists():
+        await asyncio.sleep(0.005)
+    await asyncio.sleep(0.02)  # 分段已在写
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert session.slow_log == ["cancelled", "cancelled"]
+    assert not target.exists()
+    assert not tmp.exists()
+
+
+def test_file_manager_download_config_is_clamped(tmp_path):
+    fm = FileManager(str(tmp_path), download_config={"segments": 999, "segment_min_size_mb": "bad"})
+    assert fm.segment_count == 16
+    assert fm.segment_min_size == 16 * 1024 * 1024
+    assert FileManager(str(tmp_path)).segment_count == 1
+
+
+class _InterruptedContent:
+    def __init__(self, chunks, error):
+        self._chunks = chunks
+        self._error = error
+
+    async def iter_chunked(self, _size):
+        for chunk in self._chunks:
+            yield chunk
+        raise self._error
+
+
+class _RecordingSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.headers = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.headers.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+def _media_response(status, chunks, headers, *, url="https://v9-cdn.example/obj/abc.mp4"):
+    response = _FakeResponse(status=status, chunks=chunks, headers=headers)
+    response.url = url
+    return response
+
+
+@pytest.mark.asyncio
+async def test_download_file_resume_continues_from_committed_bytes(tmp_path):
+    payload = b"0123456789" * 10
+    fm = FileManager(str(tmp_path), download_config={"resume": True})
+    target = tmp_path / "replay.mp4"
+    full_headers = {
+        "Content-Type": "video/mp4",
+        "ETag": '"abc123"',
+        "Last-Modified": "Tue, 01 Sep 2026 00:00:00 GMT",
+    }
+
+    first = _media_response(200, (), full_headers)
+    first.content = _InterruptedContent((payload[:40],), ConnectionResetError("reset"))
+    first.content_length = len(payload)
+    ok = await fm.download_file(
+        "https://v9-cdn.example/obj/abc.mp4?sig=1", target, session=_RecordingSession(first)
+    )
+
+    assert ok is False
+    assert target.with_suffix(".mp4.tmp").read_bytes() == payload[:40]
+    sidecar = fm._resume_sidecar_path(target)
+    assert sidecar.exists()
+
+    # A fresh FileManager (process restart) picks the partial file back up.
+    fm = FileManager(str(tmp_path), download_config={"resume": True})
+    tail = _media_response(
+        206,
+        (payload[40:],),
+        {**full_headers, "Content-Range": f"bytes 40-99/{len(payload)}"},
+    )
+    session = _RecordingSession(tail)
+    ok = await fm.download_file("https://v9-cdn.example/obj/abc.mp4?sig=2", target, session=session)
+
+    assert ok is True
+    assert target.read_bytes() == payload
+    assert session.headers[0]["Range"] == "bytes=40-"
+    assert session.headers[0]["If-Range"] == '"abc123"'
+    assert not sidecar.exists()
+    assert not target.with_suffix(".mp4.tmp").exists()
+
+
+@pytest.mark.asyncio
+async def test_download_file_resume_restarts_when_server_sends_full_body(tmp_path):
+    payload = b"new-content-" * 5
+    fm = FileManager(str(tmp_path), download_config={"resume": True})
+    target = tmp_path / "v.mp4"
+    target.with_suffix(".mp4.tmp").write_bytes(b"stale-bytes")
+    fm._save_resume_state(
+        target,
+        {
+            "url_path": "/obj/abc.mp4",
+            "etag": '"old"',
+            "last_modified": "",
+            "total": 500,
+            "committed": 11,
+        },
+    )
+
+    full = _media_response(200, (payload,), {"Content-Type": "video/mp4"})
+    session = _RecordingSession(full)
+    ok = await fm.download_file("https://v9-cdn.example/obj/abc.mp4", target, session=session)
+
+    assert ok is True
+    assert session.headers[0]["Range"] == "bytes=11-"
+    assert target.read_bytes() == payload
+    assert not fm._resume_sidecar_path(target).exists()
+
+
+@pytest.mark.asyncio
+async def test_download_file_resume_rejects_tail_for_different_object(tmp_path):
+    fm = FileManager(str(tmp_path), download_config={"resume": True})
+    target = tmp_path / "v.mp4"
+    target.with_suffix(".mp4.tmp").write_bytes(b"x" * 10)
+    fm._save_resume_state(
+        target,
+        {"url_path": "/obj/abc.mp4", "etag": "", "last_modified": "", "total": 20, "committed": 10},
+    )
+
+    tail = _media_response(
+        206,
+        (b"y" * 10,),
+        {"Content-Type": "video/mp4", "Content-Range": "bytes 10-19/20"},
+        url="https://v9-cdn.example/obj/other.mp4",
+    )
+    ok = await fm.download_file(
+        "https://v9-cdn.example/obj/other.mp4", target, session=_RecordingSession(tail)
+    )
+
+    assert ok is False
+    assert not target.exists()
+    assert not target.with_suffix(".mp4.tmp").exists()
+    assert not fm._resume_sidecar_path(target).exists()
+
+
+def test_load_resume_state_trims_uncommitted_tail(tmp_path):
+    fm = FileManager(str(tmp_path), download_config={"resume": True})
+    target = tmp_path / "v.mp4"
+    tmp_file = target.with_suffix(".mp4.tmp")
+    tmp_file.write_bytes(b"a" * 30)
+    fm._save_resume_state(
+        target,
+        {"url_path": "/v.mp4", "etag": "", "last_modified": "", "total": 100, "committed": 25},
+    )
+
+    state = fm._load_resume_state(target)
+
+    assert state["committed"] == 25
+    assert tmp_file.stat().st_size == 25
+
+
+def test_complete_content_range_size_accepts_resume_tail():
+    headers = {"Content-Range": "bytes 40-99/100"}
+    assert FileManager._complete_content_range_size(headers) is None
+    assert FileManager._complete_content_range_size(headers, resume_from=40) == 100
+    assert FileManager._complete_content_range_size(headers, resume_from=41) is None
+
+
+def test_discard_partial_removes_only_unfinished_files(tmp_path):
+    manager = FileManager(str(tmp_path))
+    save_path = tmp_path / "clip.hedge1.jpg"
+    for name in (
+        "clip.hedge1.jpg.tmp",
+        "clip.hedge1.webp.tmp",
+        "clip.hedge1.jpg.tmp.resume",
+        "clip.jpg",
+        "clip.hedge1x.jpg.tmp",
+    ):
+        (tmp_path / name).write_bytes(b"x")
+
+    manager.discard_partial(save_path)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["clip.hedge1x.jpg.tmp", "clip.jpg"]
+
+
+@pytest.mark.asyncio
+async def test_httpx_fallback_reuses_pooled_client_and_remembers_host(tmp_path, monkeypatch):
+    fm = FileManager(str(tmp_path), download_config={"httpx_max_connections": 4})
+    calls = []
+    created = []
+    response = _FakeHttpxResponse(200, b"x", {"Content-Type": "image/jpeg", "Content-Length": "1"})
+
+    def _fake_client(*args, **kwargs):
+        created.append(kwargs)
+        return _FakeHttpxClient(response, calls)
+
+    monkeypatch.setattr("storage.file_manager.httpx.AsyncClient", _fake_client)
+
+    first_session = _aiohttp_session_returning_status(403)
+    assert await fm.download_file(
+        "https://p3-pc-sign.douyinpic.com/a.jpg", tmp_path / "a.jpg", session=first_session
+    )
+    second_session = _aiohttp_session_returning_status(403)
+    assert await fm.download_file(
+        "https://p3-pc-sign.douyinpic.com/b.jpg", tmp_path / "b.jpg", session=second_session
+    )
+
+    # 一个长期客户端服务所有兜底请求，池上限来自配置。
+    assert len(created) == 1
+    assert created[0]["limits"].max_connections == 4
+    # 主机已知需要 httpx：第二次直接走 httpx，不再白打一次 aiohttp。
+    assert first_session.get.call_count == 1
+    assert second_session.get.call_count == 0
+    assert [c[1] for c in calls] == [
+        "https://p3-pc-sign.douyinpic.com/a.jpg",
+        "https://p3-pc-sign.douyinpic.com/b.jpg",
+    ]
+
+    await fm.close()
+    assert calls[-1][0] == "CLOSE"
+
+
+@pytest.mark.asyncio
+async def test_remembered_httpx_host_is_forgotten_after_httpx_failure(tmp_path, monkeypatch):
+    fm = FileManager(str(tmp_path))
+    fm._httpx_hosts.add("p9-pc-sign.douyinpic.com")
+    calls = []
+    response = _FakeHttpxResponse(404, b"", {})
+    monkeypatch.setattr(
+        "storage.file_manager.httpx.AsyncClient",
+        lambda *a, **k: _FakeHttpxClient(response, calls),
+    )
+
+    result = await fm.download_file(
+        "https://p9-pc-sign.douyinpic.com/gone.jpg",
+        tmp_path / "gone.jpg",
+        session=_aiohttp_session_returning_status(404),
+    )
+
+    assert result is False
+    assert "p9-pc-sign.douyinpic.com" not in fm._httpx_hosts
@@ -0,0 +1,53 @@
+import json
+import math
+
+import pytest
+
+from utils import json_codec
+
+_PAYLOAD = {
+    "aweme_id": "7600224486650121527",
+    "desc": "中文标题 #话题",
+    "statistics": {"digg_count": 12, "share_rate": 0.25},
+    "images": None,
+    "video": {"cover": {"url_list": ["https://example.com/c.jpg"]}},
+}
+
+
+@pytest.fixture(params=["fast", "json"])
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(json_codec, "BACKEND", "json")
+    return request.param
+
+
+def test_roundtrip_keeps_unicode_unescaped(backend):
+    encoded = json_codec.dumps(_PAYLOAD)
+
+    assert "中文标题" in encoded
+    assert json.loads(encoded) == _PAYLOAD
+    assert json_codec.loads(encoded) == _PAYLOAD
+    assert json_codec.loads(encoded.encode("utf-8")) == _PAYLOAD
+    assert json_codec.loads(memoryview(encoded.encode("utf-8"))) == _PAYLOAD
+
+
+def test_indent_output_is_pretty_printed(backend):
+    encoded = json_codec.dumps({"a": [1]}, indent=True)
+
+    assert encoded.splitlines()[1].startswith('  "a"')
+    assert json.loads(encoded) == {"a": [1]}
+
+
+def test_inputs_rejected_by_fast_backends_fall_back_to_stdlib(backend):
+    assert json.loads(json_codec.dumps({1: "int key"})) == {"1": "int key"}
+    assert json.loads(json_codec.dumps({"big": 2**70})) == {"big": 2**70}
+    assert math.isnan(json_codec.loads(b'{"x": NaN}')["x"])
+
+
+def test_invalid_json_raises_value_error(backend):
+    with pytest.raises(ValueError):
+        json_codec.loads(b"<html>verify</html>")
+
+
+def test_backend_is_reported():
+    assert json_codec.BACKEND in {"orjson", "msgspec", "json"}
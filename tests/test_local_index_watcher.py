@@ -0,0 +1,91 @@
+import shutil
+from types import SimpleNamespace
+
+from storage import local_index_watcher
+from storage.local_index_watcher import LocalIndexWatcher
+from storage.local_media_index import LocalMediaIndex
+
+
+def _event(event_type, src, dest=None, is_directory=False):
+    return SimpleNamespace(
+        event_type=event_type,
+        src_path=str(src),
+        dest_path=str(dest) if dest is not None else "",
+        is_directory=is_directory,
+    )
+
+
+def _watched(tmp_path):
+    root = tmp_path / "lib"
+    post = root / "author" / "post"
+    post.mkdir(parents=True)
+    (post / "2026-01-01_t_7346971177114611001.mp4").write_bytes(b"video")
+    (post / "2026-01-02_t_7346971177114611002_1.webp").write_bytes(b"a")
+    (post / "2026-01-02_t_7346971177114611002_2.webp").write_bytes(b"b")
+    index = LocalMediaIndex(root)
+    index.refresh()
+    return root, post, index, LocalIndexWatcher(root, lambda: index)
+
+
+def test_deleted_file_leaves_index(tmp_path):
+    _root, post, index, watcher = _watched(tmp_path)
+    ids = index.aweme_ids
+
+    video = post / "2026-01-01_t_7346971177114611001.mp4"
+    video.unlink()
+    watcher.dispatch(_event("deleted", video))
+    assert "7346971177114611001" not in ids
+
+    # 图集删掉一张，作品仍有其他文件在盘上。
+    image = post / "2026-01-02_t_7346971177114611002_1.webp"
+    image.unlink()
+    watcher.dispatch(_event("deleted", image))
+    assert "7346971177114611002" in ids
+    assert index.lookup("7346971177114611002")[0]["path"].name.endswith("_2.webp")
+
+
+def test_tmp_rename_and_directory_moves_apply_incrementally(tmp_path):
+    root, post, index, watcher = _watched(tmp_path)
+
+    tmp = post / "2026-01-03_t_7346971177114611003.mp4.tmp"
+    tmp.write_bytes(b"new")
+    watcher.dispatch(_event("created", tmp))
+    final = tmp.with_name("2026-01-03_t_7346971177114611003.mp4")
+    tmp.rename(final)
+    watcher.dispatch(_event("moved", tmp, final))
+    assert "7346971177114611003" in index.aweme_ids
+
+    # 用户把整个作者目录移出下载根目录，之后又移回来。
+    outside = tmp_path / "archive"
+    shutil.move(str(root / "author"), str(outside))
+    watcher.dispatch(_event("deleted", root / "author", is_directory=True))
+    assert index.aweme_ids == set()
+
+    shutil.move(str(outside), str(root / "renamed"))
+    watcher.dispatch(_event("created", root / "renamed", is_directory=True))
+    assert index.aweme_ids == {
+        "7346971177114611001",
+        "7346971177114611002",
+        "7346971177114611003",
+    }
+    assert "renamed" in index._dirs[""]["subdirs"]
+
+    fresh = LocalMediaIndex(root)
+    fresh.refresh()
+    assert fresh.aweme_ids == index.aweme_ids
+
+
+def test_events_ignored_until_index_is_built(tmp_path):
+    root = tmp_path / "lib"
+    root.mkdir()
+    watcher = LocalIndexWatcher(root, lambda: None)
+    media = root / "2026-01-01_t_7346971177114611001.mp4"
+    media.write_bytes(b"x")
+    watcher.dispatch(_event("created", media))
+
+
+def test_start_without_watchdog_is_a_no_op(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_index_watcher, "Observer", None)
+    watcher = LocalIndexWatcher(tmp_path, lambda: None)
+    assert watcher.start() is False
+    watcher.stop()
@@ -0,0 +1,126 @@
+import os
+import threading
+
+import pytest
+
+from storage.local_media_index import INDEX_FILENAME, IndexScanCancelled, LocalMediaIndex
+
+_OLD_NS = 1_600_000_000_000_000_000
+
+
+def _age_dirs(root):
+    """把目录 mtime 拨回过去，避开刚写入目录的 racy 窗口。"""
+    for dirpath, _dirnames, _filenames in os.walk(root):
+        os.utime(dirpath, ns=(_OLD_NS, _OLD_NS))
+
+
+def _library(tmp_path):
+    root = tmp_path / "lib"
+    post = root / "author" / "post"
+    like = root / "author" / "like"
+    post.mkdir(parents=True)
+    like.mkdir(parents=True)
+    (post / "2026-01-01_t_7346971177114611001.mp4").write_bytes(b"video")
+    (post / "2026-01-01_t_7346971177114611001_cover.jpg").write_bytes(b"cover")
+    (post / "2026-01-01_t_7346971177114611002.mp4").write_bytes(b"")
+    (post / "2026-01-01_t_7346971177114611003_data.json").write_bytes(b"{}")
+    (like / "2026-01-02_t_7346971177114611004_1.webp").write_bytes(b"img")
+    _age_dirs(root)
+    return root, post, like
+
+
+def test_refresh_indexes_primary_media_only(tmp_path):
+    root, post, _like = _library(tmp_path)
+    index = LocalMediaIndex(root)
+
+    assert index.refresh() == 4
+    assert index.aweme_ids == {"7346971177114611001", "7346971177114611004"}
+    [entry] = index.lookup("7346971177114611001")
+    assert entry["path"] == post / "2026-01-01_t_7346971177114611001.mp4"
+    assert entry["size"] == len(b"video")
+
+
+def test_persisted_index_only_rescans_changed_directories(tmp_path):
+    root, post, like = _library(tmp_path)
+    persist = tmp_path / INDEX_FILENAME
+    first = LocalMediaIndex(root, persist)
+    first.refresh()
+    first.save()
+
+    restarted = LocalMediaIndex(root, persist)
+    assert restarted.aweme_ids == first.aweme_ids
+    assert restarted.refresh() == 0
+
+    (like / "2026-01-02_t_7346971177114611004_1.webp").unlink()
+    (post / "2026-01-03_t_7346971177114611005.mp4").write_bytes(b"new")
+    _age_dirs(root)
+    os.utime(post, ns=(_OLD_NS + 1, _OLD_NS + 1))
+    os.utime(like, ns=(_OLD_NS + 1, _OLD_NS + 1))
+
+    ids = restarted.aweme_ids
+    assert restarted.refresh() == 2
+    assert restarted.aweme_ids is ids
+    assert ids == {"7346971177114611001", "7346971177114611005"}
+
+
+def test_record_files_updates_ids_and_forces_rescan_of_written_dir(tmp_path):
+    root, post, _like = _library(tmp_path)
+    persist = tmp_path / INDEX_FILENAME
+    index = LocalMediaIndex(root, persist)
+    index.refresh()
+
+    new_file = post / "2026-01-04_t_7346971177114611006.mp4"
+    new_file.write_bytes(b"fresh")
+    index.record_files([new_file, post / "2026-01-04_t_7346971177114611006_cover.jpg"])
+    index.save()
+
+    assert "7346971177114611006" in index.aweme_ids
+    restarted = LocalMediaIndex(root, persist)
+    assert "7346971177114611006" in restarted.aweme_ids
+    # 写入过的目录 mtime 已前进，重启后只重扫这一个目录。
+    assert restarted.refresh() == 1
+    assert "7346971177114611006" in restarted.aweme_ids
+
+
+def test_index_for_another_root_is_ignored(tmp_path):
+    root, _post, _like = _library(tmp_path)
+    persist = tmp_path / INDEX_FILENAME
+    index = LocalMediaIndex(root, persist)
+    index.refresh()
+    index.save()
+
+    other = LocalMediaIndex(tmp_path / "elsewhere", persist)
+
+    assert other.aweme_ids == set()
+    assert other.refresh() == 0
+
+
+def test_parallel_refresh_matches_serial_and_reports_progress(tmp_path):
+    root, _post, _like = _library(tmp_path)
+    (root / "other" / "mix").mkdir(parents=True)
+    (root / "other" / "mix" / "2026-01-05_t_7346971177114611007.mp4").write_bytes(b"mix")
+    _age_dirs(root)
+    serial = LocalMediaIndex(root)
+    serial.refresh()
+
+    calls = []
+    parallel = LocalMediaIndex(root)
+    assert parallel.refresh(workers=4, progress=lambda *args: calls.append(args)) == 6
+    assert parallel.aweme_ids == serial.aweme_ids
+    assert parallel._dirs == serial._dirs
+    assert calls[-1] == (6, 3)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_cancelled_refresh_keeps_previous_index(tmp_path, workers):
+    root, post, _like = _library(tmp_path)
+    index = LocalMediaIndex(root)
+    index.refresh()
+    before = set(index.aweme_ids)
+
+    (post / "2026-01-06_t_7346971177114611008.mp4").write_bytes(b"new")
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(IndexScanCancelled):
+        index.refresh(workers=workers, cancel=cancel)
+    assert index.aweme_ids == before
@@ -91,3 +91,36 @@ def test_multi_url_overall_progress_stays_url_based(monkeypatch):
     display.start_url(2, 2, "https://example.com/u2")
     display.fail_url("url failed")
     assert fake_progress.tasks[overall_task_id]["completed"] == 2
+
+
+def test_concurrent_url_reporters_keep_separate_bars(monkeypatch):
+    display = ProgressDisplay()
+    fake_progress = _FakeProgress()
+    monkeypatch.setattr(display, "create_progress", lambda: _FakeProgressContext(fake_progress))
+
+    display.start_download_session(3)
+    overall_task_id = display._overall_task_id
+
+    first = display.open_url(1, 3, "https://example.com/u1")
+    second = display.open_url(2, 3, "https://example.com/u2")
+    first.set_item_total(4, "作品待下载")
+    second.set_item_total(2, "作品待下载")
+    first.advance_item("success", "a1")
+    second.advance_item("failed", "b1")
+    second.extend_item_total(5, "已发现 5 条")
+
+    assert fake_progress.tasks[first._item_task_id]["completed"] == 1
+    assert fake_progress.tasks[first._item_task_id]["total"] == 4
+    assert fake_progress.tasks[second._item_task_id]["completed"] == 1
+    assert fake_progress.tasks[second._item_task_id]["total"] == 5
+    assert "F:1" in fake_progress.tasks[second._item_task_id]["description"]
+    assert "S:1" in fake_progress.tasks[first._item_task_id]["description"]
+
+    second.complete(SimpleNamespace(success=4, failed=1, skipped=0))
+    second.close()
+    assert fake_progress.tasks[overall_task_id]["completed"] == 1
+    assert fake_progress.tasks[first._url_task_id]["description"].startswith("URL 1/3")
+    assert len(fake_progress.removed) == 2
+
+    first.fail("boom")
+    assert fake_progress.tasks[overall_task_id]["completed"] == 2
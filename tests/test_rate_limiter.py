@@ -64,3 +64,141 @@ async def test_rate_limiter_spaces_consecutive_fires(monkeypatch):
         f"fire intervals violate min_interval={min_interval}s: "
         f"too_close={too_close} all={[round(i, 3) for i in intervals]}"
     )
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_throughput_tracks_configured_rate():
+    # 抖动与间隔成比例、且不在锁里睡：20/s 下 10 次调用约 0.45~0.55s，
+    # 旧实现每次额外最多 0.5s 抖动，要好几秒。
+    limiter = RateLimiter(max_per_second=20)
+    start = time.monotonic()
+    await asyncio.gather(*[limiter.acquire() for _ in range(10)])
+    elapsed = time.monotonic() - start
+    assert 0.4 <= elapsed < 1.0
+
+
+def test_adaptive_rate_increases_additively_up_to_max():
+    limiter = RateLimiter(max_per_second=2, adaptive=True, max_rate=2.35, increase_step=0.1)
+    for _ in range(10):
+        limiter.record_success()
+    assert limiter.max_per_second == pytest.approx(2.35)
+    assert limiter.min_interval == pytest.approx(1 / 2.35)
+
+
+def test_adaptive_rate_backs_off_multiplicatively_and_holds(monkeypatch):
+    import control.rate_limiter as rl_mod
+
+    now = [100.0]
+    monkeypatch.setattr(rl_mod.time, "monotonic", lambda: now[0])
+    limiter = RateLimiter(
+        max_per_second=4, adaptive=True, min_rate=0.75, max_rate=8, recovery_seconds=30
+    )
+
+    limiter.record_risk("http_403")
+    assert limiter.max_per_second == 2
+    # 同一波风控的后续信号不会连续减速。
+    limiter.record_risk("http_403")
+    assert limiter.max_per_second == 2
+
+    now[0] += 5
+    limiter.record_risk("empty_200")
+    assert limiter.max_per_second == 1
+    now[0] += 5
+    limiter.record_risk("verify_page")
+    assert limiter.max_per_second == 0.75  # 不低于 min_rate
+
+    # 冷却期内干净响应不加速，冷却结束后恢复加性增长。
+    limiter.record_success()
+    assert limiter.max_per_second == 0.75
+    stats = limiter.stats()
+    assert stats["in_backoff"] is True
+    assert stats["backoffs"] == 3
+    assert stats["risk_signals"] == 4
+    assert stats["last_risk_reason"] == "verify_page"
+
+    now[0] += 31
+    limiter.record_success()
+    assert limiter.max_per_second == pytest.approx(0.85)
+    assert limiter.stats()["in_backoff"] is False
+
+
+def test_non_adaptive_limiter_only_counts_signals():
+    limiter = RateLimiter(max_per_second=2)
+    limiter.record_success()
+    limiter.record_risk("http_429")
+    assert limiter.max_per_second == 2
+    assert limiter.stats()["risk_signals"] == 1
+
+
+def test_rate_limiter_from_config():
+    from config import ConfigLoader
+
+    config = ConfigLoader(None)
+    config.update(rate_limit=3, rate_control={"adaptive": True, "max_rate": 9, "min_rate": 1})
+    limiter = RateLimiter.from_config(config)
+    assert limiter.adaptive is True
+    assert (limiter.max_per_second, limiter.min_rate, limiter.max_rate) == (3, 1, 9)
+
+
+def test_default_config_keeps_rate_limit_as_the_cap():
+    from config import ConfigLoader
+
+    config = ConfigLoader(None)
+    config.update(rate_limit=2)
+    limiter = RateLimiter.from_config(config)
+    assert limiter.adaptive is False
+    assert limiter.max_rate == 2
+
+    # 只开 adaptive、不设 max_rate：只降不升。
+    config.update(rate_control={"adaptive": True})
+    limiter = RateLimiter.from_config(config)
+    for _ in range(20):
+        limiter.record_success()
+    assert limiter.max_per_second == 2
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_lets_bursts_through_immediately():
+    limiter = RateLimiter(max_per_second=1, burst=4)
+    start = time.monotonic()
+    await asyncio.gather(*[limiter.acquire() for _ in range(3)])
+    assert time.monotonic() - start < 0.1
+
+
+@pytest.mark.asyncio
+async def test_endpoint_buckets_do_not_use_global_quota():
+    comments = "/aweme/v1/web/comment/list/"
+    limiter = RateLimiter(max_per_second=1, endpoints={comments: {"rate": 1, "burst": 1}})
+    # 评论桶已耗尽、后面排着一长串评论请求…
+    waiting = [asyncio.ensure_future(limiter.acquire(comments + "reply/")) for _ in range(5)]
+    await asyncio.sleep(0)
+
+    start = time.monotonic()
+    await limiter.acquire("/aweme/v1/web/aweme/post/")
+    # …作品分页仍从全局桶立即拿到令牌。
+    assert time.monotonic() - start < 0.1
+    for task in waiting:
+        task.cancel()
+    await asyncio.gather(*waiting, return_exceptions=True)
+
+
+def test_endpoint_bucket_matches_longest_prefix_and_scales_on_backoff():
+    limiter = RateLimiter(
+        max_per_second=4,
+        adaptive=True,
+        min_rate=0.1,
+        endpoints={
+            "/aweme/v1/web/comment/": {"rate": 2},
+            "/aweme/v1/web/comment/list/reply/": {"rate": 1, "burst": 2},
+        },
+    )
+    reply = limiter._bucket_for("/aweme/v1/web/comment/list/reply/")
+    comments = limiter._bucket_for("/aweme/v1/web/comment/list/")
+    assert (reply.rate, reply.burst) == (1, 2)
+    assert comments.rate == 2
+    assert limiter._bucket_for("/aweme/v1/web/aweme/post/") is limiter._bucket
+
+    limiter.record_risk("http_429")
+    assert limiter.max_per_second == 2
+    assert (comments.rate, reply.rate) == (1, 0.5)
+    assert limiter.stats()["buckets"]["/aweme/v1/web/comment/"]["rate"] == 1
@@ -173,3 +173,16 @@ async def test_job_manager_prunes_by_ttl():
     remaining_ids = {j.job_id for j in await manager.list_jobs()}
     assert old_job.job_id not in remaining_ids
     assert new_job.job_id in remaining_ids
+
+
+def test_metrics_endpoint_reports_rate_limiter(tmp_path):
+    config = ConfigLoader(None)
+    config.update(path=str(tmp_path), rate_limit=3)
+    app = build_app(config)
+
+    with TestClient(app) as client:
+        resp = client.get("/api/v1/metrics")
+        assert resp.status_code == 200
+        stats = resp.json()["rate_limiter"]
+        assert stats["rate"] == 3
+        assert stats["backoffs"] == 0
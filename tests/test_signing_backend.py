@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from utils import signing_backend
+from utils.abogus import CryptoUtility
+from utils.signing_backend import custom_b64encode, rc4_encrypt, sm3_digest, sm3_digest_pure
+
+gmssl_sm3 = pytest.importorskip("gmssl.sm3")
+gmssl_func = pytest.importorskip("gmssl.func")
+
+_ALPHABET_A = "Dkdpgh2ZmsQB80/MfvV36XI1R45-WUAlEixNLwoqYTOPuzKFjJnry79HbGcaStCe"
+_ALPHABET_B = "ckdp1h4ZKsUB80/Mfvw36XIgR25+WQAlEi7NLboqYTOPuzmFjJnryx9HVGDaStCe"
+_LENGTHS = [0, 1, 3, 55, 56, 63, 64, 65, 119, 128, 1000]
+
+
+def _reference_sm3(data: bytes) -> bytes:
+    return bytes.fromhex(gmssl_sm3.sm3_hash(gmssl_func.bytes_to_list(data)))
+
+
+def _reference_rc4(key: bytes, data: bytes) -> bytes:
+    s = list(range(256))
+    j = 0
+    for i in range(256):
+        j = (j + s[i] + key[i % len(key)]) % 256
+        s[i], s[j] = s[j], s[i]
+    i = j = 0
+    out = []
+    for byte in data:
+        i = (i + 1) % 256
+        j = (j + s[i]) % 256
+        s[i], s[j] = s[j], s[i]
+        out.append(byte ^ s[(s[i] + s[j]) % 256])
+    return bytes(out)
+
+
+@pytest.mark.parametrize("length", _LENGTHS)
+def test_sm3_matches_reference(length):
+    data = random.Random(length).randbytes(length)
+
+    expected = _reference_sm3(data)
+    assert sm3_digest_pure(data) == expected
+    assert sm3_digest(data) == expected
+
+
+def test_sm3_backend_is_reported():
+    assert signing_backend.SM3_BACKEND in {"openssl", "cryptography", "python"}
+
+
+def test_rc4_matches_reference_and_reuses_key_schedule():
+    rng = random.Random(7)
+    key = b"\x00\x01\x0e"
+    for length in (0, 1, 50, 300):
+        data = rng.randbytes(length)
+        assert rc4_encrypt(key, data) == _reference_rc4(key, data)
+        # 同一密钥第二次加密仍从初始状态开始，缓存的调度表不会被改写。
+        assert rc4_encrypt(key, data) == _reference_rc4(key, data)
+
+
+def test_custom_base64_matches_bitwise_encoder():
+    crypto = CryptoUtility("cus", [_ALPHABET_A, _ALPHABET_B])
+    rng = random.Random(3)
+    for index, alphabet in enumerate(crypto.base64_alphabet):
+        for length in (0, 1, 2, 3, 4, 47, 100):
+            text = rng.randbytes(length).decode("latin-1")
+            expected = crypto._base64_encode_bits(text, index)
+            assert custom_b64encode(text.encode("latin-1"), alphabet) == expected
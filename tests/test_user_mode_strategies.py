@@ -72,11 +72,15 @@ def test_like_strategy_increment_stops_at_first_downloaded_aweme():
             }
 
     class _Database:
+        def __init__(self):
+            self.lookups = []
+
         async def get_latest_aweme_time(self, _author_id):
             return None
 
-        async def is_downloaded(self, aweme_id):
-            return aweme_id == "old-1"
+        async def is_downloaded_many(self, aweme_ids):
+            self.lookups.append(list(aweme_ids))
+            return {aweme_id for aweme_id in aweme_ids if aweme_id == "old-1"}
 
     class _Downloader:
         def __init__(self):
@@ -102,6 +106,8 @@ def test_like_strategy_increment_stops_at_first_downloaded_aweme():
 
     assert [item["aweme_id"] for item in items] == ["new-1"]
     assert downloader.api_client.calls == [0]
+    # 整页只查一次数据库。
+    assert downloader.database.lookups == [["new-1", "old-1"]]
 
 
 def test_user_mode_media_filter_applies_before_number_limit():
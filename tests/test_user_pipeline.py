@@ -0,0 +1,289 @@
+import asyncio
+from typing import Any, Dict, List
+
+from control.queue_manager import QueueManager
+from core.user_downloader import UserDownloader
+from storage.file_manager import FileManager
+
+
+def _make_aweme(aweme_id: str, create_time: int = 1700000000) -> Dict[str, Any]:
+    return {
+        "aweme_id": aweme_id,
+        "desc": f"desc-{aweme_id}",
+        "create_time": create_time,
+        "author": {"nickname": "tester", "uid": "uid-1"},
+        "video": {"play_addr": {"url_list": ["https://example.com/video.mp4"]}},
+    }
+
+
+class _FakeConfig:
+    def __init__(self, data: Dict[str, Any]):
+        self._data = data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._data.get(key, default)
+
+
+class _NoopRateLimiter:
+    async def acquire(self):
+        return
+
+
+class _PagedAPIClient:
+    """每页 ``page_size`` 条、共 ``pages`` 页（0 = 无限）的 like 列表。"""
+
+    def __init__(self, events: List[str], *, pages: int = 4, page_size: int = 2, items=None):
+        self.events = events
+        self.pages = pages
+        self.page_size = page_size
+        self.items = items
+        self.page_calls = 0
+
+    async def get_user_info(self, _sec_uid: str):
+        return {"uid": "uid-1", "nickname": "tester"}
+
+    async def get_user_like(self, _sec_uid: str, max_cursor: int = 0, count: int = 20):
+        self.page_calls += 1
+        page_index = max_cursor
+        self.events.append(f"page:{page_index}")
+        await asyncio.sleep(0)
+        if self.items is not None:
+            start = page_index * self.page_size
+            chunk = self.items[start : start + self.page_size]
+            has_more = start + self.page_size < len(self.items)
+        else:
+            chunk = [_make_aweme(f"{page_index}-{offset}") for offset in range(self.page_size)]
+            has_more = self.pages == 0 or page_index + 1 < self.pages
+        return {
+            "items": chunk,
+            "has_more": has_more,
+            "max_cursor": page_index + 1,
+            "status_code": 0,
+        }
+
+    async def get_user_post(self, sec_uid: str, max_cursor: int = 0, count: int = 20):
+        return await self.get_user_like(sec_uid, max_cursor, count)
+
+
+def _build_downloader(tmp_path, api_client, *, streaming=True, queue_size=100, thread=2, **extra):
+    config_data = {
+        "number": {"like": 0},
+        "increase": {"like": False},
+        "mode": ["like"],
+        "thread": thread,
+        "browser_fallback": {"enabled": False},
+        "pipeline": {"streaming": streaming, "queue_size": queue_size},
+        **extra,
+    }
+    return UserDownloader(
+        config=_FakeConfig(config_data),
+        api_client=api_client,
+        file_manager=FileManager(str(tmp_path / "Downloaded")),
+        cookie_manager=object(),
+        database=None,
+        rate_limiter=_NoopRateLimiter(),
+        retry_handler=None,
+        queue_manager=QueueManager(max_workers=thread),
+    )
+
+
+def _patch_downloads(monkeypatch, downloader, events, downloaded, gate=None):
+    async def _always_true(*_args, **_kwargs):
+        return True
+
+    async def _download(item, *_args, **_kwargs):
+        events.append(f"download:{item['aweme_id']}")
+        if gate is not None:
+            await gate.wait()
+        downloaded.append(item["aweme_id"])
+        return True
+
+    monkeypatch.setattr(downloader, "_should_download", _always_true)
+    monkeypatch.setattr(downloader, "_download_aweme_assets", _download)
+
+
+def test_streaming_starts_downloads_before_paging_finishes(tmp_path, monkeypatch):
+    events: List[str] = []
+    downloaded: List[str] = []
+    api_client = _PagedAPIClient(events, pages=4)
+    downloader = _build_downloader(tmp_path, api_client)
+    _patch_downloads(monkeypatch, downloader, events, downloaded)
+
+    result = asyncio.run(downloader.download({"sec_uid": "sec_uid_x"}))
+
+    assert result.total == 8
+    assert result.success == 8
+    first_download = next(i for i, e in enumerate(events) if e.startswith("download:"))
+    assert first_download < events.index("page:3")
+
+
+def test_streaming_post_mode_downloads_per_page(tmp_path, monkeypatch):
+    events: List[str] = []
+    downloaded: List[str] = []
+    api_client = _PagedAPIClient(events, pages=3)
+    downloader = _build_downloader(tmp_path, api_client, mode=["post"], number={"post": 5})
+    _patch_downloads(monkeypatch, downloader, events, downloaded)
+
+    result = asyncio.run(downloader.download({"sec_uid": "sec_uid_x"}))
+
+    assert result.total == 5
+    assert sorted(downloaded) == ["0-0", "0-1", "1-0", "1-1", "2-0"]
+    first_download = next(i for i, e in enumerate(events) if e.startswith("download:"))
+    assert first_download < events.index("page:2")
+
+
+def test_streaming_backpressure_pauses_paging(tmp_path, monkeypatch):
+    events: List[str] = []
+    downloaded: List[str] = []
+    api_client = _PagedAPIClient(events, pages=0, page_size=2)
+    downloader = _build_downloader(tmp_path, api_client, queue_size=3, thread=1, number={"like": 6})
+
+    async def _run():
+        gate = asyncio.Event()
+        _patch_downloads(monkeypatch, downloader, events, downloaded, gate=gate)
+        task = asyncio.create_task(downloader.download({"sec_uid": "sec_uid_x"}))
+        for _ in range(50):
+            await asyncio.sleep(0)
+        # 3 条在途（1 条下载中、2 条排队），第 4 条等窗口：分页停在第 2 页。
+        paused_calls = api_client.page_calls
+        gate.set()
+        return paused_calls, await task
+
+    paused_calls, result = asyncio.run(_run())
+
+    assert paused_calls == 2
+    assert result.total == 6
+    assert result.success == 6
+    # number 达到后立即停止上游分页，不会把无限列表翻下去。
+    assert api_client.page_calls == 3
+
+
+def test_streaming_applies_filters_like_batch_mode(tmp_path, monkeypatch):
+    old, new = 1600000000, 1700000000
+    items = [
+        _make_aweme("a", old),
+        _make_aweme("b", new),
+        _make_aweme("c", old),
+        _make_aweme("d", new),
+        _make_aweme("e", new),
+        _make_aweme("f", new),
+        _make_aweme("g", new),
+    ]
+    filters = {"start_time": "2021-01-01", "number": {"like": 5}}
+
+    outcomes = {}
+    for streaming in (False, True):
+        events: List[str] = []
+        downloaded: List[str] = []
+        api_client = _PagedAPIClient(events, page_size=2, items=items)
+        downloader = _build_downloader(
+            tmp_path / str(streaming), api_client, streaming=streaming, **filters
+        )
+        _patch_downloads(monkeypatch, downloader, events, downloaded)
+        result = asyncio.run(downloader.download({"sec_uid": "sec_uid_x"}))
+        outcomes[streaming] = (result.total, result.success, sorted(downloaded))
+
+    assert outcomes[True] == outcomes[False]
+    assert outcomes[True][2] == ["b", "d", "e"]
+
+
+def test_streaming_flushes_db_records_in_chunks(tmp_path, monkeypatch):
+    import core.user_downloader as user_downloader_module
+
+    monkeypatch.setattr(user_downloader_module, "_STREAM_DB_FLUSH_SIZE", 3)
+    events: List[str] = []
+    api_client = _PagedAPIClient(events, pages=4)
+    downloader = _build_downloader(tmp_path, api_client, thread=1)
+
+    flushed: List[List[str]] = []
+
+    class _FakeDatabase:
+        async def is_downloaded_many(self, _aweme_ids):
+            return set()
+
+        async def add_aweme_batch(self, records):
+            flushed.append([r["aweme_id"] for r in records])
+
+    downloader.database = _FakeDatabase()
+
+    async def _always_true(*_args, **_kwargs):
+        return True
+
+    async def _download(item, *_args, db_batch=None, **_kwargs):
+        db_batch.append({"aweme_id": item["aweme_id"]})
+        return True
+
+    monkeypatch.setattr(downloader, "_should_download", _always_true)
+    monkeypatch.setattr(downloader, "_download_aweme_assets", _download)
+
+    result = asyncio.run(downloader.download({"sec_uid": "sec_uid_x"}))
+
+    assert result.success == 8
+    assert [len(chunk) for chunk in flushed] == [3, 3, 2]
+    assert sum(flushed, []) == [f"{p}-{o}" for p in range(4) for o in range(2)]
+
+
+def test_write_behind_database_gets_per_item_writes(tmp_path, monkeypatch):
+    events: List[str] = []
+    api_client = _PagedAPIClient(events, pages=2)
+    downloader = _build_downloader(tmp_path, api_client, thread=1)
+    batches: List[Any] = []
+
+    class _WriteBehindDatabase:
+        write_behind = True
+
+        async def is_downloaded_many(self, _aweme_ids):
+            return set()
+
+        async def add_aweme_batch(self, records):
+            raise AssertionError("write-behind writer already group-commits")
+
+    downloader.database = _WriteBehindDatabase()
+
+    async def _always_true(*_args, **_kwargs):
+        return True
+
+    async def _download(item, *_args, db_batch=None, **_kwargs):
+        batches.append(db_batch)
+        return True
+
+    monkeypatch.setattr(downloader, "_should_download", _always_true)
+    monkeypatch.setattr(downloader, "_download_aweme_assets", _download)
+
+    result = asyncio.run(downloader.download({"sec_uid": "sec_uid_x"}))
+
+    assert result.success == 4
+    assert batches == [None] * 4
+
+
+def test_streaming_dedupe_costs_one_db_query_per_page(tmp_path, monkeypatch):
+    events: List[str] = []
+    downloaded: List[str] = []
+    api_client = _PagedAPIClient(events, pages=3, page_size=3)
+    downloader = _build_downloader(tmp_path, api_client)
+    lookups: List[List[str]] = []
+
+    class _FakeDatabase:
+        async def is_downloaded_many(self, aweme_ids):
+            lookups.append(list(aweme_ids))
+            return set()
+
+        async def is_downloaded(self, aweme_id):
+            raise AssertionError(f"per-item lookup for {aweme_id}")
+
+        async def add_aweme_batch(self, _records):
+            return None
+
+    downloader.database = _FakeDatabase()
+
+    async def _download(item, *_args, **_kwargs):
+        downloaded.append(item["aweme_id"])
+        return True
+
+    monkeypatch.setattr(downloader, "_download_aweme_assets", _download)
+
+    result = asyncio.run(downloader.download({"sec_uid": "sec_uid_x"}))
+
+    assert result.success == 9
+    assert lookups == [[f"{p}-{o}" for o in range(3)] for p in range(3)]
+    assert downloader._db_downloaded_hint == {}
@@ -651,6 +651,10 @@ async def test_download_aweme_assets_video_writes_cover_avatar_and_json(tmp_path
     assert any(path.name.endswith("_avatar.jpg") for path in saved_paths)
     metadata_files = list(tmp_path.rglob("*_data.json"))
     assert len(metadata_files) == 1
+    sidecar = metadata_files[0].read_text(encoding="utf-8")
+    assert json.loads(sidecar) == aweme_data
+    # 侧车文件给人看，保持两空格缩进。
+    assert sidecar.startswith('{\n  "')
 
     await api_client.close()
 
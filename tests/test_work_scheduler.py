@@ -0,0 +1,161 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from control.work_scheduler import (
+    PRIORITY_COMMENTS,
+    PRIORITY_OPTIONAL,
+    PRIORITY_PRIMARY,
+    SchedulerJob,
+    WorkScheduler,
+)
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_work_runs_first():
+    scheduler = WorkScheduler(max_workers=1)
+    order: List[str] = []
+    gate = asyncio.Event()
+
+    async def _blocker():
+        await gate.wait()
+
+    async def _record(label):
+        order.append(label)
+
+    # 唯一的 worker 被占住后再排队，保证取活时三类工作都已就绪。
+    blocker = scheduler.submit(_blocker)
+    await asyncio.sleep(0)
+    futures = [
+        scheduler.submit(_record, "comments", priority=PRIORITY_COMMENTS),
+        scheduler.submit(_record, "optional", priority=PRIORITY_OPTIONAL),
+        scheduler.submit(_record, "primary", priority=PRIORITY_PRIMARY),
+    ]
+    gate.set()
+    await asyncio.gather(blocker, *futures)
+
+    assert order == ["primary", "optional", "comments"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_jobs_share_workers_round_robin():
+    scheduler = WorkScheduler(max_workers=1)
+    order: List[str] = []
+    gate = asyncio.Event()
+
+    async def _blocker():
+        await gate.wait()
+
+    async def _record(label):
+        order.append(label)
+
+    blocker = scheduler.submit(_blocker)
+    await asyncio.sleep(0)
+    big, small = SchedulerJob("big"), SchedulerJob("small")
+    futures = [scheduler.submit(_record, f"big-{i}", job=big) for i in range(4)]
+    futures += [scheduler.submit(_record, f"small-{i}", job=small) for i in range(2)]
+    gate.set()
+    await asyncio.gather(blocker, *futures)
+
+    # 先提交的大 job 不会把后来的小 job 饿到最后。
+    assert order[:4] == ["big-0", "small-0", "big-1", "small-1"]
+
+
+@pytest.mark.asyncio
+async def test_map_bounds_in_flight_items_and_streams_results():
+    scheduler = WorkScheduler(max_workers=2)
+    pulled = 0
+    outstanding = 0
+    peak = 0
+
+    def _items():
+        nonlocal pulled
+        for index in range(20):
+            pulled += 1
+            yield index
+
+    async def _work(index):
+        nonlocal outstanding, peak
+        outstanding += 1
+        peak = max(peak, outstanding)
+        await asyncio.sleep(0)
+        outstanding -= 1
+        return index
+
+    results = []
+    async for result in scheduler.map(_work, _items(), window=3):
+        results.append(result)
+        if len(results) == 1:
+            # 第一个结果产出时上游只被读了窗口大小左右，而不是整个列表。
+            assert pulled <= 4
+
+    assert sorted(results) == list(range(20))
+    assert peak <= 2
+
+
+@pytest.mark.asyncio
+async def test_nested_gather_does_not_deadlock_when_workers_are_busy():
+    scheduler = WorkScheduler(max_workers=2)
+
+    async def _child(value):
+        await asyncio.sleep(0)
+        return value * 10
+
+    async def _parent(value):
+        children = [lambda v=v: _child(v) for v in (value, value + 1)]
+        return sum(await scheduler.gather(children, priority=PRIORITY_OPTIONAL))
+
+    results = await asyncio.wait_for(
+        _collect(scheduler.map(_parent, range(6))),
+        timeout=2,
+    )
+
+    assert sorted(results) == sorted(v * 10 + (v + 1) * 10 for v in range(6))
+
+
+@pytest.mark.asyncio
+async def test_gather_returns_exceptions_in_order():
+    scheduler = WorkScheduler(max_workers=2)
+
+    async def _ok():
+        return "ok"
+
+    async def _boom():
+        raise RuntimeError("kapow")
+
+    results = await scheduler.gather([_ok, _boom, _ok])
+
+    assert results[0] == "ok" and results[2] == "ok"
+    assert isinstance(results[1], RuntimeError)
+
+
+@pytest.mark.asyncio
+async def test_leaving_map_early_cancels_remaining_work():
+    scheduler = WorkScheduler(max_workers=2)
+    started: List[int] = []
+    cancelled: List[int] = []
+
+    async def _work(index):
+        started.append(index)
+        try:
+            if index > 0:
+                await asyncio.sleep(10)
+            return index
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+
+    stream = scheduler.map(_work, range(10), window=3)
+    async for _ in stream:
+        break
+    await stream.aclose()
+
+    assert set(started) <= {0, 1, 2, 3}
+    assert cancelled
+    # worker 没有被取消连累，调度器仍可继续使用。
+    assert await scheduler.gather([lambda: _work(0)]) == [0]
+
+
+async def _collect(stream):
+    return [item async for item in stream]
@@ -1,4 +1,15 @@
-from utils.xbogus import generate_x_bogus
+import json
+import os
+
+import pytest
+
+from utils import xbogus as xbogus_module
+from utils.xbogus import XBogus, generate_x_bogus
+
+_FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "xbogus_golden.json")
+
+with open(_FIXTURE_PATH, encoding="utf-8") as _fixture:
+    _GOLDEN_CASES = json.load(_fixture)["cases"]
 
 
 def test_generate_x_bogus_appends_parameter():
@@ -9,3 +20,27 @@ def test_generate_x_bogus_appends_parameter():
     assert "X-Bogus=" in signed_url
     assert isinstance(token, str) and len(token) > 10
     assert isinstance(ua, str) and "Mozilla" in ua
+
+
+@pytest.mark.parametrize("case", _GOLDEN_CASES, ids=lambda case: str(case["time"]))
+def test_build_matches_golden_corpus(monkeypatch, case):
+    monkeypatch.setattr(xbogus_module.time, "time", lambda: case["time"] + 0.25)
+    signer = XBogus(case["user_agent"])
+
+    signed_url, token, ua = signer.build(case["url"])
+
+    assert token == case["x_bogus"]
+    assert signed_url == f"{case['url']}&X-Bogus={case['x_bogus']}"
+    assert ua == signer.user_agent
+    # UA 部分缓存后，同一实例再签一次结果不变。
+    assert signer.build(case["url"])[1] == case["x_bogus"]
+
+
+def test_build_many_matches_individual_builds(monkeypatch):
+    timestamp = _GOLDEN_CASES[0]["time"]
+    monkeypatch.setattr(xbogus_module.time, "time", lambda: timestamp + 0.25)
+    signer = XBogus()
+    urls = [case["url"] for case in _GOLDEN_CASES]
+
+    assert signer.build_many(urls) == [signer.build(url) for url in urls]
+    assert signer.build_many([]) == []
@@ -0,0 +1,91 @@
+"""本地媒体索引全量重建耗时基准。
+
+    python -m tools.bench_local_index --files 500000 --workers 8
+
+在临时目录里按「作者/模式/作品」的布局生成合成下载库（每个文件 1 字节），
+对比三种建索引方式的耗时：
+
+- ``rglob``：``Path.rglob`` + ``is_file`` + ``stat``（持久化索引之前的做法）；
+- ``serial``：``LocalMediaIndex.refresh()`` 单线程 scandir；
+- ``parallel``：``LocalMediaIndex.refresh(workers=N)`` 按目录扇出到线程池。
+
+页缓存是热的，测的是 CPU / 系统调用开销；冷缓存、网络盘上并行的收益更大。
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+from storage.local_media_index import LocalMediaIndex, media_aweme_ids
+
+MODES = ("post", "like", "mix")
+
+
+def parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark local media index rebuilds.")
+    parser.add_argument("--files", type=int, default=500_000, help="media files to generate")
+    parser.add_argument("--authors", type=int, default=500, help="author directories")
+    parser.add_argument("--workers", type=int, default=8, help="threads for the parallel walk")
+    return parser.parse_args(argv)
+
+
+def build_tree(root: Path, files: int, authors: int) -> None:
+    """生成合成下载库；每个作品一个目录，内含视频和封面。"""
+    aweme_id = 7_300_000_000_000_000_000
+    per_author = max(files // (authors * 2), 1)
+    created = 0
+    for author in range(authors):
+        for index in range(per_author):
+            if created >= files:
+                return
+            aweme_id += 1
+            item_dir = (
+                root / f"author_{author}" / MODES[index % len(MODES)] / f"2024-01-01_{aweme_id}"
+            )
+            item_dir.mkdir(parents=True, exist_ok=True)
+            (item_dir / f"2024-01-01_{aweme_id}.mp4").write_bytes(b"\0")
+            (item_dir / f"2024-01-01_{aweme_id}_cover.jpg").write_bytes(b"\0")
+            created += 2
+
+
+def _rglob_index(root: Path) -> int:
+    ids = set()
+    for path in root.rglob("*"):
+        names = media_aweme_ids(path.name)
+        if names and path.is_file() and path.stat().st_size > 0:
+            ids.update(names)
+    return len(ids)
+
+
+def measure(build: Callable[[], int]) -> float:
+    """返回一次建索引的耗时（秒）。"""
+    started = time.perf_counter()
+    build()
+    return time.perf_counter() - started
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    workers = max(args.workers, 2)
+    root = Path(tempfile.mkdtemp(prefix="dy_bench_index_"))
+    try:
+        started = time.perf_counter()
+        build_tree(root, max(args.files, 2), max(args.authors, 1))
+        print(f"tree:     {args.files} files in {time.perf_counter() - started:.1f} s")
+        _rglob_index(root)  # 预热页缓存
+        before = measure(lambda: _rglob_index(root))
+        serial = measure(lambda: LocalMediaIndex(root).refresh())
+        parallel = measure(lambda: LocalMediaIndex(root).refresh(workers=workers))
+        print(f"rglob:    {before:7.2f} s")
+        print(f"serial:   {serial:7.2f} s  ({before / serial:.2f}x)")
+        print(f"parallel: {parallel:7.2f} s  ({before / parallel:.2f}x, {workers} workers)")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
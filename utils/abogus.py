@@ -21,9 +21,9 @@ Change Log  :
 
 import random
 import time
-from typing import Callable, Dict, List, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
-from gmssl import func, sm3
+from utils.signing_backend import custom_b64encode, rc4_encrypt, sm3_digest
 
 
 class StringProcessor:
@@ -173,6 +173,26 @@ class StringProcessor:
         return "".join(result)
 
 
+# transform_bytes 使用的初始置换表（每次签名都从这里开始）。
+# fmt: off
+_BIG_ARRAY = (
+    121, 243,  55, 234, 103,  36,  47, 228,  30, 231, 106,   6, 115,  95,  78, 101, 250, 207, 198,  50,
+    139, 227, 220, 105,  97, 143,  34,  28, 194, 215,  18, 100, 159, 160,  43,   8, 169, 217, 180, 120,
+    247,  45,  90,  11,  27, 197,  46,   3,  84,  72,   5,  68,  62,  56, 221,  75, 144,  79,  73, 161,
+    178,  81,  64, 187, 134, 117, 186, 118,  16, 241, 130,  71,  89, 147, 122, 129,  65,  40,  88, 150,
+    110, 219, 199, 255, 181, 254,  48,   4, 195, 248, 208,  32, 116, 167,  69, 201,  17, 124, 125, 104,
+     96,  83,  80, 127, 236, 108, 154, 126, 204,  15,  20, 135, 112, 158,  13,   1, 188, 164, 210, 237,
+    222,  98, 212,  77, 253,  42, 170, 202,  26,  22,  29, 182, 251,  10, 173, 152,  58, 138,  54, 141,
+    185,  33, 157,  31, 252, 132, 233, 235, 102, 196, 191, 223, 240, 148,  39, 123,  92,  82, 128, 109,
+     57,  24,  38, 113, 209, 245,   2, 119, 153, 229, 189, 214, 230, 174, 232,  63,  52, 205,  86, 140,
+     66, 175, 111, 171, 246, 133, 238, 193,  99,  60,  74,  91, 225,  51,  76,  37, 145, 211, 166, 151,
+    213, 206,   0, 200, 244, 176, 218,  44, 184, 172,  49, 216,  93, 168,  53,  21, 183,  41,  67,  85,
+    224, 155, 226, 242,  87, 177, 146,  70, 190,  12, 162,  19, 137, 114,  25, 165, 163, 192,  23,  59,
+      9,  94, 179, 107,  35,   7, 142, 131, 239, 203, 149, 136,  61, 249,  14, 156
+)
+# fmt: on
+
+
 class CryptoUtility:
     """
     CryptoUtility 类用于提供加密和编码的工具方法，包括 SM3 哈希、添加盐值、Base64 编码和 RC4 加密等。
@@ -252,23 +272,15 @@ class CryptoUtility:
         self.salt = salt
         self.base64_alphabet = custom_base64_alphabet
 
-        # fmt: off
-        self.big_array = [
-            121, 243,  55, 234, 103,  36,  47, 228,  30, 231, 106,   6, 115,  95,  78, 101, 250, 207, 198,  50,
-            139, 227, 220, 105,  97, 143,  34,  28, 194, 215,  18, 100, 159, 160,  43,   8, 169, 217, 180, 120,
-            247,  45,  90,  11,  27, 197,  46,   3,  84,  72,   5,  68,  62,  56, 221,  75, 144,  79,  73, 161,
-            178,  81,  64, 187, 134, 117, 186, 118,  16, 241, 130,  71,  89, 147, 122, 129,  65,  40,  88, 150,
-            110, 219, 199, 255, 181, 254,  48,   4, 195, 248, 208,  32, 116, 167,  69, 201,  17, 124, 125, 104,
-             96,  83,  80, 127, 236, 108, 154, 126, 204,  15,  20, 135, 112, 158,  13,   1, 188, 164, 210, 237,
-            222,  98, 212,  77, 253,  42, 170, 202,  26,  22,  29, 182, 251,  10, 173, 152,  58, 138,  54, 141,
-            185,  33, 157,  31, 252, 132, 233, 235, 102, 196, 191, 223, 240, 148,  39, 123,  92,  82, 128, 109,
-             57,  24,  38, 113, 209, 245,   2, 119, 153, 229, 189, 214, 230, 174, 232,  63,  52, 205,  86, 140,
-             66, 175, 111, 171, 246, 133, 238, 193,  99,  60,  74,  91, 225,  51,  76,  37, 145, 211, 166, 151,
-            213, 206,   0, 200, 244, 176, 218,  44, 184, 172,  49, 216,  93, 168,  53,  21, 183,  41,  67,  85,
-            224, 155, 226, 242,  87, 177, 146,  70, 190,  12, 162,  19, 137, 114,  25, 165, 163, 192,  23,  59,
-              9,  94, 179, 107,  35,   7, 142, 131, 239, 203, 149, 136,  61, 249,  14, 156
-        ]
-        # fmt: on
+        # transform_bytes 会就地打乱置换表；reset_state 恢复初始状态。
+        self.big_array = list(_BIG_ARRAY)
+
+    def reset_state(self) -> None:
+        """
+        恢复 transform_bytes 的初始置换表，复用实例时每次签名的结果与新建实例一致
+        (Restore the initial permutation table so a reused instance signs like a fresh one).
+        """
+        self.big_array[:] = _BIG_ARRAY
 
     @staticmethod
     def sm3_to_array(input_data: Union[str, List[int]]) -> List[int]:
@@ -287,11 +299,8 @@ class CryptoUtility:
         else:
             input_data_bytes = bytes(input_data)  # 将 List[int] 转换为字节数组
 
-        # 将字节数组转换为适合 sm3.sm3_hash 函数处理的列表格式
-        hex_result = sm3.sm3_hash(func.bytes_to_list(input_data_bytes))
-
-        # 将十六进制字符串结果转换为十进制整数列表
-        return [int(hex_result[i : i + 2], 16) for i in range(0, len(hex_result), 2)]
+        # SM3 后端见 utils.signing_backend（OpenSSL / cryptography / 纯 Python）
+        return list(sm3_digest(input_data_bytes))
 
     def add_salt(self, param: str) -> str:
         """
@@ -344,10 +353,12 @@ class CryptoUtility:
         Returns:
             str: 处理后的字符串 (Processed string).
         """
-        # 将字节列表转换为字符字符串
-        bytes_str = StringProcessor.to_char_str(bytes_list)
-        result_str = []
-        index_b = self.big_array[1]
+        # 直接在整数上运算（原实现先 chr 成字符串再逐个 ord 回来）；置换表
+        # 与长度取到局部变量，省去循环里的属性查找。
+        table = self.big_array
+        size = len(table)
+        result = []
+        index_b = table[1]
         initial_value = 0
         # `value_e` is populated at the end of each loop iteration (see
         # below) and consumed at the top of the NEXT iteration's `else`
@@ -358,31 +369,28 @@ class CryptoUtility:
         # any `else` branch runs.
         value_e = 0
 
-        for index, char in enumerate(bytes_str):
+        for index, char_value in enumerate(bytes_list):
             if index == 0:
-                initial_value = self.big_array[index_b]
+                initial_value = table[index_b]
                 sum_initial = index_b + initial_value
 
-                self.big_array[1] = initial_value
-                self.big_array[index_b] = index_b
+                table[1] = initial_value
+                table[index_b] = index_b
             else:
                 sum_initial = initial_value + value_e
 
-            char_value = ord(char)
-            sum_initial %= len(self.big_array)
-            value_f = self.big_array[sum_initial]
-            encrypted_char = char_value ^ value_f
-            result_str.append(chr(encrypted_char))
+            result.append(char_value ^ table[sum_initial % size])
 
             # 交换数组元素
-            value_e = self.big_array[(index + 2) % len(self.big_array)]
-            sum_initial = (index_b + value_e) % len(self.big_array)
-            initial_value = self.big_array[sum_initial]
-            self.big_array[sum_initial] = self.big_array[(index + 2) % len(self.big_array)]
-            self.big_array[(index + 2) % len(self.big_array)] = initial_value
+            swap_index = (index + 2) % size
+            value_e = table[swap_index]
+            sum_initial = (index_b + value_e) % size
+            initial_value = table[sum_initial]
+            table[sum_initial] = value_e
+            table[swap_index] = initial_value
             index_b = sum_initial
 
-        return "".join(result_str)
+        return "".join(map(chr, result))
 
     def base64_encode(self, input_string: str, selected_alphabet: int = 0) -> str:
         """
@@ -395,7 +403,14 @@ class CryptoUtility:
         Returns:
             str: 编码后的字符串 (Encoded string).
         """
+        try:
+            data = input_string.encode("latin-1")
+        except UnicodeEncodeError:
+            # 码点超过 255 时标准 Base64 不适用，保留逐位实现
+            return self._base64_encode_bits(input_string, selected_alphabet)
+        return custom_b64encode(data, self.base64_alphabet[selected_alphabet])
 
+    def _base64_encode_bits(self, input_string: str, selected_alphabet: int) -> str:
         # 将输入字符串转换为ASCII码的二进制形式
         binary_string = "".join(["{:08b}".format(ord(char)) for char in input_string])
 
@@ -427,6 +442,13 @@ class CryptoUtility:
         Returns:
             str: 编码后的字符串 (Encoded string).
         """
+        try:
+            data = abogus_bytes_str.encode("latin-1")
+        except UnicodeEncodeError:
+            return self._abogus_encode_chars(abogus_bytes_str, selected_alphabet)
+        return custom_b64encode(data, self.base64_alphabet[selected_alphabet])
+
+    def _abogus_encode_chars(self, abogus_bytes_str: str, selected_alphabet: int) -> str:
         abogus = []
 
         for i in range(0, len(abogus_bytes_str), 3):
@@ -463,22 +485,9 @@ class CryptoUtility:
         Returns:
             bytes: 加密后的数据 (Encrypted data).
         """
-        S = list(range(256))
-        j = 0
-        for i in range(256):
-            j = (j + S[i] + key[i % len(key)]) % 256
-            S[i], S[j] = S[j], S[i]
-
-        i = j = 0
-        ciphertext = []
-        for char in plaintext:
-            i = (i + 1) % 256
-            j = (j + S[i]) % 256
-            S[i], S[j] = S[j], S[i]
-            K = S[(S[i] + S[j]) % 256]
-            ciphertext.append(ord(char) ^ K)
-
-        return bytes(ciphertext)
+        # 密钥调度结果按密钥缓存（UA 密钥固定）。码点超过 255 的明文原实现
+        # 在 bytes() 处同样会抛 ValueError。
+        return rc4_encrypt(key, plaintext.encode("latin-1"))
 
 
 class BrowserFingerprintGenerator:
@@ -666,6 +675,11 @@ class ABogus:
             else BrowserFingerprintGenerator.generate_fingerprint("Edge")
         )  # 自定义浏览器指纹，为空则生成Edge指纹
 
+        # 与请求无关、只取决于 UA / 指纹的中间结果，复用签名器时不必每次重算。
+        self._ua_array_cache: Tuple[str, List[int]] = ("", [])
+        self._fp_array_cache: Tuple[str, List[int]] = ("", [])
+        self._body_array_cache: Tuple[Optional[str], List[int]] = (None, [])
+
         # fmt: off
         self.sort_index = [
             18, 20, 52, 26, 30, 34, 58, 38, 40, 53, 42, 21, 27, 54, 55, 31, 35, 57, 39, 41, 43, 22, 28,
@@ -690,6 +704,37 @@ class ABogus:
         """
         return self.crypto_utility.abogus_encode(data, alphabet_index)
 
+    def _ua_array(self) -> List[int]:
+        """UA 的 RC4 + Base64 + SM3 结果，按 UA 缓存 (Cached UA hash array)."""
+        cached_ua, cached = self._ua_array_cache
+        if cached_ua != self.user_agent or not cached:
+            cached = self.crypto_utility.params_to_array(
+                self.crypto_utility.base64_encode(
+                    StringProcessor.to_ord_str(
+                        self.crypto_utility.rc4_encrypt(self.ua_key, self.user_agent)
+                    ),
+                    1,
+                ),
+                add_salt=False,
+            )
+            self._ua_array_cache = (self.user_agent, cached)
+        return cached
+
+    def _body_array(self, body: str) -> List[int]:
+        """请求体的双重 SM3 结果；GET 的空 body 每次都相同，缓存最近一次 (Cached body hash array)."""
+        cached_body, cached = self._body_array_cache
+        if cached_body != body:
+            cached = self.crypto_utility.params_to_array(self.crypto_utility.params_to_array(body))
+            self._body_array_cache = (body, cached)
+        return cached
+
+    def _fp_array(self) -> List[int]:
+        cached_fp, cached = self._fp_array_cache
+        if cached_fp != self.browser_fp or not cached:
+            cached = StringProcessor.to_char_array(self.browser_fp)
+            self._fp_array_cache = (self.browser_fp, cached)
+        return cached
+
     def generate_abogus(self, params: str, body: str = "") -> tuple:
         """
         生成 abogus 参数 (Generate the ABogus parameter).
@@ -721,21 +766,16 @@ class ABogus:
             71: 0,  # 固定
         }
 
+        # 复用实例时从初始置换表开始，保证结果与每次新建实例相同
+        self.crypto_utility.reset_state()
+
         # 开始加密时间
         start_encryption = int(time.time() * 1000)
 
         # params参数加盐加密
         array1 = self.crypto_utility.params_to_array(self.crypto_utility.params_to_array(params))
-        array2 = self.crypto_utility.params_to_array(self.crypto_utility.params_to_array(body))
-        array3 = self.crypto_utility.params_to_array(
-            self.crypto_utility.base64_encode(
-                StringProcessor.to_ord_str(
-                    self.crypto_utility.rc4_encrypt(self.ua_key, self.user_agent)
-                ),
-                1,
-            ),
-            add_salt=False,
-        )
+        array2 = self._body_array(body)
+        array3 = self._ua_array()
 
         # 结束加密时间
         end_encryption = int(time.time() * 1000)
@@ -805,7 +845,7 @@ class ABogus:
         sorted_values = [ab_dir.get(i, 0) for i in self.sort_index]
 
         # 将浏览器指纹转换为 ASCII 码列表
-        edge_fp_array = StringProcessor.to_char_array(self.browser_fp)
+        edge_fp_array = self._fp_array()
 
         # 将浏览器指纹长度的低 8 位作为异或值
         ab_xor = (len(self.browser_fp) & 255) >> 8 & 255
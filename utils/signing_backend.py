@@ -0,0 +1,154 @@
+"""a_bogus 签名用到的 SM3 / RC4 / 自定义 Base64 的快速实现。
+
+输出与 ``utils.abogus`` 里的逐字节实现逐位一致，只是换成 ``bytes`` /
+``bytearray`` 与预计算表：
+
+- SM3：优先用 OpenSSL（``hashlib.new("sm3")``），其次 ``cryptography``，
+  都没有时退回本模块的纯 Python 实现（按 32 位字运算，比 gmssl 逐位处理
+  字符串快得多）。``SM3_BACKEND`` 记录实际使用的后端。
+- RC4：密钥调度结果按密钥缓存，签名里 UA 密钥固定，只做一次。
+- 自定义 Base64：标准 ``base64`` 编码后用 ``bytes.translate`` 换字符表。
+"""
+
+import base64
+import hashlib
+import struct
+from functools import lru_cache
+from typing import Callable, List, Tuple
+
+_MASK32 = 0xFFFFFFFF
+_STD_B64_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+_SM3_IV = (
+    0x7380166F,
+    0x4914B2B9,
+    0x172442D7,
+    0xDA8A0600,
+    0xA96F30BC,
+    0x163138AA,
+    0xE38DEE4D,
+    0xB0FB0E4E,
+)
+
+
+def _rotl(value: int, shift: int) -> int:
+    shift &= 31
+    return ((value << shift) | (value >> (32 - shift))) & _MASK32
+
+
+# 每轮的常量 T_j <<< j 只取决于轮次，预先算好。
+_SM3_T = tuple(_rotl(0x79CC4519 if j < 16 else 0x7A879D8A, j) for j in range(64))
+
+
+def _sm3_compress(state: List[int], block: bytes) -> None:
+    w = list(struct.unpack(">16I", block))
+    for j in range(16, 68):
+        x = w[j - 16] ^ w[j - 9] ^ _rotl(w[j - 3], 15)
+        x ^= _rotl(x, 15) ^ _rotl(x, 23)
+        w.append(x ^ _rotl(w[j - 13], 7) ^ w[j - 6])
+
+    a, b, c, d, e, f, g, h = state
+    for j in range(64):
+        a12 = ((a << 12) | (a >> 20)) & _MASK32
+        ss1 = (a12 + e + _SM3_T[j]) & _MASK32
+        ss1 = ((ss1 << 7) | (ss1 >> 25)) & _MASK32
+        ss2 = ss1 ^ a12
+        if j < 16:
+            ff = a ^ b ^ c
+            gg = e ^ f ^ g
+        else:
+            ff = (a & b) | (a & c) | (b & c)
+            gg = (e & f) | (~e & g)
+        tt1 = (ff + d + ss2 + (w[j] ^ w[j + 4])) & _MASK32
+        tt2 = (gg + h + ss1 + w[j]) & _MASK32
+        d = c
+        c = ((b << 9) | (b >> 23)) & _MASK32
+        b = a
+        a = tt1
+        h = g
+        g = ((f << 19) | (f >> 13)) & _MASK32
+        f = e
+        e = tt2 ^ ((tt2 << 9) | (tt2 >> 23)) & _MASK32 ^ ((tt2 << 17) | (tt2 >> 15)) & _MASK32
+
+    for index, value in enumerate((a, b, c, d, e, f, g, h)):
+        state[index] ^= value
+
+
+def sm3_digest_pure(data: bytes) -> bytes:
+    """纯 Python SM3（GB/T 32905-2016），作为没有原生实现时的回退。"""
+    length = len(data)
+    padded = bytearray(data)
+    padded.append(0x80)
+    padded.extend(b"\x00" * ((56 - len(padded) % 64) % 64))
+    padded.extend(struct.pack(">Q", length * 8))
+
+    state = list(_SM3_IV)
+    view = memoryview(padded)
+    for offset in range(0, len(padded), 64):
+        _sm3_compress(state, view[offset : offset + 64].tobytes())
+    return struct.pack(">8I", *state)
+
+
+def _resolve_sm3() -> Tuple[str, Callable[[bytes], bytes]]:
+    try:
+        hashlib.new("sm3")
+    except (ValueError, TypeError):
+        pass
+    else:
+        return "openssl", lambda data: hashlib.new("sm3", data).digest()
+
+    try:
+        from cryptography.hazmat.primitives import hashes
+
+        def _cryptography_sm3(data: bytes) -> bytes:
+            digest = hashes.Hash(hashes.SM3())
+            digest.update(data)
+            return digest.finalize()
+
+        _cryptography_sm3(b"")
+    except Exception:  # noqa: BLE001 - 未安装或 OpenSSL 不支持 SM3
+        pass
+    else:
+        return "cryptography", _cryptography_sm3
+
+    return "python", sm3_digest_pure
+
+
+SM3_BACKEND, sm3_digest = _resolve_sm3()
+
+
+@lru_cache(maxsize=8)
+def _rc4_schedule(key: bytes) -> bytes:
+    state = bytearray(range(256))
+    j = 0
+    key_length = len(key)
+    for i in range(256):
+        j = (j + state[i] + key[i % key_length]) & 255
+        state[i], state[j] = state[j], state[i]
+    return bytes(state)
+
+
+def rc4_encrypt(key: bytes, data: bytes) -> bytes:
+    """RC4 加密；密钥调度结果按密钥缓存。"""
+    state = bytearray(_rc4_schedule(key))
+    out = bytearray(len(data))
+    i = j = 0
+    for index, byte in enumerate(data):
+        i = (i + 1) & 255
+        si = state[i]
+        j = (j + si) & 255
+        sj = state[j]
+        state[i] = sj
+        state[j] = si
+        out[index] = byte ^ state[(si + sj) & 255]
+    return bytes(out)
+
+
+@lru_cache(maxsize=8)
+def _b64_table(alphabet: str) -> bytes:
+    return bytes.maketrans(_STD_B64_ALPHABET, alphabet.encode("ascii"))
+
+
+def custom_b64encode(data: bytes, alphabet: str) -> str:
+    """用 64 字符的自定义字符表做标准 Base64 编码（``=`` 填充不变）。"""
+    return base64.b64encode(data).translate(_b64_table(alphabet)).decode("ascii")
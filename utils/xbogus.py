@@ -19,7 +19,16 @@
 import base64
 import hashlib
 import time
-from typing import List, Optional, Tuple, Union
+from typing import Iterable, List, Optional, Tuple, Union
+
+from utils.signing_backend import custom_b64encode, rc4_encrypt
+
+# 签名载荷里与 URL / UA / 时间无关的部分：
+# 64、0.00390625（取整为 0）、1、12 四个常量字节，空串 MD5 的二次 MD5 末两字节，
+# 以及固定的 ct=536919696。
+_PAYLOAD_HEAD = bytes((64, 0, 1, 12))
+_EMPTY_MD5_TAIL = hashlib.md5(bytes.fromhex("d41d8cd98f00b204e9800998ecf8427e")).digest()[14:16]
+_CT_BYTES = (536919696).to_bytes(4, "big")
 
 
 class XBogus:
@@ -44,6 +53,7 @@ class XBogus:
                 "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
             )
         )
+        self._ua_tail: Optional[bytes] = None
 
     @property
     def user_agent(self) -> str:
@@ -73,142 +83,54 @@ class XBogus:
         hashed = self._md5(self._md5_str_to_array(self._md5(url_path)))
         return self._md5_str_to_array(hashed)
 
-    def _encoding_conversion(
-        self,
-        a,
-        b,
-        c,
-        e,
-        d,
-        t,
-        f,
-        r,
-        n,
-        o,
-        i,
-        _,
-        x,
-        u,
-        s,
-        l,  # noqa: E741 — single-letter params mirror the upstream JS xbogus impl
-        v,
-        h,
-        p,
-    ) -> str:
-        payload = [a]
-        payload.append(int(i))
-        payload.extend([b, _, c, x, e, u, d, s, t, l, f, v, r, h, n, p, o])
-        return bytes(payload).decode("ISO-8859-1")
-
-    def _encoding_conversion2(self, a: int, b: int, c: str) -> str:
-        return chr(a) + chr(b) + c
-
     @staticmethod
     def _rc4_encrypt(key: bytes, data: bytes) -> bytearray:
-        s = list(range(256))
-        j = 0
-        encrypted = bytearray()
-
-        for i in range(256):
-            j = (j + s[i] + key[i % len(key)]) % 256
-            s[i], s[j] = s[j], s[i]
-
-        i = j = 0
-        for byte in data:
-            i = (i + 1) % 256
-            j = (j + s[i]) % 256
-            s[i], s[j] = s[j], s[i]
-            encrypted.append(byte ^ s[(s[i] + s[j]) % 256])
-
-        return encrypted
-
-    def _calculation(self, a1: int, a2: int, a3: int) -> str:
-        x3 = ((a1 & 255) << 16) | ((a2 & 255) << 8) | (a3 & 255)
-        return (
-            self._character[(x3 & 16515072) >> 18]
-            + self._character[(x3 & 258048) >> 12]
-            + self._character[(x3 & 4032) >> 6]
-            + self._character[x3 & 63]
-        )
-
-    def build(self, url: str) -> Tuple[str, str, str]:
-        ua_md5_array = self._md5_str_to_array(
-            self._md5(
-                base64.b64encode(
-                    self._rc4_encrypt(self._ua_key, self._user_agent.encode("ISO-8859-1"))
-                ).decode("ISO-8859-1")
+        return bytearray(rc4_encrypt(key, bytes(data)))
+
+    def _ua_md5_tail(self) -> bytes:
+        """UA 部分只取决于 user agent，每个实例算一次。"""
+        if self._ua_tail is None:
+            encrypted = self._rc4_encrypt(self._ua_key, self._user_agent.encode("ISO-8859-1"))
+            ua_md5_array = self._md5_str_to_array(
+                self._md5(base64.b64encode(encrypted).decode("ISO-8859-1"))
             )
-        )
+            self._ua_tail = bytes(ua_md5_array[14:16])
+        return self._ua_tail
+
+    def _url_md5_tail(self, url: str) -> bytes:
+        # 不超过 32 个字符的输入会被 _md5 当作十六进制串解析，保留原有行为。
+        if len(url) <= 32:
+            return bytes(self._md5_encrypt(url)[14:16])
+        digest = hashlib.md5(hashlib.md5(url.encode("ISO-8859-1")).digest()).digest()
+        return digest[14:16]
+
+    def _sign(self, url: str, timer: int) -> str:
+        payload = bytearray(_PAYLOAD_HEAD)
+        payload += self._url_md5_tail(url)
+        payload += _EMPTY_MD5_TAIL
+        payload += self._ua_md5_tail()
+        payload += (timer & 0xFFFFFFFF).to_bytes(4, "big")
+        payload += _CT_BYTES
+        checksum = 0
+        for value in payload:
+            checksum ^= value
+        payload.append(checksum)
+
+        garbled = b"\x02\xff" + rc4_encrypt(b"\xff", bytes(payload))
+        return custom_b64encode(garbled, self._character[:64])
 
-        empty_md5_array = self._md5_str_to_array(
-            self._md5(self._md5_str_to_array("d41d8cd98f00b204e9800998ecf8427e"))
-        )
-        url_md5_array = self._md5_encrypt(url)
+    def build(self, url: str) -> Tuple[str, str, str]:
+        xb = self._sign(url, int(time.time()))
+        return f"{url}&X-Bogus={xb}", xb, self._user_agent
 
+    def build_many(self, urls: Iterable[str]) -> List[Tuple[str, str, str]]:
+        """批量签名：与逐个调用 ``build`` 结果相同，整批共用一次时间戳。"""
         timer = int(time.time())
-        ct = 536919696
-
-        new_array = [
-            64,
-            0.00390625,
-            1,
-            12,
-            url_md5_array[14],
-            url_md5_array[15],
-            empty_md5_array[14],
-            empty_md5_array[15],
-            ua_md5_array[14],
-            ua_md5_array[15],
-            timer >> 24 & 255,
-            timer >> 16 & 255,
-            timer >> 8 & 255,
-            timer & 255,
-            ct >> 24 & 255,
-            ct >> 16 & 255,
-            ct >> 8 & 255,
-            ct & 255,
-        ]
-
-        xor_result = new_array[0]
-        for value in new_array[1:]:
-            if isinstance(value, float):
-                value = int(value)
-            xor_result ^= value
-        new_array.append(xor_result)
-
-        array3: list[int] = []
-        array4: list[int] = []
-        idx = 0
-        while idx < len(new_array):
-            value = new_array[idx]
-            array3.append(value)
-            if idx + 1 < len(new_array):
-                array4.append(new_array[idx + 1])
-            idx += 2
-
-        merged = array3 + array4
-
-        garbled = self._encoding_conversion2(
-            2,
-            255,
-            self._rc4_encrypt(
-                "ÿ".encode("ISO-8859-1"),
-                self._encoding_conversion(*merged).encode("ISO-8859-1"),
-            ).decode("ISO-8859-1"),
-        )
-
-        xb = ""
-        idx = 0
-        while idx < len(garbled):
-            xb += self._calculation(
-                ord(garbled[idx]),
-                ord(garbled[idx + 1]),
-                ord(garbled[idx + 2]),
-            )
-            idx += 3
-
-        signed_url = f"{url}&X-Bogus={xb}"
-        return signed_url, xb, self._user_agent
+        results = []
+        for url in urls:
+            xb = self._sign(url, timer)
+            results.append((f"{url}&X-Bogus={xb}", xb, self._user_agent))
+        return results
 
 
 def generate_x_bogus(url: str, user_agent: Optional[str] = None) -> Tuple[str, str, str]: